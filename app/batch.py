@@ -0,0 +1,54 @@
+import os
+import argparse
+from service.batch_job_service import BatchJobService
+from service.tile_partition_service import SPLIT_MODES
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Convert and split many IFC/GLB models in one run.")
+    parser.add_argument('-m', '--manifest', type=str, help='JSON manifest with jobs and per-file options', required=False)
+    parser.add_argument('-g', '--glob', type=str, help='glob of IFC/GLB inputs, e.g. "models/**/*.ifc"', required=False)
+    parser.add_argument('-o', '--output_path', type=str, help='output root, every model gets its own directory', required=False)
+    parser.add_argument('-w', '--workers', type=int, help='number of models converted at the same time', required=False)
+    parser.add_argument('--memory_limit', type=int, help='memory budget in MiB for admitting jobs, defaults to 80%% of available memory', required=False)
+    parser.add_argument('--summary_path', type=str, help='summary JSON path', required=False)
+    parser.add_argument('-s', '--split_size', type=int, help='default split size', required=False)
+    parser.add_argument('--split_mode', type=str, choices=SPLIT_MODES, help='default split mode', required=False)
+    parser.add_argument('-b', '--tile_budget', type=int, help='default triangles or bytes per tile for the budget split modes', required=False)
+    parser.add_argument('--small_model_tiles', type=float, help='default small model tile estimate, 0 always splits', required=False)
+
+    args = parser.parse_args()
+
+    if (args.manifest is None) == (args.glob is None):
+        parser.error("exactly one of --manifest and --glob is required")
+
+    output_path = args.output_path if args.output_path is not None else "./app/outputs"
+    workers = args.workers if args.workers is not None else 2
+    memory_limit_bytes = args.memory_limit * 1024 * 1024 if args.memory_limit is not None else None
+    summary_path = args.summary_path if args.summary_path is not None else os.path.join(output_path, "batch_summary.json")
+
+    defaults = {
+        key: value
+        for key, value in {
+            "split_size": args.split_size,
+            "split_mode": args.split_mode,
+            "tile_budget": args.tile_budget,
+            "small_model_tiles": args.small_model_tiles,
+        }.items()
+        if value is not None
+    }
+
+    batch_job_service = BatchJobService()
+    if args.manifest is not None:
+        jobs = batch_job_service.load_manifest(args.manifest, output_path, defaults)
+    else:
+        jobs = batch_job_service.jobs_from_glob(args.glob, output_path, defaults)
+
+    summary = batch_job_service.run(
+        jobs=jobs,
+        max_workers=workers,
+        memory_limit_bytes=memory_limit_bytes,
+        summary_path=summary_path,
+    )
+    if summary["failed"]:
+        raise SystemExit(1)
@@ -1,5 +1,8 @@
+import os
 import argparse
 from service.generate_image_service import GenerateImageService
+from service.profiler_service import PROFILE_MODES, ProfilerService
+from model.render_profile_model import RENDER_PROFILES, get_render_profile
 
 if __name__ == "__main__":
     
@@ -12,6 +15,11 @@ if __name__ == "__main__":
     parser.add_argument('-hdeg', '--horizontal_rotate_degree', type=float, help='horizontal rotate degree', required=False)
     parser.add_argument('-vdir', '--vertical_rotate_direction', type=str, help="If it's upward, u If it's downward, type d.", required=False)
     parser.add_argument('-vdeg', '--vertical_rotate_degree', type=float, help='vertical rotate degree', required=False)
+    parser.add_argument('-profile', '--render_profile', type=str, choices=list(RENDER_PROFILES), help='render profile', required=False)
+    parser.add_argument('-res', '--resolution', type=str, help='resolution tier (thumbnail, preview, hd, uhd) or WIDTHxHEIGHT', required=False)
+    parser.add_argument('-samples', '--render_samples', type=int, help='render sample count', required=False)
+    parser.add_argument('--no_denoise', action='store_true', help='disable cycles denoising')
+    parser.add_argument('--profiler', type=str, choices=PROFILE_MODES, help='profile the run and write a .prof or collapsed-stack file next to the outputs', required=False)
 
     args = parser.parse_args()
 
@@ -24,13 +32,23 @@ if __name__ == "__main__":
     vertical_rotate_direction = args.vertical_rotate_direction if args.vertical_rotate_direction is not None else "u"
     vertical_rotate_degree = args.vertical_rotate_degree if args.vertical_rotate_degree is not None else "0"
 
-    GenerateImageService().generate_image(
-        input_glb_path=input_glb_path,
-        output_image_path=output_image_path,
-        camera_lenses=camera_lenses,
-        camera_distance=camera_distance,
-        horizontal_rotate_direction=horizontal_rotate_direction, 
-        horizontal_rotate_degree=horizontal_rotate_degree,
-        vertical_rotate_direction=vertical_rotate_direction,
-        vertical_rotate_degree=vertical_rotate_degree
-    )
\ No newline at end of file
+    render_profile = get_render_profile(
+        name=args.render_profile if args.render_profile is not None else "cycles",
+        resolution=args.resolution,
+        samples=args.render_samples,
+        use_denoising=False if args.no_denoise else None,
+    )
+
+    output_dir, output_image_filename = os.path.split(output_image_path)
+    with ProfilerService().profile(args.profiler, output_dir or ".", os.path.splitext(output_image_filename)[0]):
+        GenerateImageService().generate_image(
+            input_glb_path=input_glb_path,
+            output_image_path=output_image_path,
+            camera_lenses=camera_lenses,
+            camera_distance=camera_distance,
+            horizontal_rotate_direction=horizontal_rotate_direction, 
+            horizontal_rotate_degree=horizontal_rotate_degree,
+            vertical_rotate_direction=vertical_rotate_direction,
+            vertical_rotate_degree=vertical_rotate_degree,
+            render_profile=render_profile,
+        )
\ No newline at end of file
@@ -0,0 +1,55 @@
+import argparse
+import json
+from service.generate_image_service import GenerateImageService
+from model.render_profile_model import RENDER_PROFILES, get_render_profile
+from model.camera_spec_model import CameraSpec, orbit_camera_specs
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Render many views of many models in one Blender session.")
+    parser.add_argument('-i', '--input_paths', type=str, nargs='+', help='input file paths', required=True)
+    parser.add_argument('-o', '--output_dir', type=str, help='output image directory', required=False)
+    parser.add_argument('-views', '--views_path', type=str, help='json file with a list of camera specs', required=False)
+    parser.add_argument('-orbit', '--orbit_views', type=int, help='number of evenly spaced horizontal orbit views', required=False)
+    parser.add_argument('-lenses', '--camera_lenses', type=int, help='camera lenses length', required=False)
+    parser.add_argument('-dist', '--camera_distance', type=float, help='camera distance', required=False)
+    parser.add_argument('-vdir', '--vertical_rotate_direction', type=str, help="If it's upward, u If it's downward, type d.", required=False)
+    parser.add_argument('-vdeg', '--vertical_rotate_degree', type=float, help='vertical rotate degree', required=False)
+    parser.add_argument('-profile', '--render_profile', type=str, choices=list(RENDER_PROFILES), help='render profile', required=False)
+    parser.add_argument('-res', '--resolution', type=str, help='resolution tier (thumbnail, preview, hd, uhd) or WIDTHxHEIGHT', required=False)
+    parser.add_argument('-samples', '--render_samples', type=int, help='render sample count', required=False)
+    parser.add_argument('--no_denoise', action='store_true', help='disable cycles denoising')
+
+    args = parser.parse_args()
+
+    output_dir = args.output_dir if args.output_dir is not None else "./app/outputs"
+    camera_lenses = args.camera_lenses if args.camera_lenses is not None else 30
+    camera_distance = args.camera_distance if args.camera_distance is not None else 1.3
+    vertical_rotate_direction = args.vertical_rotate_direction if args.vertical_rotate_direction is not None else "u"
+    vertical_rotate_degree = args.vertical_rotate_degree if args.vertical_rotate_degree is not None else 0
+
+    render_profile = get_render_profile(
+        name=args.render_profile if args.render_profile is not None else "cycles",
+        resolution=args.resolution,
+        samples=args.render_samples,
+        use_denoising=False if args.no_denoise else None,
+    )
+
+    if args.views_path is not None:
+        with open(args.views_path, "r") as f:
+            camera_specs = [CameraSpec(**view) for view in json.load(f)]
+    else:
+        camera_specs = orbit_camera_specs(
+            view_count=args.orbit_views if args.orbit_views is not None else 8,
+            camera_lenses=camera_lenses,
+            camera_distance=camera_distance,
+            vertical_rotate_direction=vertical_rotate_direction,
+            vertical_rotate_degree=vertical_rotate_degree,
+        )
+
+    GenerateImageService().generate_images(
+        input_glb_paths=args.input_paths,
+        output_dir=output_dir,
+        camera_specs=camera_specs,
+        render_profile=render_profile,
+    )
@@ -1,5 +1,6 @@
 import argparse
 from service.ifc_service import IfcService
+from service.profiler_service import PROFILE_MODES, ProfilerService
 
 if __name__ == "__main__":
     
@@ -7,6 +8,7 @@ if __name__ == "__main__":
     parser.add_argument('-i', '--input_path', type=str, help='input file path', required=False)
     parser.add_argument('-o', '--output_path', type=str, help='output file path', required=False)
     parser.add_argument('-m', '--merge_metadata', type=str, help='merge metadata', required=False)
+    parser.add_argument('--profiler', type=str, choices=PROFILE_MODES, help='profile the run and write a .prof or collapsed-stack file next to the outputs', required=False)
 
     args = parser.parse_args()
 
@@ -16,14 +18,15 @@ if __name__ == "__main__":
 
     input_path, base_file_name_with_ext = input_ifc_path.rsplit('/', 1)
     base_filename, file_ext = base_file_name_with_ext.rsplit('.', 1)
-    batch_table, batch_table_mapping, mesh_name_mapping = IfcService().ifc_to_glb(
-      input_ifc_path=input_ifc_path,
-      output_dir=input_path,
-      output_base_filename=base_filename
-    )
+    with ProfilerService().profile(args.profiler, input_path, base_filename):
+        batch_table, batch_table_mapping, mesh_name_mapping = IfcService().ifc_to_glb(
+          input_ifc_path=input_ifc_path,
+          output_dir=input_path,
+          output_base_filename=base_filename
+        )
 
-    if merge_metadata:
-        IfcService().merge_metadata(
-            output_dir=input_path,
-            base_name=base_filename
-        )
\ No newline at end of file
+        if merge_metadata:
+            IfcService().merge_metadata(
+                output_dir=input_path,
+                base_name=base_filename
+            )
\ No newline at end of file
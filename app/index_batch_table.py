@@ -0,0 +1,19 @@
+import os
+import argparse
+from service.batch_table_service import BatchTableService
+from model.batch_table_index_model import BATCH_TABLE_INDEX_EXTENSION, BatchTableIndex
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Build the SQLite lookup index for a batch_table_mapping JSON, in the current or the GlobalId keyed format.")
+    parser.add_argument('-i', '--input_path', type=str, help='batch_table_mapping JSON file', required=True)
+    parser.add_argument('-o', '--output_path', type=str, help='index file, defaults to the input path with a .sqlite extension', required=False)
+
+    args = parser.parse_args()
+
+    output_path = args.output_path if args.output_path is not None else f"{os.path.splitext(args.input_path)[0]}{BATCH_TABLE_INDEX_EXTENSION}"
+
+    batch_table_mapping = BatchTableService().load_batch_table_mapping(args.input_path)
+    with BatchTableIndex.create(output_path, batch_table_mapping) as batch_table_index:
+        print(f"Indexed {len(batch_table_index)} rows")
+    print(f"Saved: {output_path}")
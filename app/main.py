@@ -1,13 +1,33 @@
+import os
 import argparse
-from service.tile_chunk_service import TileChunkService
-from service.ifc_service import IfcService
+from service.conversion_service import ConversionService
+from service.tile_thumbnail_service import TileThumbnailService
+from service.tile_partition_service import SPLIT_MODES
+from service.instrumentation_service import InstrumentationService
+from service.profiler_service import PROFILE_MODES, ProfilerService
+from model.camera_spec_model import orbit_camera_specs
+from model.render_profile_model import RENDER_PROFILES, get_render_profile
+from model.thumbnail_options_model import ThumbnailOptions
+from model.conversion_job_model import ConversionJob
+from utils.output_sink import output_sink_kind
 
 if __name__ == "__main__":
     
     parser = argparse.ArgumentParser(description="Process some arguments.")
     parser.add_argument('-i', '--input_path', type=str, help='input file path', required=False)
-    parser.add_argument('-o', '--output_path', type=str, help='output file path', required=False)
+    parser.add_argument('-o', '--output_path', type=str, help='output directory, .3tz tileset archive, .zip/.tar/.tar.gz archive or s3://bucket/prefix', required=False)
     parser.add_argument('-s', '--split_size', type=int, help='split size', required=False)
+    parser.add_argument('-m', '--split_mode', type=str, choices=SPLIT_MODES, help='split by node count, triangle budget or byte budget', required=False)
+    parser.add_argument('-b', '--tile_budget', type=int, help='triangles or bytes per tile for the budget split modes', required=False)
+    parser.add_argument('--metadata_path', type=str, help='for GLB inputs, path prefix of the ifc_to_glb metadata files (<prefix>_batch_table.json, ...)', required=False)
+    parser.add_argument('--small_model_tiles', type=float, help='write any model estimated at up to this many tiles as one file, 0 always splits; by default only small models with a batch table are', required=False)
+    parser.add_argument('-t', '--thumbnails', action='store_true', help='render a thumbnail set for every tile')
+    parser.add_argument('-tviews', '--thumbnail_views', type=int, help='number of orbit views per tile', required=False)
+    parser.add_argument('-tprofile', '--thumbnail_profile', type=str, choices=list(RENDER_PROFILES), help='thumbnail render profile', required=False)
+    parser.add_argument('-tres', '--thumbnail_resolution', type=str, help='thumbnail resolution tier or WIDTHxHEIGHT', required=False)
+    parser.add_argument('-tworkers', '--thumbnail_workers', type=int, help='number of warm Blender worker processes', required=False)
+    parser.add_argument('--profiler', type=str, choices=PROFILE_MODES, help='profile the run and write a .prof or collapsed-stack file next to the outputs', required=False)
+    parser.add_argument('--profile_report', type=str, help='write per-stage and per-tile timing and memory to this JSON file', required=False)
 
     args = parser.parse_args()
 
@@ -16,31 +36,47 @@ if __name__ == "__main__":
     input_glb_path = args.input_path if args.input_path is not None else "./app/102_160001_01.glb"
     output_path = args.output_path if args.output_path is not None else "./app/outputs"
     split_size = args.split_size if args.split_size is not None else 100
+    split_mode = args.split_mode if args.split_mode is not None else "nodes"
 
-    input_path, base_file_name_with_ext = input_glb_path.rsplit('/', 1)
-    base_filename, file_ext = base_file_name_with_ext.rsplit('.', 1)
-    if file_ext == 'ifc':
-        batch_table, batch_table_mapping, mesh_name_mapping = IfcService().ifc_to_glb(
-          input_ifc_path=input_glb_path,
-          output_dir=input_path,
-          output_base_filename=base_filename
-        )
+    if args.profile_report is not None:
+        InstrumentationService().enable()
 
-        TileChunkService().split_model_by_nodes(
-          input_glb_path=f"{input_path}/{base_filename}.glb",
-          output_dir=output_path,
-          split_size=split_size,
-          batch_table=batch_table,
-          batch_table_mapping=batch_table_mapping,
-          mesh_name_mapping=mesh_name_mapping,
-        )
-    else:
-        TileChunkService().split_model_by_nodes(
-          input_glb_path=input_glb_path,
-          output_dir=output_path,
-          split_size=split_size,
+    thumbnail_options = None
+    if args.thumbnails:
+        thumbnail_options = ThumbnailOptions(
+            camera_specs=orbit_camera_specs(args.thumbnail_views if args.thumbnail_views is not None else 8),
+            render_profile=get_render_profile(
+                name=args.thumbnail_profile if args.thumbnail_profile is not None else "preview",
+                resolution=args.thumbnail_resolution if args.thumbnail_resolution is not None else "thumbnail",
+            ),
+            max_workers=args.thumbnail_workers if args.thumbnail_workers is not None else 2,
         )
 
+    base_filename = os.path.splitext(os.path.basename(input_glb_path))[0]
+    job = ConversionJob(
+        input_path=input_glb_path,
+        output_path=output_path,
+        split_size=split_size,
+        split_mode=split_mode,
+        tile_budget=args.tile_budget,
+        small_model_tiles=args.small_model_tiles,
+        metadata_path=args.metadata_path,
+    )
+    # profiles are always written to disk, next to an archive or into the working directory for s3 outputs
+    profile_dir = output_path
+    if output_sink_kind(output_path) in ("archive", "3tz"):
+        profile_dir = os.path.dirname(output_path) or "."
+    elif output_sink_kind(output_path) == "s3":
+        profile_dir = "."
+    with ProfilerService().profile(args.profiler, profile_dir, base_filename):
+        ConversionService().convert(job, thumbnail_options=thumbnail_options)
+
+    if thumbnail_options is not None:
+        TileThumbnailService().shutdown()
+
+    if args.profile_report is not None:
+        InstrumentationService().save_report(args.profile_report)
+
 # from service.ifc_service import IfcService
 # if __name__ == "__main__":
 #     IfcService().ifc_to_glb(
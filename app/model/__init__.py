@@ -1,3 +1,13 @@
 from .collected_info_model import *
 from .tree_node_model import *
-from .ifc_tree_structure_model import *
\ No newline at end of file
+from .ifc_tree_structure_model import *
+from .camera_spec_model import *
+from .render_profile_model import *
+from .thumbnail_options_model import *
+from .lazy_gltf_model import *
+from .batch_table_index_model import *
+from .batch_table_mapping_model import *
+from .batch_table_columns_model import *
+from .small_model_policy_model import *
+from .conversion_job_model import *
+from .service_job_model import *
@@ -0,0 +1,107 @@
+import json
+import numpy as np
+from .batch_table_index_model import BatchTableIndex
+
+StringColumn = tuple[bytes, np.ndarray]
+
+
+def encode_batch_table_value(value) -> bytes:
+    # the EXT_structural_metadata STRING form of a batch table value, empty values stay empty
+    if not value:
+        return b""
+    if isinstance(value, dict):
+        value = json.dumps(value)
+    elif isinstance(value, int):
+        value = str(value)
+    return value.encode("utf-8")
+
+
+def encode_string_column(values) -> StringColumn:
+    # the UTF-8 values back to back and the offset of every value, followed by the total length
+    return _join_encoded_values([encode_batch_table_value(value) for value in values])
+
+
+def _join_encoded_values(encoded_values: list[bytes]) -> StringColumn:
+    offsets = np.zeros(len(encoded_values) + 1, dtype=np.int64)
+    np.cumsum(np.fromiter(map(len, encoded_values), dtype=np.int64, count=len(encoded_values)), out=offsets[1:])
+    return b"".join(encoded_values), offsets
+
+
+class BatchTableColumns(object):
+    # the batch table as typed columns: every column is dictionary encoded once, so a tile's table is
+    # one gather of code rows instead of values copied per node. codes[row, column] indexes the column's
+    # dictionary, which holds the distinct encoded values back to back with their offsets
+    def __init__(self, batch_table: dict[str, list]) -> None:
+        self.keys = list(batch_table)
+        batch_ids = batch_table["batchId"]
+        row_count = len(batch_ids)
+
+        column_codes = []
+        self.dictionaries: list[tuple[np.ndarray, np.ndarray]] = []
+        for key in self.keys:
+            values = batch_table[key]
+            if len(values) != row_count:
+                raise ValueError(f"Batch table column {key} has {len(values)} values for {row_count} rows")
+            dictionary = {}
+            column_codes.append([dictionary.setdefault(encode_batch_table_value(value), len(dictionary)) for value in values])
+            dictionary_values, dictionary_offsets = _join_encoded_values(list(dictionary))
+            self.dictionaries.append((np.frombuffer(dictionary_values, dtype=np.uint8), dictionary_offsets))
+
+        code_type = np.min_scalar_type(max((len(offsets) for _, offsets in self.dictionaries), default=0))
+        self.codes = np.ascontiguousarray(
+            np.array(column_codes, dtype=code_type).reshape(len(self.keys), row_count).T
+        )
+
+        # batch table row of every mesh index, -1 where a mesh has none
+        batch_ids = np.asarray(batch_ids, dtype=np.int64)
+        self.mesh_rows = np.full(int(batch_ids.max()) + 1 if row_count else 0, -1, dtype=np.int64)
+        self.mesh_rows[batch_ids] = np.arange(row_count)
+
+    def row(self, mesh_index: int) -> int:
+        row = self.mesh_rows[mesh_index] if 0 <= mesh_index < len(self.mesh_rows) else -1
+        if row < 0:
+            raise KeyError(mesh_index)
+        return int(row)
+
+    def take(self, rows: list[int]) -> dict[str, StringColumn]:
+        # the encoded columns of the given rows, batchId is renumbered from zero like the tile's features
+        codes = self.codes[np.asarray(rows, dtype=np.int64)].astype(np.int64)
+        string_columns = {}
+        for column, key in enumerate(self.keys):
+            if key == "batchId":
+                string_columns[key] = encode_string_column(range(len(rows)))
+                continue
+
+            dictionary_values, dictionary_offsets = self.dictionaries[column]
+            value_codes = codes[:, column]
+            starts = dictionary_offsets[value_codes]
+            lengths = dictionary_offsets[value_codes + 1] - starts
+            offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+            np.cumsum(lengths, out=offsets[1:])
+            # byte i of the tile column comes from its value's dictionary entry at the same distance from the value start
+            byte_indices = np.repeat(starts - offsets[:-1], lengths) + np.arange(offsets[-1])
+            string_columns[key] = dictionary_values[byte_indices].tobytes(), offsets
+        return string_columns
+
+
+class IndexedBatchTableColumns(object):
+    # tile rows read from the mapping index per tile, so the split does not encode the whole batch table.
+    # the index rows are keyed by mesh index, keys keeps the batch table's column order
+    def __init__(self, keys: list[str], batch_table_index: BatchTableIndex) -> None:
+        self.keys = keys
+        self._batch_table_index = batch_table_index
+
+    def row(self, mesh_index: int) -> int:
+        if mesh_index not in self._batch_table_index:
+            raise KeyError(mesh_index)
+        return mesh_index
+
+    def take(self, rows: list[int]) -> dict[str, StringColumn]:
+        batch_rows = self._batch_table_index.rows(rows)
+        string_columns = {}
+        for key in self.keys:
+            if key == "batchId":
+                string_columns[key] = encode_string_column(range(len(rows)))
+            else:
+                string_columns[key] = encode_string_column(batch_row.get(key) for batch_row in batch_rows)
+        return string_columns
@@ -0,0 +1,123 @@
+import os
+import json
+import sqlite3
+import urllib.parse
+from collections.abc import Iterator, Mapping
+
+BATCH_TABLE_INDEX_EXTENSION = ".sqlite"
+
+
+class BatchTableIndex(Mapping):
+    # read-only batch_table_mapping kept in SQLite: the same mesh indices and rows as the JSON mapping,
+    # but every lookup reads and decodes one row, so a split never holds the whole mapping.
+    # rows are stored as value arrays, the property names of each distinct row shape only once
+    def __init__(self, index_path: str) -> None:
+        # opened read only and immutable, so SQLite skips locking and change detection
+        index_uri = f"file:{urllib.parse.quote(os.path.abspath(index_path))}?mode=ro&immutable=1"
+        self._connection = sqlite3.connect(index_uri, uri=True)
+        self._row_shapes = {
+            shape: tuple(json.loads(keys)) for shape, keys in self._connection.execute("SELECT shape, keys FROM row_shapes")
+        }
+        # the mapping is tested for truthiness once per node, so the length is read once
+        self._length = self._connection.execute("SELECT COUNT(*) FROM batch_rows").fetchone()[0]
+
+    @classmethod
+    def create(cls, index_path: str, batch_table_mapping: Mapping) -> "BatchTableIndex":
+        # built next to the target and renamed, readers never see a half written index
+        temp_path = f"{index_path}.tmp"
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+        connection = sqlite3.connect(temp_path)
+        try:
+            connection.executescript(
+                """
+                PRAGMA journal_mode = OFF;
+                PRAGMA synchronous = OFF;
+                CREATE TABLE row_shapes (
+                    shape INTEGER PRIMARY KEY,
+                    keys TEXT NOT NULL
+                );
+                CREATE TABLE batch_rows (
+                    mesh_index INTEGER PRIMARY KEY,
+                    global_id TEXT,
+                    shape INTEGER NOT NULL,
+                    row_values TEXT NOT NULL
+                );
+                """
+            )
+            row_shapes = {}
+
+            def encode_row(mesh_index: int, row: dict) -> tuple:
+                shape = row_shapes.setdefault(tuple(row), len(row_shapes))
+                row_values = json.dumps(list(row.values()), separators=(",", ":"))
+                return mesh_index, row.get("globalId"), shape, row_values
+
+            connection.executemany(
+                "INSERT INTO batch_rows VALUES (?, ?, ?, ?)",
+                (encode_row(mesh_index, row) for mesh_index, row in batch_table_mapping.items()),
+            )
+            connection.executemany(
+                "INSERT INTO row_shapes VALUES (?, ?)",
+                ((shape, json.dumps(keys)) for keys, shape in row_shapes.items()),
+            )
+            connection.execute("CREATE INDEX batch_rows_global_id ON batch_rows (global_id)")
+            connection.commit()
+        finally:
+            connection.close()
+
+        os.replace(temp_path, index_path)
+        return cls(index_path)
+
+    def __getitem__(self, mesh_index: int) -> dict:
+        result = self._connection.execute(
+            "SELECT shape, row_values FROM batch_rows WHERE mesh_index = ?", (mesh_index,)
+        ).fetchone()
+        if result is None:
+            raise KeyError(mesh_index)
+        return self.__decode_row(*result)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[int]:
+        for (mesh_index,) in self._connection.execute("SELECT mesh_index FROM batch_rows ORDER BY mesh_index"):
+            yield mesh_index
+
+    def __contains__(self, mesh_index) -> bool:
+        return self._connection.execute(
+            "SELECT 1 FROM batch_rows WHERE mesh_index = ?", (mesh_index,)
+        ).fetchone() is not None
+
+    def __enter__(self) -> "BatchTableIndex":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def rows(self, mesh_indices: list[int]) -> list[dict]:
+        # the rows of a whole tile in a few queries, batched under SQLite's bound parameter limit
+        found = {}
+        for start in range(0, len(mesh_indices), 900):
+            batch = mesh_indices[start:start + 900]
+            for mesh_index, shape, row_values in self._connection.execute(
+                f"SELECT mesh_index, shape, row_values FROM batch_rows WHERE mesh_index IN ({','.join('?' * len(batch))})",
+                batch,
+            ):
+                found[mesh_index] = self.__decode_row(shape, row_values)
+        return [found[mesh_index] for mesh_index in mesh_indices]
+
+    def mesh_indices(self, global_id: str) -> list[int]:
+        # every mesh an IFC element was tessellated into
+        return [
+            mesh_index
+            for (mesh_index,) in self._connection.execute(
+                "SELECT mesh_index FROM batch_rows WHERE global_id = ? ORDER BY mesh_index", (global_id,)
+            )
+        ]
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __decode_row(self, shape: int, row_values: str) -> dict:
+        return dict(zip(self._row_shapes[shape], json.loads(row_values)))
@@ -0,0 +1,70 @@
+from collections.abc import Iterator, Mapping
+
+BATCH_TABLE_MAPPING_VERSION = 2
+
+
+class BatchTableMapping(Mapping):
+    # batch rows by original mesh index, meshes without an IFC element have no row.
+    # GlobalId stays a column of every row, global_id_meshes is the reverse lookup
+    def __init__(self) -> None:
+        self.rows: list[dict | None] = []
+        self.global_id_meshes: dict[str, list[int]] = {}
+        self._length = 0
+
+    @classmethod
+    def from_json(cls, data: dict) -> "BatchTableMapping":
+        batch_table_mapping = cls()
+        if data.get("version") != BATCH_TABLE_MAPPING_VERSION:
+            # mappings written before version 2 are keyed by GlobalId + mesh index and carry the mesh index as batchId
+            for row in data.values():
+                batch_table_mapping.add(row["batchId"], row)
+            return batch_table_mapping
+
+        columns = data["columns"]
+        for mesh_index, row_values in enumerate(data["rows"]):
+            if row_values is None:
+                continue
+            # rows that do not match the shared columns are stored as objects
+            row = dict(zip(columns, row_values)) if isinstance(row_values, list) else row_values
+            batch_table_mapping.add(mesh_index, row)
+        return batch_table_mapping
+
+    def to_json(self) -> dict:
+        columns = next((list(row) for row in self.rows if row is not None), [])
+        return {
+            "version": BATCH_TABLE_MAPPING_VERSION,
+            "columns": columns,
+            "rows": [
+                row if row is None or list(row) != columns else list(row.values())
+                for row in self.rows
+            ],
+            "globalIdMeshes": self.global_id_meshes,
+        }
+
+    def add(self, mesh_index: int, row: dict) -> None:
+        if mesh_index >= len(self.rows):
+            self.rows.extend([None] * (mesh_index + 1 - len(self.rows)))
+        if self.rows[mesh_index] is None:
+            self._length += 1
+        self.rows[mesh_index] = row
+
+        global_id = row.get("globalId")
+        if global_id is not None:
+            mesh_indices = self.global_id_meshes.setdefault(global_id, [])
+            if mesh_index not in mesh_indices:
+                mesh_indices.append(mesh_index)
+
+    def mesh_indices(self, global_id: str) -> list[int]:
+        return self.global_id_meshes.get(global_id, [])
+
+    def __getitem__(self, mesh_index: int) -> dict:
+        row = self.rows[mesh_index] if 0 <= mesh_index < len(self.rows) else None
+        if row is None:
+            raise KeyError(mesh_index)
+        return row
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[int]:
+        return (mesh_index for mesh_index, row in enumerate(self.rows) if row is not None)
@@ -0,0 +1,30 @@
+from typing import Literal
+from pydantic import BaseModel
+
+class CameraSpec(BaseModel):
+    camera_lenses: int = 30
+    camera_distance: float = 1.3
+    horizontal_rotate_direction: Literal['cw', 'ccw'] = 'cw'
+    horizontal_rotate_degree: float = 0
+    vertical_rotate_direction: Literal['u', 'd'] = 'u'
+    vertical_rotate_degree: float = 0
+
+def orbit_camera_specs(
+        view_count: int,
+        camera_lenses: int = 30,
+        camera_distance: float = 1.3,
+        vertical_rotate_direction: Literal['u', 'd'] = 'u',
+        vertical_rotate_degree: float = 0,
+    ) -> list[CameraSpec]:
+    step = 360 / view_count
+    return [
+        CameraSpec(
+            camera_lenses=camera_lenses,
+            camera_distance=camera_distance,
+            horizontal_rotate_direction='cw',
+            horizontal_rotate_degree=step * view_index,
+            vertical_rotate_direction=vertical_rotate_direction,
+            vertical_rotate_degree=vertical_rotate_degree,
+        )
+        for view_index in range(view_count)
+    ]
@@ -1,4 +1,3 @@
-from pydantic import BaseModel
 from pygltflib import (
     Scene,
     Buffer,
@@ -14,31 +13,64 @@ from pygltflib import (
     Skin,
 )
 
-class CollectedInfo(BaseModel):
-    nodes: list[Node]
-    meshes: list[Mesh]
-    materials: list[Material]
-    textures: list[Texture]
-    images: list[Image]
-    accessors: list[Accessor]
-    buffers: list[Buffer]
-    bufferViews: list[BufferView]
-    animations: list[Animation]
-    scenes: list[Scene]
-    samplers: list[Sampler]
-    skins: list[Skin]
-    scene_node_indices: list[list[int]]
-    skins_indices: dict[int, int]
-    meshes_indices: dict[int, int]
-    material_indices: dict[int, int]
-    samplers_indices: dict[int, int]
-    images_indices: dict[int, int]
-    textures_indices: dict[int, int]
-    accessor_indices: dict[int, int]
-    bufferView_indices: dict[int, int]
-    node_indices: set[int]
-    batch_table: dict[str, list]
-    batch_table_mapping: dict
+class CollectedInfo:
+    # plain slotted container, created once per tile on the hot path
+    __slots__ = (
+        "nodes",
+        "meshes",
+        "materials",
+        "textures",
+        "images",
+        "accessors",
+        "buffers",
+        "bufferViews",
+        "animations",
+        "scenes",
+        "samplers",
+        "skins",
+        "scene_node_indices",
+        "scenes_indices",
+        "skins_indices",
+        "meshes_indices",
+        "material_indices",
+        "samplers_indices",
+        "images_indices",
+        "textures_indices",
+        "accessor_indices",
+        "bufferView_indices",
+        "buffers_indices",
+        "animations_indices",
+        "node_indices",
+        "root_matrices",
+        "batch_table_rows",
+    )
 
-    class Config:
-        arbitrary_types_allowed = True
\ No newline at end of file
+    def __init__(self) -> None:
+        self.nodes: list[Node] = []
+        self.meshes: list[Mesh] = []
+        self.materials: list[Material] = []
+        self.textures: list[Texture] = []
+        self.images: list[Image] = []
+        self.accessors: list[Accessor] = []
+        self.buffers: list[Buffer] = []
+        self.bufferViews: list[BufferView] = []
+        self.animations: list[Animation] = []
+        self.scenes: list[Scene] = []
+        self.samplers: list[Sampler] = []
+        self.skins: list[Skin] = []
+        self.scene_node_indices: dict[int, list[int]] = {}
+        self.scenes_indices: dict[int, int] = {}
+        self.skins_indices: dict[int, int] = {}
+        self.meshes_indices: dict[int, int] = {}
+        self.material_indices: dict[int, int] = {}
+        self.samplers_indices: dict[int, int] = {}
+        self.images_indices: dict[int, int] = {}
+        self.textures_indices: dict[int, int] = {}
+        self.accessor_indices: dict[int, int] = {}
+        self.bufferView_indices: dict[int, int] = {}
+        self.buffers_indices: dict[int, int] = {}
+        self.animations_indices: dict[int, int] = {}
+        self.node_indices: set[int] = set()
+        self.root_matrices: dict[int, list[float]] = {}
+        # batch table row of every collected mesh, None when the model has no batch table
+        self.batch_table_rows: list[int] | None = None
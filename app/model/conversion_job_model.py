@@ -0,0 +1,35 @@
+from typing import Optional
+from pydantic import BaseModel, ConfigDict
+from pydantic.alias_generators import to_camel
+from .small_model_policy_model import SmallModelPolicy
+
+class ConversionJob(BaseModel):
+    input_path: str
+    output_path: str
+    split_size: int = 100
+    split_mode: str = "nodes"
+    tile_budget: Optional[int] = None
+    small_model_tiles: Optional[float] = None
+    # <metadata_path>_batch_table.json and friends from an earlier ifc_to_glb run, for GLB inputs
+    metadata_path: Optional[str] = None
+    # overrides the size based memory estimate used for admission
+    memory_bytes: Optional[int] = None
+
+    def small_model_policy(self) -> SmallModelPolicy:
+        if self.small_model_tiles is None:
+            return SmallModelPolicy()
+        # an explicit tile estimate applies to every model, with or without a batch table
+        return SmallModelPolicy(max_tiles=self.small_model_tiles, max_nodes=None, requires_batch_table=False)
+
+class ConversionResult(BaseModel):
+    # dumped with camelCase keys like the tile manifests
+    model_config = ConfigDict(alias_generator=to_camel, populate_by_name=True)
+
+    input_path: str
+    output_path: str
+    status: str = "ok"
+    error: Optional[str] = None
+    duration_seconds: float = 0.0
+    output_bytes: int = 0
+    tiles: int = 0
+    peak_rss_bytes: int = 0
@@ -1,5 +1,4 @@
 
-from tqdm.auto import tqdm
 from .tree_node_model import TreeNode
 import numpy as np
 from functools import partial
@@ -17,6 +16,8 @@ class IfcTreeStructure:
         self.element_count = 0
         self.explore_element_count(element)
 
+        # tqdm is only needed while an IFC tree is explored, not whenever the models package is imported
+        from tqdm.auto import tqdm
         self.bar = tqdm(total=self.element_count)
         self.explore_element(self.tree)
         self.bar.close()
@@ -0,0 +1,175 @@
+import copy
+import typing
+import dataclasses
+from functools import lru_cache, partial
+from typing import Callable, Union
+from pygltflib import (
+    GLTF2,
+    Asset,
+    Scene,
+    Buffer,
+    Mesh,
+    BufferView,
+    Accessor,
+    Node,
+    Image,
+    Material,
+    Sampler,
+    Texture,
+    Animation,
+    Attributes,
+    Skin,
+    Camera,
+)
+from utils.gltf_utils import read_glb
+
+
+def _build_value_decoder(hint) -> Callable | None:
+    if typing.get_origin(hint) is Union:
+        hint = next(arg for arg in typing.get_args(hint) if arg is not type(None))
+
+    if hint is Attributes:
+        return lambda value: Attributes(**value)
+    if hint is int:
+        return int
+    if hint is float:
+        return float
+    if dataclasses.is_dataclass(hint):
+        return lambda value: decode_gltf_object(hint, value)
+    if typing.get_origin(hint) is list:
+        if typing.get_args(hint)[0] is Attributes:
+            # pygltflib keeps morph targets as plain dicts
+            return copy.deepcopy
+        item_decoder = _build_value_decoder(typing.get_args(hint)[0])
+        if item_decoder is None:
+            return list
+        return lambda value: [item_decoder(item) for item in value]
+    if typing.get_origin(hint) is dict:
+        return copy.deepcopy
+    return None
+
+
+@lru_cache(maxsize=None)
+def _field_decoders(cls) -> tuple:
+    hints = typing.get_type_hints(cls)
+    return tuple(
+        (field.name, _build_value_decoder(hints[field.name]))
+        for field in dataclasses.fields(cls)
+    )
+
+
+def decode_gltf_object(cls, raw: dict):
+    # same result as cls.from_dict for pygltflib types, without resolving type hints on every call
+    kwargs = {}
+    for name, decoder in _field_decoders(cls):
+        if name not in raw:
+            continue
+        value = raw[name]
+        kwargs[name] = value if value is None or decoder is None else decoder(value)
+    return cls(**kwargs)
+
+
+class LazyGLTFArray:
+    # index-based view over one raw glTF JSON array, items become pygltflib objects on first access
+    __slots__ = ("_raw", "_materialize", "_cache")
+
+    def __init__(self, raw: list, materialize) -> None:
+        self._raw = raw
+        self._materialize = materialize
+        self._cache = {}
+
+    def __len__(self) -> int:
+        return len(self._raw)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._raw)))]
+        if index < 0:
+            index += len(self._raw)
+        item = self._cache.get(index)
+        if item is None:
+            item = self._materialize(self._raw[index])
+            self._cache[index] = item
+        return item
+
+    def __iter__(self):
+        for index in range(len(self._raw)):
+            yield self[index]
+
+    def raw(self, index: int) -> dict:
+        return self._raw[index]
+
+    def raw_items(self) -> list[dict]:
+        return self._raw
+
+    def release(self) -> None:
+        self._cache = {}
+
+
+class LazyGLTF:
+    _array_types = {
+        "scenes": partial(decode_gltf_object, Scene),
+        "nodes": partial(decode_gltf_object, Node),
+        "meshes": partial(decode_gltf_object, Mesh),
+        "accessors": partial(decode_gltf_object, Accessor),
+        "bufferViews": partial(decode_gltf_object, BufferView),
+        "buffers": partial(decode_gltf_object, Buffer),
+        "materials": partial(decode_gltf_object, Material),
+        "textures": partial(decode_gltf_object, Texture),
+        "images": partial(decode_gltf_object, Image),
+        "samplers": partial(decode_gltf_object, Sampler),
+        "animations": partial(decode_gltf_object, Animation),
+        "skins": partial(decode_gltf_object, Skin),
+        "cameras": partial(decode_gltf_object, Camera),
+    }
+
+    scenes: LazyGLTFArray
+    nodes: LazyGLTFArray
+    meshes: LazyGLTFArray
+    accessors: LazyGLTFArray
+    bufferViews: LazyGLTFArray
+    buffers: LazyGLTFArray
+    materials: LazyGLTFArray
+    textures: LazyGLTFArray
+    images: LazyGLTFArray
+    samplers: LazyGLTFArray
+    animations: LazyGLTFArray
+    skins: LazyGLTFArray
+    cameras: LazyGLTFArray
+
+    def __init__(self, gltf_json: dict, binary_data: memoryview = None) -> None:
+        self._json = gltf_json
+        self._binary_data = binary_data
+
+        self.asset = decode_gltf_object(Asset, gltf_json.get("asset", {}))
+        self.scene = gltf_json.get("scene")
+        # small top-level values are copied so callers can extend them per view
+        self.extensionsUsed = copy.deepcopy(gltf_json.get("extensionsUsed", []))
+        self.extensionsRequired = copy.deepcopy(gltf_json.get("extensionsRequired", []))
+        self.extensions = copy.deepcopy(gltf_json.get("extensions", {}))
+        self.extras = copy.deepcopy(gltf_json.get("extras", {}))
+
+        for name, materialize in self._array_types.items():
+            setattr(self, name, LazyGLTFArray(gltf_json.get(name, []), materialize))
+
+    @classmethod
+    def load(cls, input_path: str) -> "LazyGLTF":
+        gltf_json, binary_data = read_glb(input_path)
+        return cls(gltf_json, binary_data)
+
+    def binary_blob(self) -> memoryview | None:
+        return self._binary_data
+
+    def view(self) -> "LazyGLTF":
+        # shares the raw JSON and binary chunk, but objects and top-level values are its own
+        return LazyGLTF(self._json, self._binary_data)
+
+    def release(self) -> None:
+        for name in self._array_types:
+            getattr(self, name).release()
+
+    def to_gltf2(self) -> GLTF2:
+        gltf = decode_gltf_object(GLTF2, self._json)
+        if self._binary_data is not None:
+            gltf.set_binary_blob(bytes(self._binary_data))
+        return gltf
@@ -0,0 +1,61 @@
+from typing import Literal, Optional
+from pydantic import BaseModel
+
+class RenderProfile(BaseModel):
+    engine: Literal['CYCLES', 'BLENDER_EEVEE', 'BLENDER_WORKBENCH'] = 'CYCLES'
+    samples: Optional[int] = None
+    use_denoising: bool = True
+    use_adaptive_sampling: bool = True
+    adaptive_threshold: Optional[float] = None
+    resolution_x: int = 1920
+    resolution_y: int = 1080
+    resolution_percentage: int = 100
+
+RESOLUTION_TIERS: dict[str, tuple[int, int]] = {
+    "thumbnail": (320, 180),
+    "preview": (960, 540),
+    "hd": (1920, 1080),
+    "uhd": (3840, 2160),
+}
+
+RENDER_PROFILES: dict[str, RenderProfile] = {
+    "preview": RenderProfile(engine='BLENDER_WORKBENCH', resolution_x=960, resolution_y=540),
+    "eevee": RenderProfile(engine='BLENDER_EEVEE', samples=16, resolution_x=960, resolution_y=540),
+    "cycles_fast": RenderProfile(
+        engine='CYCLES',
+        samples=32,
+        use_denoising=True,
+        use_adaptive_sampling=True,
+        adaptive_threshold=0.05,
+        resolution_x=960,
+        resolution_y=540,
+    ),
+    "cycles": RenderProfile(engine='CYCLES'),
+}
+
+def get_render_profile(
+        name: str = "cycles",
+        resolution: Optional[str] = None,
+        samples: Optional[int] = None,
+        use_denoising: Optional[bool] = None,
+    ) -> RenderProfile:
+    if name not in RENDER_PROFILES:
+        raise ValueError(f"Unknown render profile: {name}. Choose from {', '.join(RENDER_PROFILES)}")
+
+    overrides = {}
+    if resolution is not None:
+        if resolution in RESOLUTION_TIERS:
+            resolution_x, resolution_y = RESOLUTION_TIERS[resolution]
+        else:
+            try:
+                resolution_x, resolution_y = (int(v) for v in resolution.lower().split('x'))
+            except ValueError:
+                raise ValueError(f"Resolution must be one of {', '.join(RESOLUTION_TIERS)} or WIDTHxHEIGHT, got {resolution}")
+        overrides["resolution_x"] = resolution_x
+        overrides["resolution_y"] = resolution_y
+    if samples is not None:
+        overrides["samples"] = samples
+    if use_denoising is not None:
+        overrides["use_denoising"] = use_denoising
+
+    return RENDER_PROFILES[name].model_copy(update=overrides)
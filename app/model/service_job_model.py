@@ -0,0 +1,30 @@
+from typing import Any, Literal, Optional
+from pydantic import BaseModel, ConfigDict, Field
+from pydantic.alias_generators import to_camel
+
+ServiceJobType = Literal["convert", "ifc_to_glb", "split", "generate_image"]
+ServiceJobStatus = Literal["queued", "running", "succeeded", "failed", "cancelled"]
+
+SERVICE_JOB_TYPES = ("convert", "ifc_to_glb", "split", "generate_image")
+FINISHED_JOB_STATUSES = ("succeeded", "failed", "cancelled")
+
+class ServiceJobProgress(BaseModel):
+    model_config = ConfigDict(alias_generator=to_camel, populate_by_name=True)
+
+    stage: Optional[str] = None
+    tiles: Optional[int] = None
+    tiles_written: int = 0
+
+class ServiceJob(BaseModel):
+    model_config = ConfigDict(alias_generator=to_camel, populate_by_name=True)
+
+    id: str
+    type: ServiceJobType
+    params: dict[str, Any] = Field(default_factory=dict)
+    status: ServiceJobStatus = "queued"
+    progress: ServiceJobProgress = Field(default_factory=ServiceJobProgress)
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
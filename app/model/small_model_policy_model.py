@@ -0,0 +1,37 @@
+from typing import Optional
+from pydantic import BaseModel
+
+class ModelStats(BaseModel):
+    nodes: int = 0
+    mesh_nodes: int = 0
+    triangles: int = 0
+    binary_bytes: int = 0
+
+class SmallModelPolicy(BaseModel):
+    # a model is written as one merged file when it stays under the caps. the defaults keep the old
+    # behaviour: only models with a batch table and at most 400 nodes, the tile estimate is not checked
+    max_nodes: Optional[int] = 400
+    max_bytes: Optional[int] = 16 * 1024 * 1024
+    max_triangles: Optional[int] = 250_000
+    max_tiles: Optional[float] = None
+    requires_batch_table: bool = True
+
+    def estimated_tiles(self, stats: ModelStats, split_mode: str, split_size: int, tile_budget: int) -> float:
+        if split_mode == "triangles":
+            return stats.triangles / tile_budget
+        if split_mode == "bytes":
+            return stats.binary_bytes / tile_budget
+        return stats.nodes / split_size
+
+    def is_small(self, stats: ModelStats, split_mode: str, split_size: int, tile_budget: int, has_batch_table: bool) -> bool:
+        if self.requires_batch_table and not has_batch_table:
+            return False
+        if self.max_nodes is not None and stats.nodes > self.max_nodes:
+            return False
+        if self.max_bytes is not None and stats.binary_bytes > self.max_bytes:
+            return False
+        if self.max_triangles is not None and stats.triangles > self.max_triangles:
+            return False
+        if self.max_tiles is None:
+            return True
+        return self.estimated_tiles(stats, split_mode, split_size, tile_budget) <= self.max_tiles
@@ -0,0 +1,9 @@
+from pydantic import BaseModel, Field
+from .camera_spec_model import CameraSpec, orbit_camera_specs
+from .render_profile_model import RenderProfile, get_render_profile
+
+class ThumbnailOptions(BaseModel):
+    camera_specs: list[CameraSpec] = Field(default_factory=lambda: orbit_camera_specs(8))
+    render_profile: RenderProfile = Field(default_factory=lambda: get_render_profile("preview", resolution="thumbnail"))
+    max_workers: int = 2
+    output_subdir: str = "thumbnails"
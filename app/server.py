@@ -0,0 +1,19 @@
+import argparse
+from service.job_server_service import JobServerService
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Serve conversion, split and image jobs from warm worker processes.")
+    parser.add_argument('--host', type=str, help='host to listen on', required=False)
+    parser.add_argument('-p', '--port', type=int, help='port to listen on', required=False)
+    parser.add_argument('--socket_path', type=str, help='listen on this unix socket instead of TCP', required=False)
+    parser.add_argument('-w', '--workers', type=int, help='number of warm worker processes', required=False)
+
+    args = parser.parse_args()
+
+    JobServerService().serve(
+        host=args.host if args.host is not None else "127.0.0.1",
+        port=args.port if args.port is not None else 8765,
+        socket_path=args.socket_path,
+        max_workers=args.workers if args.workers is not None else 2,
+    )
@@ -1,4 +1,25 @@
-from .generate_image_service import *
-from .tile_chunk_service import *
-from .batch_table_service import *
-from .ifc_service import *
\ No newline at end of file
+import importlib
+
+# every service is imported on first use, so an entry point only loads what it runs:
+# a GLB split never imports ifcopenshell, and bpy is only loaded for image generation,
+# which also lets the split pipeline spawn clean Blender workers for thumbnails
+_service_modules = {
+    "TileChunkService": ".tile_chunk_service",
+    "TilePartitionService": ".tile_partition_service",
+    "TileThumbnailService": ".tile_thumbnail_service",
+    "TilesetService": ".tileset_service",
+    "BatchTableService": ".batch_table_service",
+    "IfcService": ".ifc_service",
+    "GenerateImageService": ".generate_image_service",
+    "InstrumentationService": ".instrumentation_service",
+    "ProfilerService": ".profiler_service",
+    "ConversionService": ".conversion_service",
+    "BatchJobService": ".batch_job_service",
+    "JobQueueService": ".job_queue_service",
+    "JobServerService": ".job_server_service",
+}
+
+def __getattr__(name):
+    if name in _service_modules:
+        return getattr(importlib.import_module(_service_modules[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,200 @@
+import os
+import glob
+import json
+import time
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, Future, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from model.conversion_job_model import ConversionJob, ConversionResult
+from service.tile_thumbnail_service import TileThumbnailService
+from utils.output_sink import output_sink_kind
+
+INPUT_EXTENSIONS = (".ifc", ".glb", ".gltf")
+# rough peak memory per input byte, tessellating IFC needs far more than splitting a GLB
+MEMORY_FACTORS = {
+    ".ifc": 20,
+    ".glb": 6,
+    ".gltf": 6,
+}
+WORKER_BASE_MEMORY_BYTES = 256 * 1024 * 1024
+
+
+def _init_conversion_worker() -> None:
+    # ifcopenshell, pygltflib and the geometry settings are loaded once per worker, not once per model
+    from service.conversion_service import ConversionService
+    ConversionService()
+
+
+def _run_conversion_job(job: ConversionJob) -> ConversionResult:
+    from service.conversion_service import ConversionService
+    start_time = time.perf_counter()
+    try:
+        return ConversionService().convert(job)
+    except Exception as e:
+        return ConversionResult(
+            input_path=job.input_path,
+            output_path=job.output_path,
+            status="error",
+            error=repr(e),
+            duration_seconds=round(time.perf_counter() - start_time, 4),
+        )
+
+
+def available_memory_bytes() -> int | None:
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if hasattr(os, "sysconf") and "SC_AVPHYS_PAGES" in os.sysconf_names:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    return None
+
+
+class BatchJobService(object):
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if not isinstance(cls._instance, cls):
+            cls._instance = object.__new__(cls, *args, **kwargs)
+
+        return cls._instance
+
+    def load_manifest(self, manifest_path: str, output_root: str, defaults: dict = None) -> list[ConversionJob]:
+        with open(manifest_path, "r") as f:
+            manifest = json.load(f)
+
+        # either a plain list of jobs or {"defaults": {...}, "jobs": [...]}
+        if isinstance(manifest, list):
+            manifest_defaults, entries = {}, manifest
+        else:
+            manifest_defaults, entries = manifest.get("defaults", {}), manifest["jobs"]
+
+        manifest_dir = os.path.dirname(os.path.abspath(manifest_path))
+        jobs = []
+        for entry in entries:
+            if isinstance(entry, str):
+                entry = {"input_path": entry}
+            options = {**(defaults or {}), **manifest_defaults, **entry}
+            # relative paths in a manifest are relative to the manifest itself
+            options["input_path"] = os.path.join(manifest_dir, options["input_path"])
+            if options.get("metadata_path") is not None:
+                options["metadata_path"] = os.path.join(manifest_dir, options["metadata_path"])
+            if options.get("output_path") is None:
+                options["output_path"] = self.__default_output_path(output_root, options["input_path"])
+            elif output_sink_kind(options["output_path"]) != "s3":
+                options["output_path"] = os.path.join(manifest_dir, options["output_path"])
+            jobs.append(ConversionJob(**options))
+        return jobs
+
+    def jobs_from_glob(self, pattern: str, output_root: str, defaults: dict = None) -> list[ConversionJob]:
+        defaults = defaults or {}
+        return [
+            ConversionJob(
+                **defaults,
+                input_path=input_path,
+                output_path=self.__default_output_path(output_root, input_path),
+            )
+            for input_path in sorted(glob.glob(pattern, recursive=True))
+            if os.path.splitext(input_path)[1].lower() in INPUT_EXTENSIONS
+        ]
+
+    def estimate_memory(self, job: ConversionJob) -> int:
+        if job.memory_bytes is not None:
+            return job.memory_bytes
+        file_ext = os.path.splitext(job.input_path)[1].lower()
+        try:
+            input_bytes = os.path.getsize(job.input_path)
+        except OSError:
+            # the job fails in its worker and is reported like any other failure
+            input_bytes = 0
+        return WORKER_BASE_MEMORY_BYTES + input_bytes * MEMORY_FACTORS.get(file_ext, 6)
+
+    def run(
+            self,
+            jobs: list[ConversionJob],
+            max_workers: int = 2,
+            memory_limit_bytes: int = None,
+            summary_path: str = None,
+        ) -> dict:
+        if memory_limit_bytes is None:
+            available_bytes = available_memory_bytes()
+            memory_limit_bytes = int(available_bytes * 0.8) if available_bytes is not None else None
+
+        pending = deque(jobs)
+        running: dict[Future, tuple[ConversionJob, int]] = {}
+        results: list[ConversionResult] = []
+        reserved_bytes = 0
+
+        start_time = time.perf_counter()
+        executor = self.__create_executor(max_workers)
+        try:
+            while pending or running:
+                # jobs are admitted in order while their estimate fits, a job that never fits runs alone
+                while pending and len(running) < max_workers:
+                    job = pending[0]
+                    estimate = self.estimate_memory(job)
+                    if running and memory_limit_bytes is not None and reserved_bytes + estimate > memory_limit_bytes:
+                        break
+                    pending.popleft()
+                    running[executor.submit(_run_conversion_job, job)] = (job, estimate)
+                    reserved_bytes += estimate
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                broken = False
+                for future in done:
+                    job, estimate = running.pop(future)
+                    reserved_bytes -= estimate
+                    try:
+                        result = future.result()
+                    except BrokenProcessPool as e:
+                        # a worker died (usually out of memory), every job still on that pool fails with it
+                        broken = True
+                        result = ConversionResult(
+                            input_path=job.input_path,
+                            output_path=job.output_path,
+                            status="error",
+                            error=repr(e),
+                        )
+                    results.append(result)
+                    print(f"[{len(results)}/{len(jobs)}] {result.status}: {result.input_path} ({result.duration_seconds}s)")
+
+                if broken:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    executor = self.__create_executor(max_workers)
+        finally:
+            executor.shutdown()
+            # warm Blender workers are only kept between jobs of one run
+            TileThumbnailService().shutdown()
+
+        summary = {
+            "maxWorkers": max_workers,
+            "memoryLimitBytes": memory_limit_bytes,
+            "totalSeconds": round(time.perf_counter() - start_time, 4),
+            "succeeded": sum(1 for result in results if result.status == "ok"),
+            "failed": sum(1 for result in results if result.status != "ok"),
+            "outputBytes": sum(result.output_bytes for result in results),
+            "jobs": [result.model_dump(by_alias=True) for result in results],
+        }
+        if summary_path is not None:
+            summary_dir = os.path.dirname(summary_path)
+            if summary_dir:
+                os.makedirs(summary_dir, exist_ok=True)
+            with open(summary_path, "w") as f:
+                json.dump(summary, f, indent=2)
+            print(f"Saved: {summary_path}")
+        return summary
+
+    def __create_executor(self, max_workers: int) -> ProcessPoolExecutor:
+        # spawned like the thumbnail workers, a forked copy of a large parent would be counted against every job
+        return ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_conversion_worker,
+        )
+
+    def __default_output_path(self, output_root: str, input_path: str) -> str:
+        return os.path.join(output_root, os.path.splitext(os.path.basename(input_path))[0])
@@ -1,6 +1,15 @@
+import os
 import json
-from ifcopenshell.entity_instance import entity_instance
+import tempfile
+from typing import TYPE_CHECKING
+from collections.abc import Mapping
 from utils import to_dict, extract_non_null_attributes
+from utils.output_sink import OutputSink, LocalOutputSink
+from model.batch_table_index_model import BatchTableIndex, BATCH_TABLE_INDEX_EXTENSION
+from model.batch_table_mapping_model import BatchTableMapping
+
+if TYPE_CHECKING:
+    from ifcopenshell.entity_instance import entity_instance
 
 class BatchTableService(object):
     _instance = None
@@ -14,11 +23,11 @@ class BatchTableService(object):
 
         return cls._instance
         
-    def init_batch_table_keys(self, project: entity_instance) -> tuple[dict, dict]:
+    def init_batch_table_keys(self, project: "entity_instance") -> tuple[dict, BatchTableMapping]:
         batch_table: dict = {
           "batchId": [],
         }
-        batch_table_mapping = {}
+        batch_table_mapping = BatchTableMapping()
         project_dict = to_dict(project, self.exclude_keys)
         for key in project_dict:
             if key in self.exclude_keys:
@@ -29,10 +38,9 @@ class BatchTableService(object):
             batch_table[key] = []
         return batch_table, batch_table_mapping
     
-    def create_batch_table(self, batch_table: dict[str, list], batch_table_mapping: dict, index: int, property: dict):
+    def create_batch_table(self, batch_table: dict[str, list], batch_table_mapping: BatchTableMapping, index: int, property: dict):
         batch_table["batchId"].append(index)
-        mapping_key = property["globalId"] + str(index)
-        batch_table_mapping[mapping_key] = {}
+        batch_data = {}
             
         for key in property:
           if key == "batchId":
@@ -40,12 +48,49 @@ class BatchTableService(object):
           if key in batch_table:
             value = property[key]
             batch_table[key].append(value)
-            batch_table_mapping[mapping_key][key] = value
+            batch_data[key] = value
+
+        batch_data["batchId"] = index
+        batch_table_mapping.add(index, batch_data)
+
+    def save_batch_table(
+            self,
+            output_dir: str,
+            output_filename: str,
+            batch_table: dict,
+            batch_table_mapping: BatchTableMapping,
+            output_sink: OutputSink = None,
+        ) -> int:
+        if output_sink is None:
+            output_sink = LocalOutputSink(output_dir)
+        return (
+            output_sink.write_json(f'{output_filename}_batch_table.json', batch_table)
+            + output_sink.write_json(f'{output_filename}_batch_table_mapping.json', batch_table_mapping.to_json(), indent=None)
+            + self.save_batch_table_index(output_sink, output_filename, batch_table_mapping)
+        )
+
+    def save_batch_table_index(self, output_sink: OutputSink, output_filename: str, batch_table_mapping: Mapping) -> int:
+        # SQLite needs a real file, so the index is built in a temporary directory and then handed to the sink
+        with tempfile.TemporaryDirectory() as temp_dir:
+            index_path = os.path.join(temp_dir, f"index{BATCH_TABLE_INDEX_EXTENSION}")
+            BatchTableIndex.create(index_path, batch_table_mapping).close()
+            return output_sink.write_file(f'{output_filename}_batch_table_mapping{BATCH_TABLE_INDEX_EXTENSION}', index_path)
 
-        batch_table_mapping[mapping_key]["batchId"] = index
+    def load_batch_table_mapping(self, mapping_path: str) -> Mapping:
+        # an index is queried lazily, a JSON mapping is loaded in full, in either the current or the GlobalId keyed format
+        if mapping_path.endswith(BATCH_TABLE_INDEX_EXTENSION):
+            return BatchTableIndex(mapping_path)
+        with open(mapping_path, "r") as f:
+            return BatchTableMapping.from_json(json.load(f))
 
-    def save_batch_table(self, output_dir: str, output_filename: str, batch_table: dict, batch_table_mapping: dict):
-        with open(f'{output_dir}/{output_filename}_batch_table.json', 'w') as f:
-            json.dump(batch_table, f, indent=2)
-        with open(f'{output_dir}/{output_filename}_batch_table_mapping.json', 'w') as f:
-            json.dump(batch_table_mapping, f, indent=2)
\ No newline at end of file
+    def load_metadata(self, base_path: str) -> tuple[dict, Mapping, dict[str, str]]:
+        # the files ifc_to_glb writes next to <base_path>.glb, the mapping index is preferred when present
+        with open(f'{base_path}_batch_table.json', 'r') as f:
+            batch_table = json.load(f)
+        mapping_path = f'{base_path}_batch_table_mapping{BATCH_TABLE_INDEX_EXTENSION}'
+        if not os.path.exists(mapping_path):
+            mapping_path = f'{base_path}_batch_table_mapping.json'
+        batch_table_mapping = self.load_batch_table_mapping(mapping_path)
+        with open(f'{base_path}_mesh_name_mapping.json', 'r') as f:
+            mesh_name_mapping = json.load(f)
+        return batch_table, batch_table_mapping, mesh_name_mapping
\ No newline at end of file
@@ -0,0 +1,102 @@
+import os
+import time
+from service.tile_chunk_service import TileChunkService
+from service.ifc_service import IfcService
+from service.batch_table_service import BatchTableService
+from service.instrumentation_service import peak_rss_bytes
+from model.conversion_job_model import ConversionJob, ConversionResult
+from model.thumbnail_options_model import ThumbnailOptions
+from model.batch_table_index_model import BatchTableIndex
+from utils.output_sink import OutputSink, open_output_sink, output_sink_kind
+
+
+class ConversionService(object):
+    _instance = None
+    _tile_chunk_service: TileChunkService
+    _ifc_service: IfcService
+    _batch_table_service: BatchTableService
+
+    def __new__(cls, *args, **kwargs):
+        if not isinstance(cls._instance, cls):
+            cls._instance = object.__new__(cls, *args, **kwargs)
+
+        return cls._instance
+
+    def __init__(self) -> None:
+        self._tile_chunk_service = TileChunkService()
+        self._ifc_service = IfcService()
+        self._batch_table_service = BatchTableService()
+
+    def convert(self, job: ConversionJob, thumbnail_options: ThumbnailOptions = None) -> ConversionResult:
+        input_dir, base_file_name_with_ext = os.path.split(job.input_path)
+        base_filename, file_ext = os.path.splitext(base_file_name_with_ext)
+        input_dir = input_dir or "."
+
+        start_time = time.perf_counter()
+        # the output path is a directory, an archive or an s3:// location, tiles stream into it as they are built
+        # a 3tz archive is a complete 3D Tiles dataset, so it also gets a tileset.json
+        write_tileset = output_sink_kind(job.output_path) == "3tz"
+        with open_output_sink(job.output_path) as output_sink:
+            if file_ext.lower() == ".ifc":
+                # the intermediate GLB is read back by the split, so it always stays on disk
+                batch_table, batch_table_mapping, mesh_name_mapping = self._ifc_service.ifc_to_glb(
+                    input_ifc_path=job.input_path,
+                    output_dir=input_dir,
+                    output_base_filename=base_filename,
+                )
+
+                manifest = self._tile_chunk_service.split_model_by_nodes(
+                    input_glb_path=f"{input_dir}/{base_filename}.glb",
+                    output_sink=output_sink,
+                    split_size=job.split_size,
+                    batch_table=batch_table,
+                    batch_table_mapping=batch_table_mapping,
+                    mesh_name_mapping=mesh_name_mapping,
+                    thumbnail_options=thumbnail_options,
+                    split_mode=job.split_mode,
+                    tile_budget=job.tile_budget,
+                    small_model_policy=job.small_model_policy(),
+                    write_tileset=write_tileset,
+                )
+            else:
+                batch_table, batch_table_mapping, mesh_name_mapping = None, None, None
+                if job.metadata_path is not None:
+                    batch_table, batch_table_mapping, mesh_name_mapping = (
+                        self._batch_table_service.load_metadata(job.metadata_path)
+                    )
+                try:
+                    manifest = self._tile_chunk_service.split_model_by_nodes(
+                        input_glb_path=job.input_path,
+                        output_sink=output_sink,
+                        split_size=job.split_size,
+                        batch_table=batch_table,
+                        batch_table_mapping=batch_table_mapping,
+                        mesh_name_mapping=mesh_name_mapping,
+                        thumbnail_options=thumbnail_options,
+                        split_mode=job.split_mode,
+                        tile_budget=job.tile_budget,
+                        small_model_policy=job.small_model_policy(),
+                        write_tileset=write_tileset,
+                    )
+                finally:
+                    if isinstance(batch_table_mapping, BatchTableIndex):
+                        batch_table_mapping.close()
+
+        return ConversionResult(
+            input_path=job.input_path,
+            output_path=job.output_path,
+            duration_seconds=round(time.perf_counter() - start_time, 4),
+            output_bytes=self.__output_bytes(output_sink, manifest),
+            tiles=len(manifest["tiles"]),
+            peak_rss_bytes=peak_rss_bytes(),
+        )
+
+    def __output_bytes(self, output_sink: OutputSink, manifest: dict) -> int:
+        # thumbnails are rendered straight into the output directory instead of through the sink,
+        # only the ones of this job are added so a shared output directory is not counted twice
+        thumbnail_bytes = sum(
+            os.path.getsize(os.path.join(output_sink.local_dir, thumbnail_path))
+            for tile_entry in manifest["tiles"]
+            for thumbnail_path in tile_entry.get("thumbnails", [])
+        )
+        return output_sink.bytes_written + thumbnail_bytes
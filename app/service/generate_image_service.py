@@ -1,41 +1,117 @@
+import os
+import time
+import hashlib
 from typing import Literal
 import bpy
 import mathutils
 import math
+import numpy as np
+from utils.gltf_utils import read_glb_json, position_bounds
+from model.camera_spec_model import CameraSpec
+from model.render_profile_model import RenderProfile
+
+# glTF is Y-up, the Blender importer converts to Z-up as (x, -z, y)
+GLTF_TO_BLENDER_AXES = np.array([[1, 0, 0], [0, 0, -1], [0, 1, 0]], dtype=np.float64)
 
 class GenerateImageService(object):
     _instance = None
     _material_property_paths = []
+    _session_render_profile: RenderProfile = None
+    _session_scene = None
+    _session_camera = None
 
     def __new__(cls, *args, **kwargs):
         if not isinstance(cls._instance, cls):
             cls._instance = object.__new__(cls, *args, **kwargs)
 
         return cls._instance
-    
-    def generate_image(
-            self, 
-            input_glb_path: str, 
-            output_image_path: str, 
-            camera_lenses: int,
-            camera_distance: float = 1.3, 
-            horizontal_rotate_direction: Literal['cw', 'ccw'] = 'cw', 
-            horizontal_rotate_degree: float = 0,
-            vertical_rotate_direction: Literal['u', 'd'] = 'u', 
-            vertical_rotate_degree: float = 0
-        ):
-        bpy.ops.wm.read_factory_settings(use_empty=True)
-        bpy.ops.import_scene.gltf(filepath=input_glb_path)
 
+    def __compute_bounds_from_accessors(self, input_glb_path: str) -> tuple[mathutils.Vector, mathutils.Vector] | None:
+        try:
+            bounds = position_bounds(read_glb_json(input_glb_path))
+        except (OSError, ValueError, KeyError, IndexError):
+            return None
+        if bounds is None:
+            return None
+
+        corners = np.array(bounds) @ GLTF_TO_BLENDER_AXES.T
+        return mathutils.Vector(corners.min(axis=0)), mathutils.Vector(corners.max(axis=0))
+
+    def __compute_bounds_from_vertices(self, scene) -> tuple[mathutils.Vector, mathutils.Vector]:
+        object_mins, object_maxs = [], []
+        for obj in scene.objects:
+            if obj.type != 'MESH':
+                continue
+            vertex_count = len(obj.data.vertices)
+            if vertex_count == 0:
+                continue
+
+            coords = np.empty(vertex_count * 3, dtype=np.float32)
+            obj.data.vertices.foreach_get("co", coords)
+            coords = coords.reshape(-1, 3).astype(np.float64)
+
+            matrix_world = np.array(obj.matrix_world, dtype=np.float64)
+            global_coords = coords @ matrix_world[:3, :3].T + matrix_world[:3, 3]
+            object_mins.append(global_coords.min(axis=0))
+            object_maxs.append(global_coords.max(axis=0))
+
+        min_coords = np.min(object_mins, axis=0)
+        max_coords = np.max(object_maxs, axis=0)
+        return mathutils.Vector(min_coords), mathutils.Vector(max_coords)
+
+    def __compute_bounds(self, input_glb_path: str, scene) -> tuple[mathutils.Vector, mathutils.Vector]:
+        bounds = self.__compute_bounds_from_accessors(input_glb_path)
+        if bounds is not None:
+            return bounds
+        return self.__compute_bounds_from_vertices(scene)
+
+    def __reset_scene(self, render_profile: RenderProfile):
+        bpy.ops.wm.read_factory_settings(use_empty=True)
         scene = bpy.context.scene
-        scene.render.engine = "CYCLES" #CYCLES # BLENDER_EEVEE
+        self.__setup_render(scene, render_profile)
+        self.__setup_world(scene)
+        return scene
+
+    def __get_session(self, render_profile: RenderProfile):
+        # keep the scene, world and camera alive between batches rendered with the same profile
+        if self._session_scene is None or self._session_render_profile != render_profile:
+            self._session_scene = self.__reset_scene(render_profile)
+            self._session_camera = self.__create_camera(self._session_scene)
+            self._session_render_profile = render_profile
+        return self._session_scene, self._session_camera
+
+    def __set_render_engine(self, scene, engine: str):
+        try:
+            scene.render.engine = engine
+        except TypeError:
+            # Blender 4.2+ renamed EEVEE
+            if engine != "BLENDER_EEVEE":
+                raise
+            scene.render.engine = "BLENDER_EEVEE_NEXT"
+
+    def __setup_render(self, scene, render_profile: RenderProfile):
+        self.__set_render_engine(scene, render_profile.engine)
         scene.render.image_settings.file_format = "PNG"
-        scene.render.filepath = output_image_path
         scene.render.film_transparent = True
-        scene.render.resolution_x = 1920
-        scene.render.resolution_y = 1080
-        scene.render.resolution_percentage = 100
+        scene.render.resolution_x = render_profile.resolution_x
+        scene.render.resolution_y = render_profile.resolution_y
+        scene.render.resolution_percentage = render_profile.resolution_percentage
+
+        if render_profile.engine == "CYCLES":
+            if render_profile.samples is not None:
+                scene.cycles.samples = render_profile.samples
+            scene.cycles.use_denoising = render_profile.use_denoising
+            scene.cycles.use_adaptive_sampling = render_profile.use_adaptive_sampling
+            if render_profile.adaptive_threshold is not None:
+                scene.cycles.adaptive_threshold = render_profile.adaptive_threshold
+        elif render_profile.engine == "BLENDER_EEVEE":
+            if render_profile.samples is not None:
+                scene.eevee.taa_render_samples = render_profile.samples
+        elif render_profile.engine == "BLENDER_WORKBENCH":
+            scene.display.shading.light = "STUDIO"
+            scene.display.shading.color_type = "MATERIAL"
 
+    def __setup_world(self, scene):
         world = scene.world
         if not world:
             world = bpy.data.worlds.new("World")
@@ -45,22 +121,41 @@ class GenerateImageService(object):
         bg.inputs[0].default_value = (0.8, 0.8, 0.8, 1)
         bg.inputs[1].default_value = 1.0
 
-        min_coords, max_coords = None, None
-        for obj in scene.objects:
-            if obj.type == 'MESH':
-                for vertex in obj.data.vertices:
-                    global_vertex = obj.matrix_world @ vertex.co
-                    if min_coords is None:
-                        min_coords = global_vertex.copy()
-                        max_coords = global_vertex.copy()
-                    else:
-                        min_coords = mathutils.Vector((min(min_coords[i], global_vertex[i]) for i in range(3)))
-                        max_coords = mathutils.Vector((max(max_coords[i], global_vertex[i]) for i in range(3)))
+    def __create_camera(self, scene):
+        camera_data = bpy.data.cameras.new("Camera")
+        camera = bpy.data.objects.new("Camera", camera_data)
+        camera.data.clip_start = 0.1
+        camera.data.clip_end = 3000
+
+        scene.collection.objects.link(camera)
+        scene.camera = camera
+        return camera
+
+    def __import_model(self, scene, input_glb_path: str) -> list:
+        existing_objects = set(scene.objects)
+        bpy.ops.import_scene.gltf(filepath=input_glb_path)
+        return [obj for obj in scene.objects if obj not in existing_objects]
+
+    def __remove_model(self, model_objects: list):
+        for obj in model_objects:
+            bpy.data.objects.remove(obj, do_unlink=True)
+        # drop the meshes, materials and images the removed objects were holding
+        bpy.data.orphans_purge(do_recursive=True)
 
+    def __place_camera(
+            self,
+            camera,
+            min_coords: mathutils.Vector,
+            max_coords: mathutils.Vector,
+            camera_spec: CameraSpec,
+        ):
         center = (min_coords + max_coords) / 2
         size = max_coords - min_coords
         max_dimension = max(size)
 
+        horizontal_rotate_degree = camera_spec.horizontal_rotate_degree
+        vertical_rotate_degree = camera_spec.vertical_rotate_degree
+
         def look_at(obj, target):
             direction = target - obj.location
             horizontal_rotation = direction.to_track_quat('-Z', 'Y').to_euler()
@@ -74,9 +169,9 @@ class GenerateImageService(object):
             vertical_distance = math.sqrt(camera.location.z ** 2 + horizontal_distance ** 2)
 
             # cw (+) ccw (-)
-            horizontal_rotate_direction_factor = 1 if horizontal_rotate_direction == 'cw' else -1
+            horizontal_rotate_direction_factor = 1 if camera_spec.horizontal_rotate_direction == 'cw' else -1
             # upward (+) downward (-)
-            vertical_rotate_direction_factor = 1 if vertical_rotate_direction == 'u' else -1
+            vertical_rotate_direction_factor = 1 if camera_spec.vertical_rotate_direction == 'u' else -1
             new_horizontal_angle = current_horizontal_angle + (math.radians(horizontal_rotate_degree) * horizontal_rotate_direction_factor)
             new_vertical_angle = current_vertical_angle + (math.radians(vertical_rotate_degree) * vertical_rotate_direction_factor)
             new_x = horizontal_distance * math.cos(new_horizontal_angle)
@@ -91,19 +186,99 @@ class GenerateImageService(object):
             camera.rotation_euler[2] += (math.radians(horizontal_rotate_degree) * horizontal_rotate_direction_factor)
             # vertical rotation
             camera.rotation_euler[0] += (math.radians(vertical_rotate_degree) * vertical_rotate_direction_factor)
-                       
-        camera_data = bpy.data.cameras.new("Camera")
-        camera = bpy.data.objects.new("Camera", camera_data)
-        camera.data.clip_start = 0.1
-        camera.data.clip_end = 3000
-
-        scene.collection.objects.link(camera)
-        scene.camera = camera
 
-        distance = max_dimension * camera_distance
-        camera_data.lens = camera_lenses # 클수록 확대
+        distance = max_dimension * camera_spec.camera_distance
+        camera.data.lens = camera_spec.camera_lenses # 클수록 확대
         camera.location = center + mathutils.Vector((0, -distance, size.z / 2))
 
         look_at(camera, center)
 
-        bpy.ops.render.render(write_still=True)
\ No newline at end of file
+    def __render(self, scene, output_image_path: str) -> float:
+        scene.render.filepath = output_image_path
+        start_time = time.perf_counter()
+        bpy.ops.render.render(write_still=True)
+        render_seconds = time.perf_counter() - start_time
+        print(f"Rendered: {output_image_path} ({render_seconds:.2f}s)")
+        return render_seconds
+
+    def generate_image(
+            self, 
+            input_glb_path: str, 
+            output_image_path: str, 
+            camera_lenses: int,
+            camera_distance: float = 1.3, 
+            horizontal_rotate_direction: Literal['cw', 'ccw'] = 'cw', 
+            horizontal_rotate_degree: float = 0,
+            vertical_rotate_direction: Literal['u', 'd'] = 'u', 
+            vertical_rotate_degree: float = 0,
+            render_profile: RenderProfile = None,
+        ) -> float:
+        self._session_scene = None
+        scene = self.__reset_scene(render_profile if render_profile is not None else RenderProfile())
+        self.__import_model(scene, input_glb_path)
+        camera = self.__create_camera(scene)
+
+        min_coords, max_coords = self.__compute_bounds(input_glb_path, scene)
+        camera_spec = CameraSpec(
+            camera_lenses=camera_lenses,
+            camera_distance=camera_distance,
+            horizontal_rotate_direction=horizontal_rotate_direction,
+            horizontal_rotate_degree=horizontal_rotate_degree,
+            vertical_rotate_direction=vertical_rotate_direction,
+            vertical_rotate_degree=vertical_rotate_degree,
+        )
+        self.__place_camera(camera, min_coords, max_coords, camera_spec)
+        return self.__render(scene, output_image_path)
+
+    def __image_base_names(self, input_glb_paths: list[str]) -> dict[str, str]:
+        # inputs from different directories can share a file name, those get a hash of their path
+        # so their images do not overwrite each other in the shared output directory
+        base_names = {
+            input_glb_path: os.path.splitext(os.path.basename(input_glb_path))[0]
+            for input_glb_path in input_glb_paths
+        }
+        paths_by_base_name = {}
+        for input_glb_path, base_name in base_names.items():
+            paths_by_base_name.setdefault(base_name, set()).add(os.path.abspath(input_glb_path))
+        for input_glb_path, base_name in base_names.items():
+            if len(paths_by_base_name[base_name]) > 1:
+                path_hash = hashlib.sha1(os.path.abspath(input_glb_path).encode("utf-8")).hexdigest()[:8]
+                base_names[input_glb_path] = f"{base_name}_{path_hash}"
+        return base_names
+
+    def generate_images(
+            self,
+            input_glb_paths: list[str],
+            output_dir: str,
+            camera_specs: list[CameraSpec],
+            render_profile: RenderProfile = None,
+        ) -> dict[str, list[dict]]:
+        os.makedirs(output_dir, exist_ok=True)
+
+        scene, camera = self.__get_session(render_profile if render_profile is not None else RenderProfile())
+
+        rendered_images = {}
+        total_render_seconds = 0.0
+        base_names = self.__image_base_names(input_glb_paths)
+        for input_glb_path in input_glb_paths:
+            base_name = base_names[input_glb_path]
+            model_objects = self.__import_model(scene, input_glb_path)
+            min_coords, max_coords = self.__compute_bounds(input_glb_path, scene)
+
+            rendered_images[input_glb_path] = []
+            for view_index, camera_spec in enumerate(camera_specs):
+                output_image_path = os.path.join(output_dir, f"{base_name}_view_{view_index + 1}.png")
+                self.__place_camera(camera, min_coords, max_coords, camera_spec)
+                render_seconds = self.__render(scene, output_image_path)
+                total_render_seconds += render_seconds
+                rendered_images[input_glb_path].append({
+                    "image_path": output_image_path,
+                    "render_seconds": render_seconds,
+                })
+
+            self.__remove_model(model_objects)
+
+        render_count = sum(len(images) for images in rendered_images.values())
+        if render_count > 0:
+            print(f"Rendered {render_count} images in {total_render_seconds:.2f}s ({total_render_seconds / render_count:.2f}s per image)")
+        return rendered_images
@@ -1,12 +1,10 @@
 import os
-import json
-import ifcopenshell
-import ifcopenshell.geom
 import struct
 import numpy as np
-from ifcopenshell.entity_instance import entity_instance
 from types import SimpleNamespace
-from functools import partial
+from functools import lru_cache, partial
+from typing import TYPE_CHECKING
+from collections.abc import Mapping
 from pygltflib import (
     GLTF2,
     Buffer,
@@ -36,21 +34,37 @@ from pygltflib import (
 from model.ifc_tree_structure_model import IfcTreeStructure
 from utils import to_dict, extract_non_null_attributes
 from service.batch_table_service import BatchTableService
-
-settings = ifcopenshell.geom.settings()
-settings.set(settings.USE_WORLD_COORDS, True)
-# settings.set(settings.INCLUDE_CURVES, True)
-settings.set(settings.STRICT_TOLERANCE, True)
-settings.set(settings.USE_ELEMENT_GUIDS, True)
-settings.set(settings.APPLY_DEFAULT_MATERIALS, True)
+from service.instrumentation_service import InstrumentationService
+from utils.glb_writer import write_glb, build_glb_chunks
+from utils.output_sink import OutputSink, LocalOutputSink
+from model.batch_table_index_model import BatchTableIndex
+from model.batch_table_mapping_model import BatchTableMapping
+from model.batch_table_columns_model import StringColumn, encode_string_column
+
+if TYPE_CHECKING:
+    from ifcopenshell.entity_instance import entity_instance
+
+
+@lru_cache(maxsize=None)
+def geometry_settings():
+    # ifcopenshell is only loaded once an IFC file is actually converted
+    import ifcopenshell.geom
+    settings = ifcopenshell.geom.settings()
+    settings.set(settings.USE_WORLD_COORDS, True)
+    # settings.set(settings.INCLUDE_CURVES, True)
+    settings.set(settings.STRICT_TOLERANCE, True)
+    settings.set(settings.USE_ELEMENT_GUIDS, True)
+    settings.set(settings.APPLY_DEFAULT_MATERIALS, True)
+    return settings
 
 
 class IfcService(object):
     _instance = None
     _batch_table_service: BatchTableService
+    _instrumentation_service: InstrumentationService
     _mesh_name_mapping: dict[str, str]
     _batch_table: dict[str, list]
-    _batch_table_mapping: dict
+    _batch_table_mapping: BatchTableMapping
     exclude_keys: list[str] = ["representation", "objectPlacement", "ownerHistory"]
 
     def __new__(cls, *args, **kwargs):
@@ -61,40 +75,57 @@ class IfcService(object):
     
     def __init__(self):
         self._batch_table_service = BatchTableService()
+        self._instrumentation_service = InstrumentationService()
         
     
     def __make_shape(self) -> partial:
-        return partial(ifcopenshell.geom.create_shape, settings=settings)
+        import ifcopenshell.geom
+        return partial(ifcopenshell.geom.create_shape, settings=geometry_settings())
                 
     def ifc_to_glb(
       self,
       input_ifc_path: str, 
       output_dir: str,
       output_base_filename: str,
+      output_sink: OutputSink = None,
     ) -> tuple[dict[str, list], dict, dict[str, str]]:
         
-      ifc_file = ifcopenshell.open(input_ifc_path)
-
-      products = ifc_file.by_type("IfcProduct")
-
-      project = products[0]
-
-      self._mesh_name_mapping = {}
-      batch_table, batch_table_mapping = self._batch_table_service.init_batch_table_keys(project)
-      self._batch_table, self._batch_table_mapping = batch_table, batch_table_mapping
-
-      ifc_create_shape = self.__make_shape()
-      tree = IfcTreeStructure(project, ifc_create_shape) 
-      gltf: GLTF2 = self.__to_glb(tree)
-
-      gltf.save(f"{output_dir}/{output_base_filename}.glb")
-      self._batch_table_service.save_batch_table(output_dir, output_base_filename, batch_table, batch_table_mapping)
-      self.__save_mesh_name_mapping(output_dir, output_base_filename, self._mesh_name_mapping)
+      import ifcopenshell
+
+      if output_sink is None:
+        output_sink = LocalOutputSink(output_dir)
+
+      with self._instrumentation_service.stage("ifc_to_glb"):
+        with self._instrumentation_service.stage("ifc.open"):
+          ifc_file = ifcopenshell.open(input_ifc_path)
+
+        products = ifc_file.by_type("IfcProduct")
+
+        project = products[0]
+
+        self._mesh_name_mapping = {}
+        batch_table, batch_table_mapping = self._batch_table_service.init_batch_table_keys(project)
+        self._batch_table, self._batch_table_mapping = batch_table, batch_table_mapping
+
+        ifc_create_shape = self.__make_shape()
+        with self._instrumentation_service.stage("ifc.tessellate"):
+          tree = IfcTreeStructure(project, ifc_create_shape) 
+        with self._instrumentation_service.stage("ifc.to_glb"):
+          gltf: GLTF2 = self.__to_glb(tree)
+
+        with self._instrumentation_service.stage("ifc.save_glb") as stage:
+          chunks, _ = build_glb_chunks(gltf, f"{output_dir}/{output_base_filename}.glb")
+          stage.add_bytes(output_sink.write(f"{output_base_filename}.glb", chunks))
+        with self._instrumentation_service.stage("ifc.save_batch_table") as stage:
+          stage.add_bytes(self._batch_table_service.save_batch_table(
+            output_dir, output_base_filename, batch_table, batch_table_mapping, output_sink=output_sink
+          ))
+        with self._instrumentation_service.stage("ifc.save_mesh_name_mapping") as stage:
+          stage.add_bytes(self.__save_mesh_name_mapping(output_sink, output_base_filename, self._mesh_name_mapping))
       return self._batch_table, self._batch_table_mapping, self._mesh_name_mapping
     
-    def __save_mesh_name_mapping(self, output_dir: str, output_filename: str, mesh_name_mapping: dict[str, str]):
-        with open(f'{output_dir}/{output_filename}_mesh_name_mapping.json', 'w') as f:
-            json.dump(mesh_name_mapping, f, indent=2)
+    def __save_mesh_name_mapping(self, output_sink: OutputSink, output_filename: str, mesh_name_mapping: dict[str, str]) -> int:
+        return output_sink.write_json(f"{output_filename}_mesh_name_mapping.json", mesh_name_mapping)
 
     def __to_glb(self, mesh_tree: IfcTreeStructure):
         materials = []
@@ -257,44 +288,49 @@ class IfcService(object):
         return mesh, bufferViews, accessors, binary_blobs
   
     def merge_metadata(self, output_dir:str, base_name: str):
-        with open(f"{output_dir}/{base_name}_batch_table.json", "r") as f:
-          batch_table = json.load(f)
-        with open(f"{output_dir}/{base_name}_batch_table_mapping.json", "r") as f:
-          batch_table_mapping = json.load(f)
-        with open(f"{output_dir}/{base_name}_mesh_name_mapping.json", "r") as f:
-          mesh_name_mapping = json.load(f)
+        batch_table, batch_table_mapping, mesh_name_mapping = (
+            self._batch_table_service.load_metadata(f"{output_dir}/{base_name}")
+        )
 
-        original_gltf = GLTF2().load(f"{output_dir}/{base_name}.glb")
+        try:
+            original_gltf = GLTF2().load(f"{output_dir}/{base_name}.glb")
 
-        structural_metadata_output, structural_metadata_buffer_data_output = (
-              self.create_structural_metadata(original_gltf, batch_table, True)
-          )
+            structural_metadata_output, structural_metadata_buffer_data_output = (
+                  self.create_structural_metadata(original_gltf, batch_table, True)
+              )
 
-        self.add_structural_metadata_to_gltf(
-            gltf=original_gltf,
-            bin_filename=f"{base_name}_feature_metadata_buffer.bin",
-            output_dir=output_dir,
-            structural_metadata=structural_metadata_output,
-            structural_metadata_buffer_data=structural_metadata_buffer_data_output,
-            save=True,
-        )
+            self.add_structural_metadata_to_gltf(
+                gltf=original_gltf,
+                bin_filename=f"{base_name}_feature_metadata_buffer.bin",
+                output_dir=output_dir,
+                structural_metadata=structural_metadata_output,
+                structural_metadata_buffer_data=structural_metadata_buffer_data_output,
+                save=True,
+            )
 
-        self.generate_feature_data(
-            gltf=original_gltf,
-            output_dir=output_dir,
-            output_path=f"{base_name}_feature_ids_buffer.bin",
-            batch_table=batch_table,
-            batch_table_mapping=batch_table_mapping,
-            mesh_name_mapping=mesh_name_mapping
-        )
+            feature_ids_buffer_data = self.generate_feature_data(
+                gltf=original_gltf,
+                output_dir=output_dir,
+                output_path=f"{base_name}_feature_ids_buffer.bin",
+                batch_table=batch_table,
+                batch_table_mapping=batch_table_mapping,
+                mesh_name_mapping=mesh_name_mapping
+            )
         
-        gltf_filename = f"{base_name}_merged_with_metadata.glb"
-        output_file_path = os.path.join(output_dir, gltf_filename)
-        original_gltf.save(output_file_path)
-        print(f"Saved: {output_file_path}")
+            gltf_filename = f"{base_name}_merged_with_metadata.glb"
+            output_file_path = os.path.join(output_dir, gltf_filename)
+            buffers_data = [None] * len(original_gltf.buffers)
+            buffers_data[-2] = structural_metadata_buffer_data_output
+            buffers_data[-1] = feature_ids_buffer_data
+            write_glb(original_gltf, output_file_path, buffers_data)
+            print(f"Saved: {output_file_path}")
+        finally:
+            if isinstance(batch_table_mapping, BatchTableIndex):
+                batch_table_mapping.close()
         return True
 
     def __extract_height(self, ifc_element):
+        import ifcopenshell.geom
         try:
             settings = ifcopenshell.geom.settings()
             shape = ifcopenshell.geom.create_shape(settings, ifc_element)
@@ -328,7 +364,7 @@ class IfcService(object):
         return ', '.join(address_lines)
     
 
-    def __get_wbs_data(self, element: entity_instance) -> str:
+    def __get_wbs_data(self, element: "entity_instance") -> str:
         for rel in element.IsDefinedBy:
           if rel.is_a("IfcRelDefinesByProperties"):
               prop_set = rel.RelatingPropertyDefinition
@@ -353,27 +389,29 @@ class IfcService(object):
         return element_data
     
     def create_structural_metadata(self, gltf: GLTF2, batch_table: dict, save=True) -> tuple[dict, bytearray]:
+      string_columns = {
+          key: encode_string_column(values) if save else None
+          for key, values in batch_table.items()
+          if values
+      }
+      return self.create_string_structural_metadata(gltf, string_columns, len(batch_table["globalId"]))
+
+    def create_string_structural_metadata(
+        self,
+        gltf: GLTF2,
+        string_columns: dict[str, StringColumn | None],
+        count: int,
+    ) -> tuple[dict, bytearray]:
+      # every column is an encoded STRING property, a column without encoded values is only declared
       structural_metadata_buffer_data = bytearray()
 
-      def add_string_buffer_view_and_accessor(strings) -> tuple[int, int]:
-          offsets = []
+      def add_string_buffer_view_and_accessor(string_column: StringColumn) -> tuple[int, int]:
+          string_data, offsets = string_column
           byte_offset = len(structural_metadata_buffer_data)
-          current_offset = 0
-
-          for string in strings:
-              if not string:
-                  string = ""
-              elif isinstance(string, dict):
-                  string = json.dumps(string)
-              elif isinstance(string, int):
-                  string = str(string)
-              encoded_string = string.encode("utf-8")
-              structural_metadata_buffer_data.extend(encoded_string)
-              offsets.append(current_offset)
-              current_offset += len(encoded_string)
+          current_offset = len(string_data)
           if current_offset == 0:
               return 0, 0
-          offsets.append(current_offset)
+          structural_metadata_buffer_data.extend(string_data)
 
           string_buffer_view = BufferView(
               buffer=len(gltf.buffers),
@@ -393,7 +431,7 @@ class IfcService(object):
           )
           gltf.accessors.append(string_accessor)
 
-          offsets_data = struct.pack(f"<{len(offsets)}I", *offsets)
+          offsets_data = offsets.astype("<u4").tobytes()
           offsets_byte_offset = len(structural_metadata_buffer_data)
           structural_metadata_buffer_data.extend(offsets_data)
 
@@ -419,7 +457,7 @@ class IfcService(object):
 
       property_tables = {
           "class": "class_batch_table",
-          "count": len(batch_table["globalId"]),
+          "count": count,
           "properties": {},
       }
 
@@ -430,14 +468,9 @@ class IfcService(object):
               "classes": {"class_batch_table": {"properties": {}}},
           },
       }
-      for key in batch_table:
-          if not batch_table[key]:
-              continue
-
-          if save:
-              accessor, string_offset = add_string_buffer_view_and_accessor(
-                  batch_table[key]
-              )
+      for key, string_column in string_columns.items():
+          if string_column is not None:
+              accessor, string_offset = add_string_buffer_view_and_accessor(string_column)
               if accessor == 0 and string_offset == 0:
                   continue
               property_tables["properties"][key] = {
@@ -466,6 +499,7 @@ class IfcService(object):
         structural_metadata: dict,
         structural_metadata_buffer_data,
         save=True,
+        output_sink: OutputSink = None,
     ):
         if not gltf.extensionsUsed:
             gltf.extensionsUsed = []
@@ -486,17 +520,16 @@ class IfcService(object):
             )
             gltf.buffers.append(buffer)
 
-            with open(f"{output_dir}/{bin_filename}", "wb") as f:
-                f.write(structural_metadata_buffer_data)
+            if output_sink is None:
+                output_sink = LocalOutputSink(output_dir)
+            output_sink.write(bin_filename, [structural_metadata_buffer_data])
 
     def generate_feature_data_helper(
         self,
         gltf: GLTF2,
         feature_ids_buffer_data: bytearray,
-        mesh_index: int,
+        feature_id: int,
         mesh: Mesh,
-        batch_table: dict,
-        batch_table_mapping: dict,
         mesh_name_mapping: dict[str, str]
     ):
         for primitive_index, primitive in enumerate(mesh.primitives):
@@ -509,10 +542,6 @@ class IfcService(object):
             position_accessor: Accessor = gltf.accessors[position_accessor_index]
             vertex_count: int = position_accessor.count
 
-            mapping_key = mesh.name + str(mesh_index)
-            batch_data = batch_table_mapping[mapping_key]
-            feature_id = batch_data["batchId"]
-
             mesh.name = mesh_name_mapping[mesh.name]
 
             feature_ids_replicated = [feature_id] * vertex_count
@@ -610,23 +639,24 @@ class IfcService(object):
             output_dir: str,
             output_path: str,
             batch_table: dict,
-            batch_table_mapping: dict,
-            mesh_name_mapping: dict[str, str]
-        ):
+            batch_table_mapping: Mapping,
+            mesh_name_mapping: dict[str, str],
+            output_sink: OutputSink = None,
+        ) -> bytearray:
         feature_ids_buffer_data = bytearray()
         for mesh_index, mesh in enumerate(gltf.meshes):
             self.generate_feature_data_helper(
                 gltf=gltf,
                 feature_ids_buffer_data=feature_ids_buffer_data,
-                mesh_index=mesh_index,
+                feature_id=batch_table_mapping[mesh_index]["batchId"],
                 mesh=mesh,
-                batch_table=batch_table,
-                batch_table_mapping=batch_table_mapping,
                 mesh_name_mapping=mesh_name_mapping,
             )
 
         feature_id_buffer = Buffer(uri=output_path, byteLength=len(feature_ids_buffer_data))
         gltf.buffers.append(feature_id_buffer)
 
-        with open(f"{output_dir}/{output_path}", "wb") as f:
-            f.write(feature_ids_buffer_data)
\ No newline at end of file
+        if output_sink is None:
+            output_sink = LocalOutputSink(output_dir)
+        output_sink.write(output_path, [feature_ids_buffer_data])
+        return feature_ids_buffer_data
\ No newline at end of file
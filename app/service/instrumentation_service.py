@@ -0,0 +1,151 @@
+import os
+import sys
+import json
+import time
+import threading
+from typing import Callable
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def peak_rss_bytes() -> int:
+    if resource is None:
+        return 0
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # linux reports kilobytes, macOS bytes
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024
+
+
+class StageRecord(object):
+    __slots__ = ("bytes_written", "extra")
+
+    def __init__(self) -> None:
+        self.bytes_written = 0
+        self.extra = {}
+
+    def add_bytes(self, byte_count: int) -> None:
+        self.bytes_written += byte_count
+
+    def add_file(self, file_path: str) -> None:
+        self.bytes_written += os.path.getsize(file_path)
+
+
+class InstrumentationService(object):
+    _instance = None
+    _enabled: bool = False
+    _listener: Callable[[dict], None] = None
+    _records: list[dict]
+    _lock: threading.Lock
+    _local: threading.local
+
+    def __new__(cls, *args, **kwargs):
+        if not isinstance(cls._instance, cls):
+            cls._instance = object.__new__(cls, *args, **kwargs)
+            cls._instance._records = []
+            cls._instance._lock = threading.Lock()
+            cls._instance._local = threading.local()
+
+        return cls._instance
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    def enable(self) -> None:
+        self._enabled = True
+        self._records = []
+
+    def disable(self) -> None:
+        self._enabled = False
+
+    def set_listener(self, listener: Callable[[dict], None] = None) -> None:
+        # called with every finished stage record, also when the report itself is disabled
+        self._listener = listener
+
+    @contextmanager
+    def stage(self, name: str, tile: int = None):
+        record = StageRecord()
+        if not self._enabled and self._listener is None:
+            yield record
+            return
+
+        stack = self.__stack()
+        parent = stack[-1] if stack else None
+        stack.append(name)
+
+        start_rss = peak_rss_bytes()
+        start_cpu = time.process_time()
+        start_time = time.perf_counter()
+        try:
+            yield record
+        finally:
+            wall_seconds = time.perf_counter() - start_time
+            cpu_seconds = time.process_time() - start_cpu
+            end_rss = peak_rss_bytes()
+            stack.pop()
+
+            stage_record = {
+                "stage": name,
+                "parent": parent,
+                "wallSeconds": round(wall_seconds, 6),
+                "cpuSeconds": round(cpu_seconds, 6),
+                # the high-water mark is process wide, growth is how far this stage pushed it
+                "peakRssBytes": end_rss,
+                "peakRssGrowthBytes": end_rss - start_rss,
+                "bytesWritten": record.bytes_written,
+            }
+            if tile is not None:
+                stage_record["tile"] = tile
+            stage_record.update(record.extra)
+            if self._enabled:
+                with self._lock:
+                    self._records.append(stage_record)
+            if self._listener is not None:
+                self._listener(stage_record)
+
+    def report(self) -> dict:
+        with self._lock:
+            records = list(self._records)
+
+        summary = {}
+        for record in records:
+            stage_summary = summary.setdefault(record["stage"], {
+                "count": 0,
+                "wallSeconds": 0.0,
+                "cpuSeconds": 0.0,
+                "peakRssBytes": 0,
+                "bytesWritten": 0,
+            })
+            stage_summary["count"] += 1
+            stage_summary["wallSeconds"] = round(stage_summary["wallSeconds"] + record["wallSeconds"], 6)
+            stage_summary["cpuSeconds"] = round(stage_summary["cpuSeconds"] + record["cpuSeconds"], 6)
+            stage_summary["peakRssBytes"] = max(stage_summary["peakRssBytes"], record["peakRssBytes"])
+            stage_summary["bytesWritten"] += record["bytesWritten"]
+
+        return {
+            "peakRssBytes": peak_rss_bytes(),
+            "summary": summary,
+            "stages": [record for record in records if "tile" not in record],
+            "tiles": [record for record in records if "tile" in record],
+        }
+
+    def save_report(self, output_path: str) -> dict:
+        report = self.report()
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        with open(output_path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved: {output_path}")
+        return report
+
+    def __stack(self) -> list[str]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = []
+            self._local.stack = stack
+        return stack
@@ -0,0 +1,251 @@
+import os
+import time
+import signal
+import uuid
+import queue
+import threading
+import multiprocessing
+from multiprocessing.connection import Connection
+from model.service_job_model import ServiceJob, SERVICE_JOB_TYPES, FINISHED_JOB_STATUSES
+
+MAX_FINISHED_JOBS = 1000
+
+
+def _warm_up_worker() -> None:
+    # the expensive imports happen once when the worker starts, not per job
+    from service.conversion_service import ConversionService
+    ConversionService()
+    try:
+        from service.generate_image_service import GenerateImageService
+        GenerateImageService()
+    except ImportError:
+        # image jobs fail on their own when bpy is missing, conversions still work
+        pass
+
+
+def _run_service_job(job_type: str, params: dict):
+    if job_type == "convert":
+        from service.conversion_service import ConversionService
+        from model.conversion_job_model import ConversionJob
+        return ConversionService().convert(ConversionJob(**params)).model_dump(by_alias=True)
+
+    if job_type == "ifc_to_glb":
+        from service.ifc_service import IfcService
+        IfcService().ifc_to_glb(**params)
+        output_base_path = os.path.join(params["output_dir"], params["output_base_filename"])
+        return {
+            "glb": f"{output_base_path}.glb",
+            "batchTable": f"{output_base_path}_batch_table.json",
+            "batchTableMapping": f"{output_base_path}_batch_table_mapping.json",
+            "batchTableIndex": f"{output_base_path}_batch_table_mapping.sqlite",
+            "meshNameMapping": f"{output_base_path}_mesh_name_mapping.json",
+        }
+
+    if job_type == "split":
+        from service.tile_chunk_service import TileChunkService
+        from model.small_model_policy_model import SmallModelPolicy
+        params = dict(params)
+        small_model_tiles = params.pop("small_model_tiles", None)
+        if small_model_tiles is not None:
+            params["small_model_policy"] = SmallModelPolicy(max_tiles=small_model_tiles, max_nodes=None, requires_batch_table=False)
+        from utils.output_sink import open_output_sink, output_sink_kind
+        # output_path may be a directory, an archive, a .3tz or s3://, output_dir is the older name for a directory
+        output_path = params.pop("output_path", None) or params.pop("output_dir", "./outputs")
+        params.pop("output_dir", None)
+        params.setdefault("write_tileset", output_sink_kind(output_path) == "3tz")
+        with open_output_sink(output_path) as output_sink:
+            manifest = TileChunkService().split_model_by_nodes(output_sink=output_sink, **params)
+        return {"output": output_path, "manifest": manifest}
+
+    if job_type == "generate_image":
+        from service.generate_image_service import GenerateImageService
+        from model.render_profile_model import get_render_profile
+        params = dict(params)
+        if isinstance(params.get("render_profile"), dict):
+            params["render_profile"] = get_render_profile(**params["render_profile"])
+        render_seconds = GenerateImageService().generate_image(**params)
+        return {"outputImagePath": params["output_image_path"], "renderSeconds": render_seconds}
+
+    raise ValueError(f"Unknown job type: {job_type}")
+
+
+def _job_worker(connection: Connection) -> None:
+    from service.instrumentation_service import InstrumentationService
+    # ctrl-c reaches the whole process group, the server decides when workers stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _warm_up_worker()
+    # finished stages are forwarded as progress while a job runs
+    InstrumentationService().set_listener(lambda record: connection.send(("progress", record)))
+
+    while True:
+        try:
+            message = connection.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+
+        job_type, params = message
+        try:
+            connection.send(("succeeded", _run_service_job(job_type, params)))
+        except Exception as e:
+            connection.send(("failed", repr(e)))
+
+    # thumbnail workers started by a split in this worker go down with it
+    from service.tile_thumbnail_service import TileThumbnailService
+    TileThumbnailService().shutdown()
+
+
+class _WorkerSlot(object):
+    __slots__ = ("process", "connection", "job", "thread")
+
+    def __init__(self) -> None:
+        self.process = None
+        self.connection = None
+        self.job = None
+        self.thread = None
+
+
+class JobQueueService(object):
+    _instance = None
+    _jobs: dict[str, ServiceJob]
+    _queue: queue.Queue
+    _lock: threading.Lock
+    _slots: list[_WorkerSlot]
+
+    def __new__(cls, *args, **kwargs):
+        if not isinstance(cls._instance, cls):
+            cls._instance = object.__new__(cls, *args, **kwargs)
+            cls._instance._jobs = {}
+            cls._instance._queue = queue.Queue()
+            cls._instance._lock = threading.Lock()
+            cls._instance._slots = []
+
+        return cls._instance
+
+    @property
+    def worker_count(self) -> int:
+        return len(self._slots)
+
+    def start(self, max_workers: int = 2) -> None:
+        if self._slots:
+            return
+
+        for _ in range(max_workers):
+            slot = _WorkerSlot()
+            self.__spawn_worker(slot)
+            slot.thread = threading.Thread(target=self.__serve, args=(slot,), daemon=True)
+            slot.thread.start()
+            self._slots.append(slot)
+
+    def submit(self, job_type: str, params: dict) -> ServiceJob:
+        if job_type not in SERVICE_JOB_TYPES:
+            raise ValueError(f"Unknown job type: {job_type}. Choose from {', '.join(SERVICE_JOB_TYPES)}")
+
+        job = ServiceJob(id=uuid.uuid4().hex, type=job_type, params=params, created_at=time.time())
+        with self._lock:
+            self.__prune_finished_jobs()
+            self._jobs[job.id] = job
+            job_snapshot = job.model_copy(deep=True)
+        self._queue.put(job)
+        return job_snapshot
+
+    def get(self, job_id: str) -> ServiceJob | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.model_copy(deep=True) if job is not None else None
+
+    def list_jobs(self) -> list[ServiceJob]:
+        with self._lock:
+            return [job.model_copy(deep=True) for job in self._jobs.values()]
+
+    def cancel(self, job_id: str) -> ServiceJob | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job.status in FINISHED_JOB_STATUSES:
+                return job.model_copy(deep=True)
+
+            was_running = job.status == "running"
+            job.status = "cancelled"
+            job.finished_at = time.time()
+            if was_running:
+                # a running job can only be stopped with its process, the slot spawns a fresh worker
+                for slot in self._slots:
+                    if slot.job is job:
+                        slot.process.terminate()
+            return job.model_copy(deep=True)
+
+    def shutdown(self) -> None:
+        for _ in self._slots:
+            self._queue.put(None)
+        for slot in self._slots:
+            slot.thread.join()
+        self._slots = []
+
+    def __spawn_worker(self, slot: _WorkerSlot) -> None:
+        # spawned like the other worker pools, bpy and ifcopenshell are not fork safe
+        context = multiprocessing.get_context("spawn")
+        parent_connection, child_connection = context.Pipe()
+        slot.process = context.Process(target=_job_worker, args=(child_connection,), daemon=True)
+        slot.process.start()
+        child_connection.close()
+        slot.connection = parent_connection
+
+    def __serve(self, slot: _WorkerSlot) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                slot.connection.send(None)
+                slot.process.join()
+                return
+
+            with self._lock:
+                # cancelled while it was still queued
+                if job.status != "queued":
+                    continue
+                job.status = "running"
+                job.started_at = time.time()
+                slot.job = job
+
+            try:
+                slot.connection.send((job.type, job.params))
+                while True:
+                    kind, payload = slot.connection.recv()
+                    with self._lock:
+                        if kind == "progress":
+                            self.__update_progress(job, payload)
+                            continue
+                        self.__finish(job, kind, payload)
+                    break
+            except (EOFError, OSError):
+                with self._lock:
+                    self.__finish(job, "failed", "worker process exited")
+                slot.process.join()
+                self.__spawn_worker(slot)
+            finally:
+                slot.job = None
+
+    def __update_progress(self, job: ServiceJob, record: dict) -> None:
+        job.progress.stage = record["stage"]
+        if "tiles" in record:
+            job.progress.tiles = record["tiles"]
+        if record["stage"] == "tile.write":
+            job.progress.tiles_written += 1
+
+    def __finish(self, job: ServiceJob, status: str, payload) -> None:
+        # a cancelled job keeps its status even when the worker answered just before it was stopped
+        if job.status != "running":
+            return
+        job.status = status
+        job.finished_at = time.time()
+        if status == "succeeded":
+            job.result = payload
+        else:
+            job.error = payload
+
+    def __prune_finished_jobs(self) -> None:
+        finished_jobs = [job for job in self._jobs.values() if job.status in FINISHED_JOB_STATUSES]
+        for job in finished_jobs[:max(len(finished_jobs) - MAX_FINISHED_JOBS, 0)]:
+            del self._jobs[job.id]
@@ -0,0 +1,104 @@
+import os
+import json
+import socketserver
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from service.job_queue_service import JobQueueService
+from service.tile_thumbnail_service import TileThumbnailService
+
+
+class _ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class JobRequestHandler(BaseHTTPRequestHandler):
+    # GET /health, GET /jobs, POST /jobs, GET /jobs/<id>, DELETE /jobs/<id>
+    def do_GET(self) -> None:
+        job_queue_service = JobQueueService()
+        path = self.path.rstrip("/")
+        if path == "/health":
+            self.__send_json(HTTPStatus.OK, {"status": "ok", "workers": job_queue_service.worker_count})
+        elif path == "/jobs":
+            self.__send_json(HTTPStatus.OK, [job.model_dump(by_alias=True) for job in job_queue_service.list_jobs()])
+        elif path.startswith("/jobs/"):
+            job = job_queue_service.get(path[len("/jobs/"):])
+            if job is None:
+                self.__send_error(HTTPStatus.NOT_FOUND, "job not found")
+            else:
+                self.__send_json(HTTPStatus.OK, job.model_dump(by_alias=True))
+        else:
+            self.__send_error(HTTPStatus.NOT_FOUND, "not found")
+
+    def do_POST(self) -> None:
+        if self.path.rstrip("/") != "/jobs":
+            self.__send_error(HTTPStatus.NOT_FOUND, "not found")
+            return
+
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            job = JobQueueService().submit(body.get("type"), body.get("params", {}))
+        except (ValueError, AttributeError) as e:
+            self.__send_error(HTTPStatus.BAD_REQUEST, str(e))
+            return
+        self.__send_json(HTTPStatus.ACCEPTED, job.model_dump(by_alias=True))
+
+    def do_DELETE(self) -> None:
+        path = self.path.rstrip("/")
+        if not path.startswith("/jobs/"):
+            self.__send_error(HTTPStatus.NOT_FOUND, "not found")
+            return
+
+        job = JobQueueService().cancel(path[len("/jobs/"):])
+        if job is None:
+            self.__send_error(HTTPStatus.NOT_FOUND, "job not found")
+        else:
+            self.__send_json(HTTPStatus.OK, job.model_dump(by_alias=True))
+
+    def address_string(self) -> str:
+        # unix socket peers have no address tuple
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def __send_json(self, status: HTTPStatus, payload) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def __send_error(self, status: HTTPStatus, message: str) -> None:
+        self.__send_json(status, {"error": message})
+
+
+class JobServerService(object):
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if not isinstance(cls._instance, cls):
+            cls._instance = object.__new__(cls, *args, **kwargs)
+
+        return cls._instance
+
+    def serve(self, host: str = "127.0.0.1", port: int = 8765, socket_path: str = None, max_workers: int = 2) -> None:
+        job_queue_service = JobQueueService()
+        job_queue_service.start(max_workers)
+
+        if socket_path is not None:
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+            server = _ThreadingUnixHTTPServer(socket_path, JobRequestHandler)
+            print(f"Serving on unix:{socket_path}")
+        else:
+            server = ThreadingHTTPServer((host, port), JobRequestHandler)
+            print(f"Serving on http://{host}:{server.server_address[1]}")
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            job_queue_service.shutdown()
+            TileThumbnailService().shutdown()
+            if socket_path is not None and os.path.exists(socket_path):
+                os.unlink(socket_path)
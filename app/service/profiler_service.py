@@ -0,0 +1,122 @@
+import os
+import sys
+import time
+import pstats
+import cProfile
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+PROFILE_MODES = ("cprofile", "sampling")
+HOT_PATH_LIMIT = 20
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class _StackSampler(object):
+    # samples one thread's stack from a background thread, the profiled code runs at full speed in between
+    def __init__(self, thread_id: int, interval: float) -> None:
+        self._thread_id = thread_id
+        self._interval = interval
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self.__run, name="stack-sampler", daemon=True)
+        self.stacks = Counter()
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+    def __run(self) -> None:
+        while not self._stopped.wait(self._interval):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                continue
+
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+
+
+class ProfilerService(object):
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if not isinstance(cls._instance, cls):
+            cls._instance = object.__new__(cls, *args, **kwargs)
+
+        return cls._instance
+
+    @contextmanager
+    def profile(self, mode: str, output_dir: str, base_name: str, interval: float = 0.005):
+        if mode is None:
+            yield
+            return
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {mode}")
+
+        os.makedirs(output_dir, exist_ok=True)
+        if mode == "cprofile":
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                self.__save_cprofile(profiler, os.path.join(output_dir, f"{base_name}.prof"))
+            return
+
+        sampler = _StackSampler(threading.get_ident(), interval)
+        sampler.start()
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            sampler.stop()
+            self.__save_samples(
+                sampler.stacks,
+                os.path.join(output_dir, f"{base_name}.collapsed"),
+                time.perf_counter() - start_time,
+            )
+
+    def __save_cprofile(self, profiler: cProfile.Profile, output_path: str) -> None:
+        profiler.dump_stats(output_path)
+        print(f"Saved: {output_path}")
+
+        stats = pstats.Stats(profiler)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(HOT_PATH_LIMIT)
+        stats.sort_stats(pstats.SortKey.TIME).print_stats(HOT_PATH_LIMIT)
+
+    def __save_samples(self, stacks: Counter, output_path: str, elapsed: float) -> None:
+        # collapsed stacks, one "root;...;leaf count" line each, the input format of flamegraph.pl and speedscope
+        with open(output_path, "w") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        print(f"Saved: {output_path}")
+
+        total_samples = sum(stacks.values())
+        if total_samples == 0:
+            print(f"No samples taken in {elapsed:.2f}s")
+            return
+
+        self_samples = Counter()
+        inclusive_samples = Counter()
+        for stack, count in stacks.items():
+            frames = stack.split(";")
+            self_samples[frames[-1]] += count
+            # recursive functions are counted once per sample
+            for label in set(frames):
+                inclusive_samples[label] += count
+
+        print(f"{total_samples} samples in {elapsed:.2f}s")
+        for title, samples in (("inclusive", inclusive_samples), ("self", self_samples)):
+            print(f"Hot functions by {title} samples:")
+            for label, count in samples.most_common(HOT_PATH_LIMIT):
+                print(f"  {count / total_samples:7.1%}  {count:8d}  {label}")
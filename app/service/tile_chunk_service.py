@@ -1,7 +1,9 @@
 import os
 import copy
+import numpy as np
 
 from typing import Any
+from collections.abc import Mapping
 from pygltflib import (
     GLTF2,
     Scene,
@@ -20,13 +22,31 @@ from pygltflib import (
     Skin,
 )
 from service.ifc_service import IfcService
+from service.tile_thumbnail_service import TileThumbnailService
+from service.tile_partition_service import TilePartitionService, SplitMode
+from service.instrumentation_service import InstrumentationService
+from service.tileset_service import TilesetService
 
 from model.collected_info_model import CollectedInfo
+from model.lazy_gltf_model import LazyGLTF
+from model.batch_table_mapping_model import BatchTableMapping
+from model.batch_table_index_model import BatchTableIndex
+from model.batch_table_columns_model import BatchTableColumns, IndexedBatchTableColumns
+from utils.glb_writer import build_glb_chunks
+from utils.output_sink import OutputSink, LocalOutputSink
+from utils.background_writer import BackgroundWriter
+from utils.gltf_utils import node_local_matrix
+from model.thumbnail_options_model import ThumbnailOptions
+from model.small_model_policy_model import SmallModelPolicy
 
 class TileChunkService(object):
     _instance = None
     _material_property_paths = []
     _ifc_service: IfcService
+    _tile_thumbnail_service: TileThumbnailService
+    _tile_partition_service: TilePartitionService
+    _instrumentation_service: InstrumentationService
+    _tileset_service: TilesetService
 
     def __new__(cls, *args, **kwargs):
         if not isinstance(cls._instance, cls):
@@ -36,6 +56,10 @@ class TileChunkService(object):
 
     def __init__(self) -> None:
         self._ifc_service = IfcService()
+        self._tile_thumbnail_service = TileThumbnailService()
+        self._tile_partition_service = TilePartitionService()
+        self._instrumentation_service = InstrumentationService()
+        self._tileset_service = TilesetService()
         self._material_property_paths = [
             "pbrMetallicRoughness.baseColorTexture",
             "pbrMetallicRoughness.metallicRoughnessTexture",
@@ -45,32 +69,7 @@ class TileChunkService(object):
         ]
 
     def __init_collected_info(self):
-        return CollectedInfo(
-            nodes=[],
-            meshes=[],
-            materials=[],
-            textures=[],
-            images=[],
-            accessors=[],
-            buffers=[],
-            bufferViews=[],
-            animations=[],
-            scenes=[],
-            samplers=[],
-            skins=[],
-            scene_node_indices=[],
-            skins_indices={},
-            meshes_indices={},
-            material_indices={},
-            samplers_indices={},
-            images_indices={},
-            textures_indices={},
-            accessor_indices={},
-            bufferView_indices={},
-            node_indices=set(),
-            batch_table={},
-            batch_table_mapping={},
-        )
+        return CollectedInfo()
 
     def __collect_mesh_material_texture_info(
         self,
@@ -155,9 +154,7 @@ class TileChunkService(object):
             collected_info.images.append(image)
             collected_info.images_indices[source_index] = new_image_index
 
-            buffer = gltf.buffers[bufferView.buffer]
-            if buffer not in collected_info.buffers:
-                collected_info.buffers.append(buffer)
+            self.__add_buffer_for_bufferView(bufferView, gltf, collected_info)
 
     def __collect_mesh_material_texture_info_helper(
         self,
@@ -281,15 +278,13 @@ class TileChunkService(object):
             collected_info.bufferViews.append(bufferView)
             collected_info.bufferView_indices[accessor.bufferView] = new_bufferView_index
 
-            buffer = gltf.buffers[bufferView.buffer]
-            if buffer not in collected_info.buffers:
-                collected_info.buffers.append(buffer)
+            self.__add_buffer_for_bufferView(bufferView, gltf, collected_info)
 
     def __collect_mesh_info(
         self,
         current_node: Node,
         gltf: GLTF2,
-        batch_table_mapping: dict,
+        batch_table_columns: BatchTableColumns | IndexedBatchTableColumns,
         collected_info: CollectedInfo,
     ) -> None:
         if current_node.mesh is not None:
@@ -312,19 +307,8 @@ class TileChunkService(object):
                         collected_info=collected_info,
                     )
                 collected_info.meshes.append(mesh)
-            if gltf.extensions.get("EXT_structural_metadata") and batch_table_mapping:
-                mapping_key = mesh.name + str(current_node.mesh)
-                batch_data: dict = batch_table_mapping[mapping_key]
-                collected_info.batch_table_mapping[mapping_key] = {}
-                collected_info.batch_table["batchId"].append(current_node.mesh)
-
-                for key, value in batch_data.items():
-                  if key == "batchId":
-                    continue
-                  collected_info.batch_table[key].append(value)
-                  collected_info.batch_table_mapping[mapping_key][key] = value
-
-                collected_info.batch_table_mapping[mapping_key]["batchId"] = collected_info.meshes_indices[current_node.mesh]
+            if collected_info.batch_table_rows is not None and batch_table_columns is not None:
+                collected_info.batch_table_rows.append(batch_table_columns.row(current_node.mesh))
 
 
     def __collect_skin_info(
@@ -355,9 +339,7 @@ class TileChunkService(object):
                 collected_info.bufferView_indices[original_bufferView_index] = (
                     new_bufferView_index
                 )
-                buffer = gltf.buffers[origin_bufferView.buffer]
-                if buffer not in collected_info.buffers:
-                    collected_info.buffers.append(buffer)
+                self.__add_buffer_for_bufferView(origin_bufferView, gltf, collected_info)
 
             collected_info.accessors.append(skin_accessor)
             collected_info.accessor_indices[original_accessor_index] = (
@@ -374,9 +356,11 @@ class TileChunkService(object):
         gltf: GLTF2,
         node_index: int,
         split_size: int,
-        batch_table_mapping: dict,
+        batch_table_columns: BatchTableColumns | IndexedBatchTableColumns,
+        node_scene_indices: dict[int, list[int]],
         collected_info: CollectedInfo = None,
         parent_scene_indices: list = None,
+        tile_node_indices: set[int] = None,
     ) -> CollectedInfo:
         if collected_info is None:
             collected_info = self.__init_collected_info()
@@ -405,35 +389,34 @@ class TileChunkService(object):
         self.__collect_mesh_info(
             current_node=current_node,
             gltf=gltf,
-            batch_table_mapping=batch_table_mapping,
+            batch_table_columns=batch_table_columns,
             collected_info=collected_info,
         )
 
-        current_node_scene_indices = []
-        for i, scene in enumerate(gltf.scenes):
-            if node_index in scene.nodes:
-                current_node_scene_indices.append(i)
-                if scene not in collected_info.scenes:
-                    collected_info.scenes.append(scene)
+        current_node_scene_indices = node_scene_indices.get(node_index, [])
+        for scene_index in current_node_scene_indices:
+            if scene_index not in collected_info.scenes_indices:
+                collected_info.scenes_indices[scene_index] = len(collected_info.scenes)
+                collected_info.scenes.append(gltf.scenes[scene_index])
 
-        combined_scene_indices = list(
-            set(parent_scene_indices + current_node_scene_indices)
-        )
+        combined_scene_indices = set(parent_scene_indices).union(current_node_scene_indices)
 
         for scene_index in combined_scene_indices:
-            while len(collected_info.scene_node_indices) <= scene_index:
-                collected_info.scene_node_indices.append([])
-            collected_info.scene_node_indices[scene_index].append(node_index)
+            collected_info.scene_node_indices.setdefault(scene_index, []).append(node_index)
 
         if current_node.children is not None and len(current_node.children) > 0:
             for child_index in current_node.children:
+                if tile_node_indices is not None and child_index not in tile_node_indices:
+                    continue
                 if child_index not in collected_info.node_indices:
                     self.__collect_info(
                         gltf=gltf,
                         node_index=child_index,
                         split_size=split_size,
                         collected_info=collected_info,
-                        batch_table_mapping=batch_table_mapping
+                        batch_table_columns=batch_table_columns,
+                        node_scene_indices=node_scene_indices,
+                        tile_node_indices=tile_node_indices,
                     )
 
         return collected_info
@@ -635,15 +618,6 @@ class TileChunkService(object):
                 # )
             new_index = len(new_gltf.nodes)
 
-            for children_idx in node_copy.children:
-                child_node: Node = copy.deepcopy(original_gltf.nodes[children_idx])
-                if child_node.mesh is not None:
-                    origin_child_mesh_index = child_node.mesh
-                    child_node.mesh = mesh_index_map.get(origin_child_mesh_index, origin_child_mesh_index)
-                    # child_node.mesh = collected_info.meshes_indices.get(
-                    #     child_node.mesh, child_node.mesh
-                    # )
-
             node_children_temp[new_index] = node_copy.children
             node_copy.children = []
             new_gltf.nodes.append(node_copy)
@@ -715,7 +689,7 @@ class TileChunkService(object):
             mesh_copy: Mesh = copy.deepcopy(mesh)
             for primitive in mesh_copy.primitives:
 
-                if "material" in primitive.__dict__:
+                if primitive.material is not None:
                     material_index = primitive.material
                     original_material: Material = collected_info.materials[collected_info.material_indices.get(material_index, material_index)]
 
@@ -756,21 +730,21 @@ class TileChunkService(object):
         for animation in collected_info.animations:
             animation_copy: Animation = copy.deepcopy(animation)
 
+            # channels that drive nodes outside this tile would point at missing nodes
+            animation_copy.channels = [
+                channel
+                for channel in animation_copy.channels
+                if channel.target.node is None or channel.target.node in node_index_map
+            ]
             for channel in animation_copy.channels:
                 if channel.target.node is not None:
-                    channel.target.node = node_index_map.get(
-                        channel.target.node, channel.target.node
-                    )
-                    
+                    channel.target.node = node_index_map[channel.target.node]
+
             for sampler in animation_copy.samplers:
-                if collected_info.accessor_indices.get(sampler.input) is not None:
-                    sampler.input = accessor_index_map.get(
-                        collected_info.accessor_indices[sampler.input]
-                    )
-                if collected_info.accessor_indices.get(sampler.output) is not None:
-                    sampler.output = accessor_index_map.get(
-                        collected_info.accessor_indices[sampler.output]
-                    )
+                if sampler.input is not None:
+                    sampler.input = accessor_index_map.get(sampler.input, sampler.input)
+                if sampler.output is not None:
+                    sampler.output = accessor_index_map.get(sampler.output, sampler.output)
 
             new_gltf.animations.append(animation_copy)
 
@@ -794,14 +768,20 @@ class TileChunkService(object):
         node_index_map: dict,
     ) -> None:
         new_gltf.scenes = []
-        for scene_index, scene in enumerate(collected_info.scenes):
-            scene_copy: Scene = copy.deepcopy(scene)
+        for origin_scene_index, scene_index in collected_info.scenes_indices.items():
+            scene_copy: Scene = copy.deepcopy(collected_info.scenes[scene_index])
 
             updated_node_indices = []
-            for old_node_index in collected_info.scene_node_indices[scene_index]:
+            for old_node_index in collected_info.scene_node_indices.get(origin_scene_index, []):
                 new_node_index = node_index_map.get(old_node_index)
-                if new_node_index is not None:
-                    updated_node_indices.append(new_node_index)
+                if new_node_index is None:
+                    continue
+                root_matrix = collected_info.root_matrices.get(old_node_index)
+                if root_matrix is not None:
+                    # the ancestors stayed in another tile, a parent node carries their transform
+                    new_gltf.nodes.append(Node(matrix=root_matrix, children=[new_node_index]))
+                    new_node_index = len(new_gltf.nodes) - 1
+                updated_node_indices.append(new_node_index)
 
             scene_copy.nodes = updated_node_indices
 
@@ -927,6 +907,55 @@ class TileChunkService(object):
             node_index_map=node_index_map,
         )
 
+    def __references_bufferViews_elsewhere(self, new_gltf: GLTF2) -> bool:
+        # sparse accessors and extensions can point at bufferViews too, only accessors and images are remapped
+        def has_bufferView_key(value) -> bool:
+            if isinstance(value, dict):
+                return "bufferView" in value or any(has_bufferView_key(item) for item in value.values())
+            if isinstance(value, list):
+                return any(has_bufferView_key(item) for item in value)
+            return False
+
+        if any(accessor.sparse is not None for accessor in new_gltf.accessors):
+            return True
+        extension_owners = [new_gltf, *new_gltf.accessors, *new_gltf.bufferViews, *(new_gltf.images or [])]
+        for mesh in new_gltf.meshes or []:
+            extension_owners.append(mesh)
+            extension_owners.extend(mesh.primitives)
+        return any(has_bufferView_key(owner.extensions) for owner in extension_owners)
+
+    def __deduplicate_bufferViews(self, new_gltf: GLTF2) -> None:
+        # bufferViews that reference the same source byte range are emitted once
+        if self.__references_bufferViews_elsewhere(new_gltf):
+            return
+
+        unique_bufferViews = []
+        bufferView_remap = []
+        source_ranges = {}
+        for bufferView in new_gltf.bufferViews:
+            source_range = (
+                bufferView.buffer,
+                bufferView.byteOffset or 0,
+                bufferView.byteLength,
+                bufferView.byteStride,
+                bufferView.target,
+            )
+            if source_range not in source_ranges:
+                source_ranges[source_range] = len(unique_bufferViews)
+                unique_bufferViews.append(bufferView)
+            bufferView_remap.append(source_ranges[source_range])
+
+        if len(unique_bufferViews) == len(new_gltf.bufferViews):
+            return
+
+        for accessor in new_gltf.accessors:
+            if accessor.bufferView is not None:
+                accessor.bufferView = bufferView_remap[accessor.bufferView]
+        for image in new_gltf.images or []:
+            if image.bufferView is not None:
+                image.bufferView = bufferView_remap[image.bufferView]
+        new_gltf.bufferViews = unique_bufferViews
+
     def __recalculate_buffers_and_save_bin(
         self,
         new_gltf: GLTF2,
@@ -934,21 +963,22 @@ class TileChunkService(object):
         output_directory: str,
         bin_filename: str,
     ) -> None:
-        new_buffers_data = []
-        new_buffer_view_offsets = []
+        self.__deduplicate_bufferViews(new_gltf)
 
+        new_buffer_view_offsets = []
+        combined_length = 0
         for bufferView in new_gltf.bufferViews:
-            start = bufferView.byteOffset
+            # glTF requires accessor data to be aligned to its component size, 4 bytes covers all of them
+            combined_length = (combined_length + 3) & ~3
+            new_buffer_view_offsets.append(combined_length)
+            combined_length += bufferView.byteLength
+
+        source_data = memoryview(binary_data)
+        combined_data = bytearray(combined_length)
+        for bufferView, new_byteOffset in zip(new_gltf.bufferViews, new_buffer_view_offsets):
+            start = bufferView.byteOffset or 0
             end = start + bufferView.byteLength
-            data_segment = binary_data[start:end]
-
-            new_byteOffset = (
-                sum(len(data) for data in new_buffers_data) if new_buffers_data else 0
-            )
-            new_buffers_data.append(data_segment)
-            new_buffer_view_offsets.append(new_byteOffset)
-
-        combined_data = b"".join(new_buffers_data)
+            combined_data[new_byteOffset:new_byteOffset + bufferView.byteLength] = source_data[start:end]
 
         new_buffers = []
         new_gltf.buffers = new_buffers
@@ -979,41 +1009,45 @@ class TileChunkService(object):
       if original_gltf.extensions is not None:
         new_gltf.extensions = copy.deepcopy(original_gltf.extensions)
 
-      if new_gltf.extensions.get("EXT_structural_metadata"):
-        collected_info.batch_table = {key: [] for key in input_batch_table}
+      if input_batch_table:
+        collected_info.batch_table_rows = []
+
+    def __build_node_animation_indices(self, gltf: LazyGLTF) -> dict[int, list[int]]:
+        node_animation_indices = {}
+        for animation_index, animation in enumerate(gltf.animations.raw_items()):
+            for channel in animation.get("channels", []):
+                target_node = channel.get("target", {}).get("node")
+                if target_node is None:
+                    continue
+                animation_indices = node_animation_indices.setdefault(target_node, [])
+                if not animation_indices or animation_indices[-1] != animation_index:
+                    animation_indices.append(animation_index)
+        return node_animation_indices
 
     def __set_animations(
         self,
         original_gltf: GLTF2,
         node_index: int,
         collected_info: CollectedInfo,
+        node_animation_indices: dict[int, list[int]],
     ) -> None:
-        for animation in original_gltf.animations:
-            self.__process_animation_if_relevant(
-                animation, node_index, original_gltf, collected_info
+        for animation_index in node_animation_indices.get(node_index, []):
+            self.__add_animation_and_its_dependencies(
+                original_gltf.animations[animation_index],
+                animation_index,
+                original_gltf,
+                collected_info,
             )
 
 
-    def __process_animation_if_relevant(
-        self,
-        animation: Animation,
-        node_index: int,
-        gltf: GLTF2,
-        collected_info: CollectedInfo,
-    ) -> None:
-        for channel in animation.channels:
-            if channel.target.node == node_index:
-                self.__add_animation_and_its_dependencies(animation, gltf, collected_info)
-                break
-
-
     def __add_animation_and_its_dependencies(
         self,
         animation: Animation,
+        animation_index: int,
         gltf: GLTF2,
         collected_info: CollectedInfo,
     ) -> None:
-        if animation not in collected_info.animations:
+        if animation_index not in collected_info.animations_indices:
             for sampler in animation.samplers:
                 self.__process_sampler_for_animation(
                     sampler=sampler,
@@ -1021,6 +1055,7 @@ class TileChunkService(object):
                     collected_info=collected_info,
                 )
             
+            collected_info.animations_indices[animation_index] = len(collected_info.animations)
             collected_info.animations.append(animation)
 
 
@@ -1030,22 +1065,10 @@ class TileChunkService(object):
         gltf: GLTF2,
         collected_info: CollectedInfo,
     ) -> None:
-        if sampler.input is not None:
-            if collected_info.accessor_indices.get(sampler.input) is None:
-                new_accessor_index = self.__add_accessor_and_its_dependencies(
-                    sampler.input, gltf, collected_info
-                )
-                sampler.input = new_accessor_index
-            else:
-                sampler.input = collected_info.accessor_indices.get(sampler.input)
-        if sampler.output is not None:
-            if collected_info.accessor_indices.get(sampler.output) is None:
-                new_accessor_index = self.__add_accessor_and_its_dependencies(
-                    sampler.output, gltf, collected_info
-                )
-                sampler.output = new_accessor_index
-            else:
-                sampler.output = collected_info.accessor_indices.get(sampler.output)
+        # the source sampler keeps its original accessor indices, __reindex_animations remaps the copy
+        for accessor_index in (sampler.input, sampler.output):
+            if accessor_index is not None and collected_info.accessor_indices.get(accessor_index) is None:
+                self.__add_accessor_and_its_dependencies(accessor_index, gltf, collected_info)
 
 
     def __add_accessor_and_its_dependencies(
@@ -1077,173 +1100,307 @@ class TileChunkService(object):
         gltf: GLTF2,
         collected_info: CollectedInfo,
     ) -> None:
-        buffer = gltf.buffers[bufferView.buffer]
-        if buffer not in collected_info.buffers:
-            collected_info.buffers.append(buffer)
+        if bufferView.buffer not in collected_info.buffers_indices:
+            collected_info.buffers_indices[bufferView.buffer] = len(collected_info.buffers)
+            collected_info.buffers.append(gltf.buffers[bufferView.buffer])
+
+    def __build_node_scene_indices(self, gltf: LazyGLTF) -> dict[int, list[int]]:
+        node_scene_indices = {}
+        for scene_index, scene in enumerate(gltf.scenes.raw_items()):
+            for node_index in scene.get("nodes") or []:
+                scene_indices = node_scene_indices.setdefault(node_index, [])
+                if not scene_indices or scene_indices[-1] != scene_index:
+                    scene_indices.append(scene_index)
+        return node_scene_indices
+
+    def __build_tile_scene_indices(
+        self,
+        gltf: LazyGLTF,
+        tile_node_indices: set[int],
+        parent_map: dict[int, int],
+        node_scene_indices: dict[int, list[int]],
+        collected_info: CollectedInfo,
+    ) -> dict[int, list[int]]:
+        # nodes whose parent went to another tile become roots of the scene their ancestor was in
+        tile_scene_indices = {}
+        raw_nodes = gltf.nodes.raw_items()
+        for node_index in tile_node_indices:
+            parent_index = parent_map.get(node_index, -1)
+            if parent_index != -1 and parent_index in tile_node_indices:
+                continue
 
-    def __build_parent_map(self, gltf: GLTF2) -> dict[int, int]:
+            root_index = node_index
+            ancestors_matrix = np.identity(4)
+            while parent_map.get(root_index, -1) != -1:
+                root_index = parent_map[root_index]
+                ancestors_matrix = node_local_matrix(raw_nodes[root_index]) @ ancestors_matrix
+            tile_scene_indices[node_index] = node_scene_indices.get(root_index, [])
+
+            if not np.allclose(ancestors_matrix, np.identity(4)):
+                collected_info.root_matrices[node_index] = ancestors_matrix.T.flatten().tolist()
+        return tile_scene_indices
+
+    def __build_parent_map(self, gltf: LazyGLTF) -> dict[int, int]:
         parent_map = {}
+        raw_nodes = gltf.nodes.raw_items()
 
         def visit_node(node_index, parent_index=-1):
             parent_map[node_index] = parent_index
-            for child_index in gltf.nodes[node_index].children or []:
+            for child_index in raw_nodes[node_index].get("children") or []:
                 visit_node(child_index, node_index)
 
-        for scene in gltf.scenes:
-            for node_index in scene.nodes:
+        for scene in gltf.scenes.raw_items():
+            for node_index in scene.get("nodes") or []:
                 visit_node(node_index)
 
         return parent_map
     
-    def __reconstruct_extensions_structural_metadata(self, gltf: GLTF2, collected_batch_table: dict):
-        return self._ifc_service.create_structural_metadata(gltf, collected_batch_table)
+    def __reconstruct_extensions_structural_metadata(self, gltf: GLTF2, batch_table_columns: BatchTableColumns | IndexedBatchTableColumns, batch_table_rows: list[int]):
+        # the tile's rows are gathered from the encoded columns in one go
+        return self._ifc_service.create_string_structural_metadata(
+            gltf, batch_table_columns.take(batch_table_rows), len(batch_table_rows)
+        )
     
-    def __on_process_by_total_nodes(
+    def __write_small_model(
             self,
-            total_nodes: int,
             batch_table: dict[str, list],
-            batch_table_mapping: dict,
+            batch_table_mapping: Mapping,
             mesh_name_mapping: dict[str, str],
-            original_gltf: GLTF2,
-            copied_original_gltf: GLTF2,
+            original_gltf: LazyGLTF,
             base_name: str,
-            output_dir: str,
-    ) -> bool:
-        if total_nodes > 400 and batch_table:
-            structural_metadata_output, structural_metadata_buffer_data_output = (
-                  self._ifc_service.create_structural_metadata(copied_original_gltf, batch_table, False)
-            )
-
-            self._ifc_service.add_structural_metadata_to_gltf(
-                gltf=copied_original_gltf,
-                bin_filename=f"{base_name}_feature_metadata_buffer.bin",
-                output_dir=output_dir,
-                structural_metadata=structural_metadata_output,
-                structural_metadata_buffer_data=structural_metadata_buffer_data_output,
-                save=False,
-            )
-            return False
+            tile_writer: BackgroundWriter,
+            thumbnail_options: ThumbnailOptions,
+            tile_bounds: dict = None,
+    ) -> dict:
+        # the whole model goes into one file, so it is materialized in full only here
+        gltf = original_gltf.to_gltf2()
+        gltf_filename = f"{base_name}_{1}.glb"
+        tile_entry = {"index": 1, "glb": gltf_filename}
+        if tile_bounds is not None:
+            tile_bounds[1] = self._tileset_service.tile_bounds(gltf)
+        on_written = self.__thumbnail_submitter(1, tile_writer.local_dir) if thumbnail_options is not None else None
+
+        if not batch_table:
+            with self._instrumentation_service.stage("tile.write", tile=1) as stage:
+                chunks, _ = build_glb_chunks(gltf, gltf_filename)
+                stage.add_bytes(tile_writer.write(gltf_filename, chunks, on_written=on_written))
+            return tile_entry
+
+        structural_metadata_output, structural_metadata_buffer_data_output = (
+            self._ifc_service.create_structural_metadata(gltf, batch_table, True)
+        )
 
-        elif batch_table:
-            structural_metadata_output, structural_metadata_buffer_data_output = (
-                self._ifc_service.create_structural_metadata(original_gltf, batch_table, True)
-            )
+        self._ifc_service.add_structural_metadata_to_gltf(
+            gltf=gltf,
+            bin_filename=f"{base_name}_feature_metadata_buffer.bin",
+            output_dir=tile_writer.local_dir,
+            structural_metadata=structural_metadata_output,
+            structural_metadata_buffer_data=structural_metadata_buffer_data_output,
+            save=True,
+            output_sink=tile_writer,
+        )
 
-            self._ifc_service.add_structural_metadata_to_gltf(
-                gltf=original_gltf,
-                bin_filename=f"{base_name}_feature_metadata_buffer.bin",
-                output_dir=output_dir,
-                structural_metadata=structural_metadata_output,
-                structural_metadata_buffer_data=structural_metadata_buffer_data_output,
-                save=True,
-            )
+        feature_ids_buffer_data = self._ifc_service.generate_feature_data(
+            gltf=gltf,
+            output_dir=tile_writer.local_dir,
+            output_path=f"{base_name}_feature_ids_buffer.bin",
+            batch_table=batch_table,
+            batch_table_mapping=batch_table_mapping,
+            mesh_name_mapping=mesh_name_mapping,
+            output_sink=tile_writer,
+        )
 
-            self._ifc_service.generate_feature_data(
-                gltf=original_gltf,
-                output_dir=output_dir,
-                output_path=f"{base_name}_feature_ids_buffer.bin",
-                batch_table=batch_table,
-                batch_table_mapping=batch_table_mapping,
-                mesh_name_mapping=mesh_name_mapping
-            )
-            
-            gltf_filename = f"{base_name}_{1}.glb"
-            output_file_path = os.path.join(output_dir, gltf_filename)
-            original_gltf.save(output_file_path)
-            print(f"Saved: {output_file_path}")
-            return True
+        buffers_data = [None] * len(gltf.buffers)
+        buffers_data[-2] = structural_metadata_buffer_data_output
+        buffers_data[-1] = feature_ids_buffer_data
+        with self._instrumentation_service.stage("tile.write", tile=1) as stage:
+            chunks, _ = build_glb_chunks(gltf, gltf_filename, buffers_data)
+            stage.add_bytes(tile_writer.write(gltf_filename, chunks, on_written=on_written))
+        tile_entry["featureMetadata"] = f"{base_name}_feature_metadata_buffer.bin"
+        tile_entry["featureIds"] = f"{base_name}_feature_ids_buffer.bin"
+        return tile_entry
 
     def split_model_by_nodes(
             self,
             input_glb_path: str,
             batch_table: dict[str, list] = None,
-            batch_table_mapping: dict = None,
+            batch_table_mapping: Mapping = None,
             mesh_name_mapping: dict[str, str] = None,
             split_size: int = 100,
             output_dir: str = "./outputs",
-            
-        ) -> None:
+            thumbnail_options: ThumbnailOptions = None,
+            split_mode: SplitMode = "nodes",
+            tile_budget: int = None,
+            small_model_policy: SmallModelPolicy = None,
+            output_sink: OutputSink = None,
+            write_tileset: bool = False,
+        ) -> dict:
+        # output_dir is used when no sink is given, a given sink is left open for the caller to close
+        if output_sink is None:
+            output_sink = LocalOutputSink(output_dir)
+        if thumbnail_options is not None and output_sink.local_dir is None:
+            raise ValueError("Thumbnails are rendered from tiles on disk and need a local output directory")
+        # a mapping passed as parsed JSON is read like a saved one, mesh indices are looked up per node
+        if isinstance(batch_table_mapping, dict):
+            batch_table_mapping = BatchTableMapping.from_json(batch_table_mapping)
+
+        # tiles are written in the background while the next ones are built
+        with self._instrumentation_service.stage("split_model_by_nodes"), BackgroundWriter(output_sink) as tile_writer:
+            return self.__split_model_by_nodes(
+                output_sink=output_sink,
+                tile_writer=tile_writer,
+                input_glb_path=input_glb_path,
+                batch_table=batch_table,
+                batch_table_mapping=batch_table_mapping,
+                mesh_name_mapping=mesh_name_mapping,
+                split_size=split_size,
+                thumbnail_options=thumbnail_options,
+                split_mode=split_mode,
+                tile_budget=tile_budget,
+                small_model_policy=small_model_policy,
+                write_tileset=write_tileset,
+            )
+
+    def __split_model_by_nodes(
+            self,
+            output_sink: OutputSink,
+            tile_writer: BackgroundWriter,
+            input_glb_path: str,
+            batch_table: dict[str, list],
+            batch_table_mapping: Mapping,
+            mesh_name_mapping: dict[str, str],
+            split_size: int,
+            thumbnail_options: ThumbnailOptions,
+            split_mode: SplitMode,
+            tile_budget: int,
+            small_model_policy: SmallModelPolicy,
+            write_tileset: bool,
+        ) -> dict:
         base_name = os.path.splitext(os.path.basename(input_glb_path))[0]
-        os.makedirs(output_dir, exist_ok=True)
+        output_dir = output_sink.local_dir
 
-        original_gltf = GLTF2().load(input_glb_path)
-        binary_data = original_gltf.binary_blob()
+        with self._instrumentation_service.stage("split.load"):
+            original_gltf = LazyGLTF.load(input_glb_path)
+            binary_data = original_gltf.binary_blob()
 
-        copied_original_gltf = copy.deepcopy(original_gltf)
+            copied_original_gltf = original_gltf.view()
 
-        parent_map = self.__build_parent_map(original_gltf)
+            parent_map = self.__build_parent_map(original_gltf)
+            node_scene_indices = self.__build_node_scene_indices(copied_original_gltf)
+            node_animation_indices = self.__build_node_animation_indices(copied_original_gltf)
 
-        root_nodes = [
-            node_index
-            for node_index, parent_index in parent_map.items()
-            if parent_index == -1
-        ]
+        tile_budget = self._tile_partition_service.resolve_tile_budget(split_mode, split_size, tile_budget)
 
-        total_nodes = len(original_gltf.nodes)
-        total_files = (total_nodes + split_size - 1) // split_size
-        bufferView_index_map = {}
-        accessor_index_map = {}
-        mesh_index_map = {}
-        texture_index_map = {}
+        tile_manifest = []
+        # bounding boxes for tileset.json, only collected when one is written
+        tile_bounds = {} if write_tileset else None
+        bufferView_tile_counts = {}
+        node_tile_counts = {}
 
-        is_finished = self.__on_process_by_total_nodes(
-            original_gltf=original_gltf,
-            copied_original_gltf=copied_original_gltf,
-            base_name=base_name,
-            output_dir=output_dir,
-            batch_table=batch_table,
-            batch_table_mapping=batch_table_mapping,
-            mesh_name_mapping=mesh_name_mapping,
-            total_nodes=total_nodes
-        )
+        if thumbnail_options is not None:
+            self._tile_thumbnail_service.start(thumbnail_options, output_dir)
 
-        if is_finished:
-            return
-
-        for file_index in range(total_files):
-            new_gltf = GLTF2()
-            
-            collected_info = self.__init_collected_info()
-
-            self.__copy_extensions(
-                original_gltf=copied_original_gltf,
-                new_gltf=new_gltf,
-                input_batch_table=batch_table,
-                collected_info=collected_info,
+        if small_model_policy is None:
+            small_model_policy = SmallModelPolicy()
+        if small_model_policy.is_small(
+            self._tile_partition_service.model_stats(original_gltf), split_mode, split_size, tile_budget, bool(batch_table)
+        ):
+            tile_entry = self.__write_small_model(
+                original_gltf=original_gltf,
+                base_name=base_name,
+                tile_writer=tile_writer,
+                thumbnail_options=thumbnail_options,
+                tile_bounds=tile_bounds,
+                batch_table=batch_table,
+                batch_table_mapping=batch_table_mapping,
+                mesh_name_mapping=mesh_name_mapping,
             )
+            tile_manifest.append(tile_entry)
+            with self._instrumentation_service.stage("split.flush"):
+                tile_writer.close()
+            with self._instrumentation_service.stage("split.finish"):
+                return self.__finish_tiles(output_sink, base_name, tile_manifest, thumbnail_options, tile_bounds=tile_bounds)
+
+        # encoded once, tiles only collect row numbers. with a mapping index the tile rows are read from it instead
+        if not batch_table:
+            batch_table_columns = None
+        elif isinstance(batch_table_mapping, BatchTableIndex):
+            batch_table_columns = IndexedBatchTableColumns(list(batch_table), batch_table_mapping)
+        else:
+            batch_table_columns = BatchTableColumns(batch_table)
 
+        with self._instrumentation_service.stage("split.partition") as stage:
+            tiles = self._tile_partition_service.partition(
+                gltf=original_gltf,
+                split_mode=split_mode,
+                split_size=split_size,
+                tile_budget=tile_budget,
+            )
+            stage.extra["tiles"] = len(tiles)
+            tile_costs = self._tile_partition_service.tile_costs(original_gltf, tiles, split_mode)
+
+        for file_index, tile_nodes in enumerate(tiles):
+            # objects materialized for the previous tile are not needed anymore
+            original_gltf.release()
+            copied_original_gltf.release()
+            with self._instrumentation_service.stage("tile.collect", tile=file_index + 1):
+                new_gltf = GLTF2()
+            
+                collected_info = self.__init_collected_info()
 
-            start_node_index = file_index * split_size
-            end_node_index = min(start_node_index + split_size, total_nodes)
-
-            for node_index in range(start_node_index, end_node_index):
-                # if parent_map[node_index] in collected_info.node_indices:
-                #     continue
-                self.__collect_info(
-                    gltf=copied_original_gltf,
-                    node_index=node_index,
-                    split_size=split_size,
+                self.__copy_extensions(
+                    original_gltf=copied_original_gltf,
+                    new_gltf=new_gltf,
+                    input_batch_table=batch_table,
                     collected_info=collected_info,
-                    batch_table_mapping=batch_table_mapping
                 )
-                self.__set_animations(
-                    original_gltf=copied_original_gltf,
-                    node_index=node_index,
+
+
+                # tiles list every node explicitly, collection never leaves the tile
+                tile_node_indices = set(tile_nodes)
+                tile_scene_indices = self.__build_tile_scene_indices(
+                    gltf=original_gltf,
+                    tile_node_indices=tile_node_indices,
+                    parent_map=parent_map,
+                    node_scene_indices=node_scene_indices,
                     collected_info=collected_info,
                 )
+                # index maps only hold what this tile emitted
+                bufferView_index_map = {}
+                accessor_index_map = {}
+                mesh_index_map = {}
+                texture_index_map = {}
+
+                for node_index in tile_nodes:
+                    self.__collect_info(
+                        gltf=copied_original_gltf,
+                        node_index=node_index,
+                        split_size=len(tile_nodes),
+                        collected_info=collected_info,
+                        batch_table_columns=batch_table_columns,
+                        node_scene_indices=tile_scene_indices,
+                        tile_node_indices=tile_node_indices,
+                    )
+                    self.__set_animations(
+                        original_gltf=copied_original_gltf,
+                        node_index=node_index,
+                        collected_info=collected_info,
+                        node_animation_indices=node_animation_indices,
+                    )
 
             gltf_filename = f"{base_name}_{file_index + 1}.glb"
             bin_filename = f"{base_name}_{file_index + 1}.bin"
 
-            self.__reindex_entities(
-                original_gltf=original_gltf,
-                new_gltf=new_gltf,
-                collected_info=collected_info,
-                bufferView_index_map=bufferView_index_map,
-                accessor_index_map=accessor_index_map,
-                mesh_index_map=mesh_index_map,
-                texture_index_map=texture_index_map,
-            )
+            with self._instrumentation_service.stage("tile.reindex", tile=file_index + 1):
+                self.__reindex_entities(
+                    original_gltf=original_gltf,
+                    new_gltf=new_gltf,
+                    collected_info=collected_info,
+                    bufferView_index_map=bufferView_index_map,
+                    accessor_index_map=accessor_index_map,
+                    mesh_index_map=mesh_index_map,
+                    texture_index_map=texture_index_map,
+                )
 
             if (
                 new_gltf.accessors is None
@@ -1253,54 +1410,162 @@ class TileChunkService(object):
             ):
                 continue
 
-            self.__recalculate_buffers_and_save_bin(
-                new_gltf=new_gltf,
-                binary_data=binary_data,
-                output_directory=output_dir,
-                bin_filename=bin_filename,
-            )
-
-            if new_gltf.extensions.get("EXT_structural_metadata"):
-                zero_base_batch_table = copy.deepcopy(collected_info.batch_table)
-                zero_base_batch_table["batchId"] = [i for i in range(len(collected_info.batch_table["batchId"]))]
-
-                (
-                    reconstructed_structural_metadata_output,
-                    reconstructed_structural_metadata_buffer_data_output,
-                ) = self.__reconstruct_extensions_structural_metadata(
-                    gltf=new_gltf,
-                    collected_batch_table=zero_base_batch_table,
-                )
-
-                self._ifc_service.add_structural_metadata_to_gltf(
-                    gltf=new_gltf,
-                    bin_filename=f"{base_name}_feature_metadata_buffer_{file_index + 1}.bin",
-                    output_dir=output_dir,
-                    structural_metadata=reconstructed_structural_metadata_output,
-                    structural_metadata_buffer_data=reconstructed_structural_metadata_buffer_data_output,
+            for bufferView_index in collected_info.bufferView_indices:
+                bufferView_tile_counts[bufferView_index] = bufferView_tile_counts.get(bufferView_index, 0) + 1
+            for node_index in collected_info.node_indices:
+                node_tile_counts[node_index] = node_tile_counts.get(node_index, 0) + 1
+
+            with self._instrumentation_service.stage("tile.pack_buffers", tile=file_index + 1):
+                self.__recalculate_buffers_and_save_bin(
+                    new_gltf=new_gltf,
+                    binary_data=binary_data,
+                    output_directory=output_dir,
+                    bin_filename=bin_filename,
                 )
+                buffers_data = [new_gltf.binary_blob()]
+
+            with self._instrumentation_service.stage("tile.metadata", tile=file_index + 1) as stage:
+                if collected_info.batch_table_rows is not None:
+                    (
+                        reconstructed_structural_metadata_output,
+                        reconstructed_structural_metadata_buffer_data_output,
+                    ) = self.__reconstruct_extensions_structural_metadata(
+                        gltf=new_gltf,
+                        batch_table_columns=batch_table_columns,
+                        batch_table_rows=collected_info.batch_table_rows,
+                    )
 
-                feature_ids_buffer_data_output_path=f"{base_name}_feature_ids_buffer_{file_index + 1}.bin"
-                feature_ids_buffer_data = bytearray()
-                
-                for mesh_index, mesh in enumerate(new_gltf.meshes):
-                    origin_mesh_index = {key for key in collected_info.meshes_indices if collected_info.meshes_indices[key] == mesh_index}.pop()
-                    self._ifc_service.generate_feature_data_helper(
+                    self._ifc_service.add_structural_metadata_to_gltf(
                         gltf=new_gltf,
-                        feature_ids_buffer_data=feature_ids_buffer_data,
-                        mesh_index=origin_mesh_index,
-                        mesh=mesh,
-                        batch_table=collected_info.batch_table,
-                        batch_table_mapping=collected_info.batch_table_mapping,
-                        mesh_name_mapping=mesh_name_mapping
+                        bin_filename=f"{base_name}_feature_metadata_buffer_{file_index + 1}.bin",
+                        output_dir=output_dir,
+                        structural_metadata=reconstructed_structural_metadata_output,
+                        structural_metadata_buffer_data=reconstructed_structural_metadata_buffer_data_output,
+                        output_sink=tile_writer,
                     )
+                    stage.add_bytes(len(reconstructed_structural_metadata_buffer_data_output))
+                    buffers_data.append(reconstructed_structural_metadata_buffer_data_output)
+
+                    feature_ids_buffer_data_output_path=f"{base_name}_feature_ids_buffer_{file_index + 1}.bin"
+                    feature_ids_buffer_data = bytearray()
+                
+                    # a tile mesh's feature id is its index in the tile
+                    for mesh_index, mesh in enumerate(new_gltf.meshes):
+                        self._ifc_service.generate_feature_data_helper(
+                            gltf=new_gltf,
+                            feature_ids_buffer_data=feature_ids_buffer_data,
+                            feature_id=mesh_index,
+                            mesh=mesh,
+                            mesh_name_mapping=mesh_name_mapping
+                        )
               
-                feature_id_buffer = Buffer(uri=feature_ids_buffer_data_output_path, byteLength=len(feature_ids_buffer_data))
-                new_gltf.buffers.append(feature_id_buffer)
+                    feature_id_buffer = Buffer(uri=feature_ids_buffer_data_output_path, byteLength=len(feature_ids_buffer_data))
+                    new_gltf.buffers.append(feature_id_buffer)
+                    buffers_data.append(feature_ids_buffer_data)
+
+                    stage.add_bytes(tile_writer.write(feature_ids_buffer_data_output_path, [feature_ids_buffer_data]))
+
+            with self._instrumentation_service.stage("tile.write", tile=file_index + 1) as stage:
+                if tile_bounds is not None:
+                    tile_bounds[file_index + 1] = self._tileset_service.tile_bounds(new_gltf)
+                chunks, _ = build_glb_chunks(new_gltf, gltf_filename, buffers_data)
+                # thumbnails render from disk, so a tile is handed over once its file is written
+                stage.add_bytes(tile_writer.write(
+                    gltf_filename,
+                    chunks,
+                    on_written=self.__thumbnail_submitter(file_index + 1, output_dir) if thumbnail_options is not None else None,
+                ))
+            # pathlib.Path(os.path.join(output_dir, bin_filename)).unlink(missing_ok=True)
+
+            tile_entry = {
+                "index": file_index + 1,
+                "glb": gltf_filename,
+                "nodes": len(collected_info.node_indices),
+                "bufferViewBytes": sum(bufferView.byteLength for bufferView in collected_info.bufferViews),
+            }
+            if collected_info.batch_table_rows is not None:
+                tile_entry["featureMetadata"] = f"{base_name}_feature_metadata_buffer_{file_index + 1}.bin"
+                tile_entry["featureIds"] = feature_ids_buffer_data_output_path
+            tile_manifest.append(tile_entry)
+
+        with self._instrumentation_service.stage("split.flush"):
+            tile_writer.close()
+
+        partition_report = self.__build_partition_report(
+            gltf=original_gltf,
+            split_mode=split_mode,
+            tile_budget=tile_budget,
+            tile_costs=tile_costs,
+            bufferView_tile_counts=bufferView_tile_counts,
+            node_tile_counts=node_tile_counts,
+        )
+        with self._instrumentation_service.stage("split.finish"):
+            return self.__finish_tiles(output_sink, base_name, tile_manifest, thumbnail_options, partition_report, tile_bounds)
+
+    def __thumbnail_submitter(self, tile_index: int, output_dir: str):
+        # only used with local sinks, the written name is relative to the output directory
+        return lambda name: self._tile_thumbnail_service.submit(tile_index, os.path.join(output_dir, name))
+
+    def __build_partition_report(
+            self,
+            gltf: LazyGLTF,
+            split_mode: SplitMode,
+            tile_budget: int,
+            tile_costs: list[int],
+            bufferView_tile_counts: dict[int, int],
+            node_tile_counts: dict[int, int],
+        ) -> dict:
+        raw_bufferViews = gltf.bufferViews.raw_items()
+        written_bytes = 0
+        duplicated_bytes = 0
+        duplicated_bufferViews = 0
+        for bufferView_index, tile_count in bufferView_tile_counts.items():
+            byte_length = raw_bufferViews[bufferView_index]["byteLength"]
+            written_bytes += byte_length * tile_count
+            if tile_count > 1:
+                duplicated_bytes += byte_length * (tile_count - 1)
+                duplicated_bufferViews += 1
+
+        binary_data = gltf.binary_blob()
+        return {
+            "splitMode": split_mode,
+            "inputBinaryBytes": len(binary_data) if binary_data is not None else 0,
+            "writtenBufferViewBytes": written_bytes,
+            "duplicatedBufferViewBytes": duplicated_bytes,
+            "duplicatedBufferViews": duplicated_bufferViews,
+            "duplicatedNodes": sum(1 for tile_count in node_tile_counts.values() if tile_count > 1),
+            "unassignedNodes": len(gltf.nodes) - len(node_tile_counts),
+            "tileBudget": tile_budget,
+            # meshes are never split, so a single mesh over the budget makes a tile larger than it
+            "oversizedTiles": [
+                {"index": file_index + 1, "cost": tile_cost}
+                for file_index, tile_cost in enumerate(tile_costs)
+                if tile_cost > tile_budget
+            ],
+        }
+
+    def __finish_tiles(
+            self,
+            output_sink: OutputSink,
+            base_name: str,
+            tile_manifest: list[dict],
+            thumbnail_options: ThumbnailOptions,
+            partition_report: dict = None,
+            tile_bounds: dict = None,
+        ) -> dict:
+        if thumbnail_options is not None:
+            rendered_images = self._tile_thumbnail_service.wait()
+            for tile_entry in tile_manifest:
+                tile_entry["thumbnails"] = [
+                    os.path.relpath(image["image_path"], output_sink.local_dir)
+                    for image in rendered_images.get(tile_entry["index"], [])
+                ]
 
-                with open(f"{output_dir}/{feature_ids_buffer_data_output_path}", "wb") as f:
-                    f.write(feature_ids_buffer_data)
+        manifest = {"tiles": tile_manifest}
+        if partition_report is not None:
+            manifest["partition"] = partition_report
 
-            output_file_path = os.path.join(output_dir, gltf_filename)
-            new_gltf.save(output_file_path)
-            # pathlib.Path(os.path.join(output_dir, bin_filename)).unlink(missing_ok=True)
\ No newline at end of file
+        output_sink.write_json(f"{base_name}_manifest.json", manifest)
+        if tile_bounds is not None:
+            output_sink.write_json("tileset.json", self._tileset_service.build_tileset(tile_manifest, tile_bounds), indent=None)
+        return manifest
\ No newline at end of file
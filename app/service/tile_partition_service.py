@@ -0,0 +1,220 @@
+from typing import Literal
+from model.lazy_gltf_model import LazyGLTF
+from model.small_model_policy_model import ModelStats
+
+SplitMode = Literal["nodes", "triangles", "bytes"]
+
+SPLIT_MODES = ("nodes", "triangles", "bytes")
+DEFAULT_TILE_BUDGETS = {
+    "triangles": 100_000,
+    "bytes": 4 * 1024 * 1024,
+}
+
+TRIANGLES = 4
+TRIANGLE_STRIP = 5
+TRIANGLE_FAN = 6
+
+
+class TilePartitionService(object):
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if not isinstance(cls._instance, cls):
+            cls._instance = object.__new__(cls, *args, **kwargs)
+
+        return cls._instance
+
+    def partition(
+        self,
+        gltf: LazyGLTF,
+        split_mode: SplitMode = "nodes",
+        split_size: int = 100,
+        tile_budget: int = None,
+    ) -> list[list[int]]:
+        if split_mode not in SPLIT_MODES:
+            raise ValueError(f"Unknown split mode: {split_mode}")
+
+        raw_nodes = gltf.nodes.raw_items()
+        tile_budget = self.resolve_tile_budget(split_mode, split_size, tile_budget)
+        node_costs = self.__node_costs(gltf, split_mode)
+        root_nodes = self.__root_nodes(gltf)
+        subtree_costs = self.__subtree_costs(raw_nodes, node_costs, root_nodes)
+
+        return self.__pack_subtrees(raw_nodes, node_costs, subtree_costs, root_nodes, tile_budget)
+
+    def tile_costs(self, gltf: LazyGLTF, tiles: list[list[int]], split_mode: SplitMode) -> list[int]:
+        # measured like partition packs, a node whose own mesh is over the budget still gets a tile of its own
+        node_costs = self.__node_costs(gltf, split_mode)
+        return [sum(node_costs[node_index] for node_index in tile_nodes) for tile_nodes in tiles]
+
+    def resolve_tile_budget(self, split_mode: SplitMode, split_size: int, tile_budget: int = None) -> int:
+        if split_mode == "nodes":
+            return split_size
+        if tile_budget is None:
+            return DEFAULT_TILE_BUDGETS[split_mode]
+        return tile_budget
+
+    def model_stats(self, gltf: LazyGLTF) -> ModelStats:
+        mesh_triangles = self.__mesh_costs(gltf, "triangles")
+        mesh_nodes = [node["mesh"] for node in gltf.nodes.raw_items() if node.get("mesh") is not None]
+        binary_data = gltf.binary_blob()
+        return ModelStats(
+            nodes=len(gltf.nodes),
+            mesh_nodes=len(mesh_nodes),
+            triangles=sum(mesh_triangles[mesh_index] for mesh_index in mesh_nodes),
+            binary_bytes=len(binary_data) if binary_data is not None else 0,
+        )
+
+    def mesh_cost(self, gltf: LazyGLTF, mesh_index: int, split_mode: SplitMode) -> int:
+        raw_accessors = gltf.accessors.raw_items()
+        raw_bufferViews = gltf.bufferViews.raw_items()
+        primitives = gltf.meshes.raw(mesh_index).get("primitives", [])
+
+        if split_mode == "triangles":
+            triangles = 0
+            for primitive in primitives:
+                mode = primitive.get("mode", TRIANGLES)
+                if primitive.get("indices") is not None:
+                    count = raw_accessors[primitive["indices"]]["count"]
+                elif primitive.get("attributes", {}).get("POSITION") is not None:
+                    count = raw_accessors[primitive["attributes"]["POSITION"]]["count"]
+                else:
+                    continue
+
+                if mode == TRIANGLES:
+                    triangles += count // 3
+                elif mode in (TRIANGLE_STRIP, TRIANGLE_FAN):
+                    triangles += max(count - 2, 0)
+            return triangles
+
+        # tiles copy whole bufferViews, so a mesh costs the bufferViews its accessors reference
+        bufferView_indices = set()
+        for primitive in primitives:
+            accessor_indices = list(primitive.get("attributes", {}).values())
+            if primitive.get("indices") is not None:
+                accessor_indices.append(primitive["indices"])
+            for target in primitive.get("targets") or []:
+                accessor_indices.extend(target.values())
+
+            for accessor_index in accessor_indices:
+                bufferView_index = raw_accessors[accessor_index].get("bufferView")
+                if bufferView_index is not None:
+                    bufferView_indices.add(bufferView_index)
+
+        return sum(raw_bufferViews[i]["byteLength"] for i in bufferView_indices)
+
+    def __node_costs(self, gltf: LazyGLTF, split_mode: SplitMode) -> list[int]:
+        raw_nodes = gltf.nodes.raw_items()
+        if split_mode == "nodes":
+            # every node counts once, split_size is the node budget
+            return [1] * len(raw_nodes)
+        mesh_costs = self.__mesh_costs(gltf, split_mode)
+        return [
+            mesh_costs[node["mesh"]] if node.get("mesh") is not None else 0
+            for node in raw_nodes
+        ]
+
+    def __mesh_costs(self, gltf: LazyGLTF, split_mode: SplitMode) -> list[int]:
+        return [self.mesh_cost(gltf, mesh_index, split_mode) for mesh_index in range(len(gltf.meshes))]
+
+    def __root_nodes(self, gltf: LazyGLTF) -> list[int]:
+        raw_nodes = gltf.nodes.raw_items()
+        child_nodes = {child for node in raw_nodes for child in node.get("children") or []}
+
+        root_nodes = []
+        seen = set()
+        for scene in gltf.scenes.raw_items():
+            for node_index in scene.get("nodes") or []:
+                if node_index not in seen:
+                    seen.add(node_index)
+                    root_nodes.append(node_index)
+
+        # nodes outside every scene still have to land in some tile
+        for node_index in range(len(raw_nodes)):
+            if node_index not in child_nodes and node_index not in seen:
+                root_nodes.append(node_index)
+        return root_nodes
+
+    def __subtree_costs(self, raw_nodes: list[dict], node_costs: list[int], root_nodes: list[int]) -> list[int]:
+        subtree_costs = list(node_costs)
+        order = []
+        stack = list(root_nodes)
+        visited = set()
+        while stack:
+            node_index = stack.pop()
+            if node_index in visited:
+                continue
+            visited.add(node_index)
+            order.append(node_index)
+            stack.extend(raw_nodes[node_index].get("children") or [])
+
+        for node_index in reversed(order):
+            subtree_costs[node_index] += sum(
+                subtree_costs[child_index] for child_index in raw_nodes[node_index].get("children") or []
+            )
+        return subtree_costs
+
+    def __pack_subtrees(
+        self,
+        raw_nodes: list[dict],
+        node_costs: list[int],
+        subtree_costs: list[int],
+        root_nodes: list[int],
+        tile_budget: int,
+    ) -> list[list[int]]:
+        # next-fit over subtrees in DFS order, so neighbouring nodes stay in the same tile
+        tiles = []
+        current_tile = []
+        current_cost = 0
+        assigned = set()
+
+        def close_tile():
+            nonlocal current_tile, current_cost
+            if current_tile:
+                tiles.append(current_tile)
+            current_tile = []
+            current_cost = 0
+
+        def add_subtree(node_index):
+            stack = [node_index]
+            while stack:
+                index = stack.pop()
+                if index in assigned:
+                    continue
+                assigned.add(index)
+                current_tile.append(index)
+                stack.extend(reversed(raw_nodes[index].get("children") or []))
+
+        def place(node_index):
+            nonlocal current_cost
+            if node_index in assigned:
+                return
+
+            # a tile is only closed once it holds something, so empty grouping nodes are never left alone
+            subtree_cost = subtree_costs[node_index]
+            if subtree_cost == 0 or current_cost + subtree_cost <= tile_budget:
+                add_subtree(node_index)
+                current_cost += subtree_cost
+                return
+
+            if subtree_cost <= tile_budget:
+                if current_cost > 0:
+                    close_tile()
+                add_subtree(node_index)
+                current_cost += subtree_cost
+                return
+
+            # the subtree is larger than a tile, keep the node and spread its children
+            if current_cost > 0 and current_cost + node_costs[node_index] > tile_budget:
+                close_tile()
+            assigned.add(node_index)
+            current_tile.append(node_index)
+            current_cost += node_costs[node_index]
+            for child_index in raw_nodes[node_index].get("children") or []:
+                place(child_index)
+
+        for node_index in root_nodes:
+            place(node_index)
+        close_tile()
+
+        return tiles
@@ -0,0 +1,86 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, Future
+from model.camera_spec_model import CameraSpec
+from model.render_profile_model import RenderProfile
+from model.thumbnail_options_model import ThumbnailOptions
+
+
+def _init_thumbnail_worker() -> None:
+    # import bpy once so every tile rendered by this worker reuses the warm Blender
+    from service.generate_image_service import GenerateImageService
+    GenerateImageService()
+
+
+def _render_tile_thumbnails(
+    input_glb_path: str,
+    output_dir: str,
+    camera_specs: list[CameraSpec],
+    render_profile: RenderProfile,
+) -> list[dict]:
+    from service.generate_image_service import GenerateImageService
+    rendered_images = GenerateImageService().generate_images(
+        input_glb_paths=[input_glb_path],
+        output_dir=output_dir,
+        camera_specs=camera_specs,
+        render_profile=render_profile,
+    )
+    return rendered_images[input_glb_path]
+
+
+class TileThumbnailService(object):
+    _instance = None
+    _executor: ProcessPoolExecutor = None
+    _max_workers: int = 0
+    _futures: dict[int, Future]
+    _options: ThumbnailOptions
+    _thumbnail_dir: str
+
+    def __new__(cls, *args, **kwargs):
+        if not isinstance(cls._instance, cls):
+            cls._instance = object.__new__(cls, *args, **kwargs)
+
+        return cls._instance
+
+    def start(self, options: ThumbnailOptions, output_dir: str) -> None:
+        self._options = options
+        self._futures = {}
+        self._thumbnail_dir = os.path.join(output_dir, options.output_subdir)
+        os.makedirs(self._thumbnail_dir, exist_ok=True)
+
+        if self._executor is not None and self._max_workers != options.max_workers:
+            self.shutdown()
+
+        if self._executor is None:
+            # bpy is not fork safe, so workers are spawned and kept warm between jobs
+            self._executor = ProcessPoolExecutor(
+                max_workers=options.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_thumbnail_worker,
+            )
+            self._max_workers = options.max_workers
+
+    def submit(self, tile_index: int, input_glb_path: str) -> None:
+        self._futures[tile_index] = self._executor.submit(
+            _render_tile_thumbnails,
+            input_glb_path,
+            self._thumbnail_dir,
+            self._options.camera_specs,
+            self._options.render_profile,
+        )
+
+    def wait(self) -> dict[int, list[dict]]:
+        rendered_images = {}
+        for tile_index, future in self._futures.items():
+            try:
+                rendered_images[tile_index] = future.result()
+            except Exception as e:
+                print(f"Thumbnail generation failed for tile {tile_index}: {e}")
+                rendered_images[tile_index] = []
+        self._futures = {}
+        return rendered_images
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
@@ -0,0 +1,64 @@
+import numpy as np
+from pygltflib import GLTF2
+from utils.glb_writer import gltf_to_dict
+from utils.gltf_utils import position_bounds
+
+TILESET_VERSION = "1.1"
+# glTF content is y-up, 3D Tiles rotates it into the z-up tileset frame: (x, y, z) -> (x, -z, y)
+Y_UP_TO_Z_UP = np.array([[1, 0, 0], [0, 0, -1], [0, 1, 0]], dtype=np.float64)
+
+
+class TilesetService(object):
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if not isinstance(cls._instance, cls):
+            cls._instance = object.__new__(cls, *args, **kwargs)
+
+        return cls._instance
+
+    def tile_bounds(self, gltf: GLTF2) -> tuple[np.ndarray, np.ndarray] | None:
+        # only the parts position_bounds walks are converted
+        gltf_json = {
+            key: gltf_to_dict(getattr(gltf, key))
+            for key in ("scene", "scenes", "nodes", "meshes", "accessors")
+            if getattr(gltf, key) is not None
+        }
+        return position_bounds(gltf_json)
+
+    def build_tileset(self, tile_manifest: list[dict], tile_bounds: dict[int, tuple[np.ndarray, np.ndarray]]) -> dict:
+        # every tile is a leaf under a root without content, so all of them are added when visible
+        children = []
+        for tile_entry in tile_manifest:
+            bounds = tile_bounds.get(tile_entry["index"])
+            if bounds is None:
+                raise ValueError(f"Tile {tile_entry['glb']} has no POSITION min/max and cannot be placed in a tileset")
+            children.append({
+                "boundingVolume": {"box": self.__box(*bounds)},
+                "geometricError": 0,
+                "content": {"uri": tile_entry["glb"]},
+            })
+
+        if not children:
+            raise ValueError("A tileset needs at least one tile")
+
+        root_min = np.min([tile_bounds[tile_entry["index"]][0] for tile_entry in tile_manifest], axis=0)
+        root_max = np.max([tile_bounds[tile_entry["index"]][1] for tile_entry in tile_manifest], axis=0)
+        geometric_error = float(np.linalg.norm(root_max - root_min))
+        return {
+            "asset": {"version": TILESET_VERSION},
+            "geometricError": geometric_error,
+            "root": {
+                "boundingVolume": {"box": self.__box(root_min, root_max)},
+                "geometricError": geometric_error,
+                "refine": "ADD",
+                "children": children,
+            },
+        }
+
+    def __box(self, box_min: np.ndarray, box_max: np.ndarray) -> list[float]:
+        # center followed by the x, y and z half axes, in the z-up tileset frame
+        corners = np.array([box_min, box_max]) @ Y_UP_TO_Z_UP.T
+        center = corners.mean(axis=0)
+        half_size = np.abs(corners[1] - corners[0]) / 2
+        return [float(value) for value in (*center, *np.diag(half_size).ravel())]
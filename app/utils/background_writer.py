@@ -0,0 +1,69 @@
+import threading
+from typing import Callable
+from concurrent.futures import ThreadPoolExecutor
+from utils.output_sink import OutputSink
+
+
+class BackgroundWriter(OutputSink):
+    # writes to another sink on worker threads while the caller builds the next files,
+    # write blocks once max_pending_bytes are queued so finished tiles cannot pile up in memory
+    def __init__(self, sink: OutputSink, max_workers: int = 2, max_pending_bytes: int = 256 * 1024 * 1024) -> None:
+        super().__init__()
+        self.local_dir = sink.local_dir
+        self._sink = sink
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tile-writer")
+        self._max_pending_bytes = max_pending_bytes
+        self._pending_bytes = 0
+        self._condition = threading.Condition()
+        self._errors: list[tuple[str, BaseException]] = []
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        # an error from the caller wins, write errors are only raised on a clean exit
+        self.close(raise_errors=exc_type is None)
+
+    def write(self, name: str, chunks: list, on_written: Callable[[str], None] = None) -> int:
+        self.raise_errors()
+
+        byte_count = sum(len(chunk) for chunk in chunks)
+        with self._condition:
+            # one file larger than the whole budget is still let through once the queue is empty
+            while self._pending_bytes and self._pending_bytes + byte_count > self._max_pending_bytes:
+                self._condition.wait()
+            self._pending_bytes += byte_count
+
+        self._executor.submit(self.__write, name, chunks, byte_count, on_written)
+        return byte_count
+
+    def _write_file(self, name: str, path: str) -> int:
+        # the file may be gone once the caller returns, so it is written right away
+        return self._sink.write_file(name, path)
+
+    def raise_errors(self) -> None:
+        with self._condition:
+            if self._errors:
+                name, error = self._errors[0]
+                raise OSError(f"Writing {name} failed: {error!r}") from error
+
+    def close(self, raise_errors: bool = True) -> None:
+        # the wrapped sink belongs to the caller and stays open
+        self._executor.shutdown(wait=True)
+        if raise_errors:
+            self.raise_errors()
+
+    def abort(self) -> None:
+        self.close(raise_errors=False)
+
+    def __write(self, name: str, chunks: list, byte_count: int, on_written: Callable[[str], None]) -> None:
+        try:
+            written = self._sink.write(name, chunks)
+            with self._bytes_lock:
+                self.bytes_written += written
+            if on_written is not None:
+                on_written(name)
+        except BaseException as e:
+            with self._condition:
+                self._errors.append((name, e))
+        finally:
+            with self._condition:
+                self._pending_bytes -= byte_count
+                self._condition.notify_all()
@@ -0,0 +1,140 @@
+import os
+import json
+import base64
+import struct
+from dataclasses import fields, is_dataclass
+from typing import Any, Optional
+from pygltflib import GLTF2, Attributes
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+GLB_MAGIC = b"glTF"
+GLB_VERSION = 2
+GLB_CHUNK_JSON = 0x4E4F534A
+GLB_CHUNK_BIN = 0x004E4942
+GLB_ALIGNMENT = 4
+IOV_MAX = os.sysconf("SC_IOV_MAX") if hasattr(os, "sysconf") and "SC_IOV_MAX" in os.sysconf_names else 1024
+
+
+def _is_empty(value: Any) -> bool:
+    # same rule as pygltflib.delete_empty_keys: None and any empty iterable are dropped
+    return value is None or (hasattr(value, "__iter__") and len(value) == 0)
+
+
+def gltf_to_dict(obj: Any, key: Optional[str] = None) -> Any:
+    if isinstance(obj, Attributes):
+        items = vars(obj).items()
+    elif is_dataclass(obj):
+        items = ((f.name, getattr(obj, f.name)) for f in fields(obj))
+    elif isinstance(obj, dict):
+        if key == "extensions":
+            # extension payloads are plain dicts and are written untouched, like pygltflib does
+            return {k: v for k, v in obj.items()}
+        items = obj.items()
+    elif isinstance(obj, (list, tuple)):
+        return [gltf_to_dict(v) for v in obj]
+    else:
+        return obj
+
+    return {k: gltf_to_dict(v, k) for k, v in items if not _is_empty(v)}
+
+
+def encode_json(data: dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":"), allow_nan=False).encode("utf-8")
+
+
+def _resolve_buffers_data(gltf: GLTF2, output_path: str, buffers_data: list) -> list:
+    resolved = list(buffers_data) + [None] * (len(gltf.buffers) - len(buffers_data))
+    for buffer_index, buffer in enumerate(gltf.buffers):
+        if resolved[buffer_index] is not None:
+            continue
+        if buffer.uri is None:
+            resolved[buffer_index] = gltf.binary_blob()
+        elif buffer.uri.startswith("data:"):
+            # embedded buffers are decoded like pygltflib's decode_data_uri
+            resolved[buffer_index] = base64.decodebytes(buffer.uri.split(",", 1)[1].encode("utf-8"))
+        else:
+            # same fallback as pygltflib: external buffers are read from next to the output file
+            with open(os.path.join(os.path.dirname(output_path), buffer.uri), "rb") as f:
+                resolved[buffer_index] = f.read()
+    return resolved
+
+
+def write_glb(gltf: GLTF2, output_path: str, buffers_data: list = None) -> int:
+    chunks, total_length = build_glb_chunks(gltf, output_path, buffers_data)
+    write_chunks(output_path, chunks)
+    return total_length
+
+
+def build_glb_chunks(gltf: GLTF2, output_path: str, buffers_data: list = None) -> tuple[list, int]:
+    # serialization only, the chunks can be written later or on another thread
+    buffers_data = _resolve_buffers_data(gltf, output_path, buffers_data or [])
+
+    # every bufferView, whatever buffer it came from, is packed into the single GLB BIN chunk
+    gltf_dict = gltf_to_dict(gltf)
+    bin_segments = []
+    bin_length = 0
+    for bufferView_dict, bufferView in zip(gltf_dict.get("bufferViews", []), gltf.bufferViews):
+        source_data = memoryview(buffers_data[bufferView.buffer])
+        byte_offset = bufferView.byteOffset or 0
+        bin_segments.append(source_data[byte_offset:byte_offset + bufferView.byteLength])
+
+        bufferView_dict["buffer"] = 0
+        bufferView_dict["byteOffset"] = bin_length
+        bin_length += bufferView.byteLength
+
+        padding = -bufferView.byteLength % GLB_ALIGNMENT
+        if padding:
+            bin_segments.append(b"\0" * padding)
+            bin_length += padding
+
+    gltf_dict["buffers"] = [{"byteLength": bin_length}]
+    if bin_length == 0:
+        del gltf_dict["buffers"]
+
+    json_blob = encode_json(gltf_dict)
+    json_blob += b" " * (-len(json_blob) % GLB_ALIGNMENT)
+
+    total_length = 12 + 8 + len(json_blob) + (8 + bin_length if bin_length else 0)
+    chunks = [
+        struct.pack("<4sII", GLB_MAGIC, GLB_VERSION, total_length),
+        struct.pack("<II", len(json_blob), GLB_CHUNK_JSON),
+        json_blob,
+    ]
+    if bin_length:
+        chunks.append(struct.pack("<II", bin_length, GLB_CHUNK_BIN))
+        chunks.extend(bin_segments)
+
+    return chunks, total_length
+
+
+def write_chunks(output_path: str, chunks: list, fsync: bool = False) -> int:
+    written = 0
+    with open(output_path, "wb") as f:
+        if hasattr(os, "writev"):
+            f.flush()
+            fd = f.fileno()
+            for start in range(0, len(chunks), IOV_MAX):
+                batch = chunks[start:start + IOV_MAX]
+                batch_length = sum(len(chunk) for chunk in batch)
+                batch_written = os.writev(fd, batch)
+                # writev may return early on some filesystems, finish the batch with plain writes
+                if batch_written < batch_length:
+                    remaining = b"".join(bytes(chunk) for chunk in batch)[batch_written:]
+                    while remaining:
+                        count = os.write(fd, remaining)
+                        remaining = remaining[count:]
+                written += batch_length
+        else:
+            for chunk in chunks:
+                written += f.write(chunk)
+
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    return written
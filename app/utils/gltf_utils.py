@@ -0,0 +1,139 @@
+import json
+import struct
+import numpy as np
+
+GLB_MAGIC = b"glTF"
+GLB_HEADER_SIZE = 12
+GLB_CHUNK_HEADER_SIZE = 8
+GLB_CHUNK_JSON = 0x4E4F534A
+GLB_CHUNK_BIN = 0x004E4942
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def read_glb_json(input_path: str) -> dict:
+    if not input_path.lower().endswith(".glb"):
+        with open(input_path, "r") as f:
+            return json.load(f)
+
+    with open(input_path, "rb") as f:
+        magic, _, _ = struct.unpack("<4sII", f.read(GLB_HEADER_SIZE))
+        if magic != GLB_MAGIC:
+            raise ValueError(f"{input_path} is not a GLB file")
+
+        chunk_length, chunk_type = struct.unpack("<II", f.read(GLB_CHUNK_HEADER_SIZE))
+        if chunk_type != GLB_CHUNK_JSON:
+            raise ValueError(f"{input_path} does not start with a JSON chunk")
+
+        return json.loads(f.read(chunk_length))
+
+
+def read_glb(input_path: str) -> tuple[dict, memoryview | None]:
+    if not input_path.lower().endswith(".glb"):
+        with open(input_path, "rb") as f:
+            return _loads(f.read()), None
+
+    with open(input_path, "rb") as f:
+        data = memoryview(f.read())
+
+    magic, _, total_length = struct.unpack_from("<4sII", data, 0)
+    if magic != GLB_MAGIC:
+        raise ValueError(f"{input_path} is not a GLB file")
+
+    offset = GLB_HEADER_SIZE
+    gltf_json = None
+    binary_data = None
+    while offset + GLB_CHUNK_HEADER_SIZE <= total_length:
+        chunk_length, chunk_type = struct.unpack_from("<II", data, offset)
+        offset += GLB_CHUNK_HEADER_SIZE
+        chunk = data[offset:offset + chunk_length]
+        if chunk_type == GLB_CHUNK_JSON and gltf_json is None:
+            gltf_json = _loads(chunk)
+        elif chunk_type == GLB_CHUNK_BIN and binary_data is None:
+            binary_data = chunk
+        offset += chunk_length
+
+    if gltf_json is None:
+        raise ValueError(f"{input_path} does not contain a JSON chunk")
+    return gltf_json, binary_data
+
+
+def _loads(data) -> dict:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(bytes(data))
+
+
+def node_local_matrix(node: dict) -> np.ndarray:
+    if node.get("matrix") is not None:
+        # glTF stores matrices column-major
+        return np.array(node["matrix"], dtype=np.float64).reshape(4, 4).T
+
+    matrix = np.identity(4)
+    if node.get("scale") is not None:
+        matrix = np.diag([*node["scale"], 1.0]) @ matrix
+    if node.get("rotation") is not None:
+        x, y, z, w = node["rotation"]
+        rotation = np.identity(4)
+        rotation[:3, :3] = [
+            [1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)],
+            [2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)],
+            [2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)],
+        ]
+        matrix = rotation @ matrix
+    if node.get("translation") is not None:
+        translation = np.identity(4)
+        translation[:3, 3] = node["translation"]
+        matrix = translation @ matrix
+    return matrix
+
+
+def position_bounds(gltf_json: dict) -> tuple[np.ndarray, np.ndarray] | None:
+    nodes = gltf_json.get("nodes", [])
+    meshes = gltf_json.get("meshes", [])
+    accessors = gltf_json.get("accessors", [])
+    scenes = gltf_json.get("scenes", [])
+
+    if scenes:
+        scene_index = gltf_json.get("scene", 0)
+        root_nodes = scenes[scene_index].get("nodes", [])
+    else:
+        child_nodes = {child for node in nodes for child in node.get("children", [])}
+        root_nodes = [i for i in range(len(nodes)) if i not in child_nodes]
+
+    # unit cube corners, scaled per accessor into its min/max box
+    corner_mask = np.array(
+        [[(i >> axis) & 1 for axis in range(3)] for i in range(8)], dtype=np.float64
+    )
+    corners = []
+
+    stack = [(node_index, np.identity(4)) for node_index in root_nodes]
+    while stack:
+        node_index, parent_matrix = stack.pop()
+        node = nodes[node_index]
+        world_matrix = parent_matrix @ node_local_matrix(node)
+
+        if node.get("mesh") is not None:
+            for primitive in meshes[node["mesh"]].get("primitives", []):
+                position_index = primitive.get("attributes", {}).get("POSITION")
+                if position_index is None:
+                    continue
+                accessor = accessors[position_index]
+                if accessor.get("min") is None or accessor.get("max") is None:
+                    return None
+                box_min = np.array(accessor["min"][:3], dtype=np.float64)
+                box_max = np.array(accessor["max"][:3], dtype=np.float64)
+                local_corners = box_min + corner_mask * (box_max - box_min)
+                corners.append(local_corners @ world_matrix[:3, :3].T + world_matrix[:3, 3])
+
+        for child_index in node.get("children", []):
+            stack.append((child_index, world_matrix))
+
+    if not corners:
+        return None
+
+    corners = np.concatenate(corners)
+    return corners.min(axis=0), corners.max(axis=0)
@@ -0,0 +1,464 @@
+import os
+import io
+import time
+import shutil
+import hmac
+import json
+import struct
+import hashlib
+import tarfile
+import zipfile
+import threading
+import http.client
+import urllib.parse
+import xml.etree.ElementTree as ElementTree
+from utils.glb_writer import write_chunks
+
+ARCHIVE_EXTENSIONS = (".zip", ".tar", ".tar.gz", ".tgz")
+TILES_ARCHIVE_EXTENSION = ".3tz"
+# last entry of a 3tz archive, maps the md5 of every path to its local file header
+TILES_ARCHIVE_INDEX_NAME = "@3dtilesIndex1@"
+S3_SCHEME = "s3://"
+# S3 rejects parts below 5 MiB, except for the last one
+S3_MIN_PART_SIZE = 5 * 1024 * 1024
+S3_DEFAULT_PART_SIZE = 8 * 1024 * 1024
+# read size when a finished file is copied into a sink
+FILE_COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def output_sink_kind(output: str) -> str:
+    if output.startswith(S3_SCHEME):
+        return "s3"
+    if output.lower().endswith(TILES_ARCHIVE_EXTENSION):
+        return "3tz"
+    if output.lower().endswith(ARCHIVE_EXTENSIONS):
+        return "archive"
+    return "local"
+
+
+def open_output_sink(output: str) -> "OutputSink":
+    # s3://bucket/prefix, a .3tz or .zip/.tar/.tar.gz/.tgz path or a plain output directory
+    kind = output_sink_kind(output)
+    if kind == "s3":
+        bucket, _, prefix = output[len(S3_SCHEME):].partition("/")
+        return S3OutputSink(bucket=bucket, prefix=prefix)
+    if kind == "3tz":
+        return TilesArchiveOutputSink(output)
+    if kind == "archive":
+        return ArchiveOutputSink(output)
+    return LocalOutputSink(output)
+
+
+class OutputSink(object):
+    # destination for the files of one conversion, names are relative to the output root
+    # and chunks are bytes-like objects that are written back to back
+    local_dir: str | None = None
+
+    def __init__(self) -> None:
+        self._bytes_lock = threading.Lock()
+        self.bytes_written = 0
+
+    def __enter__(self) -> "OutputSink":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write(self, name: str, chunks: list) -> int:
+        byte_count = self._write(name, chunks)
+        with self._bytes_lock:
+            self.bytes_written += byte_count
+        return byte_count
+
+    def write_json(self, name: str, data, indent: int = 2) -> int:
+        return self.write(name, [json.dumps(data, indent=indent).encode("utf-8")])
+
+    def write_file(self, name: str, path: str) -> int:
+        # a file that is already on disk, streamed instead of read into memory.
+        # the file is handed over: a local sink moves it into place
+        byte_count = self._write_file(name, path)
+        with self._bytes_lock:
+            self.bytes_written += byte_count
+        return byte_count
+
+    def close(self) -> None:
+        pass
+
+    def abort(self) -> None:
+        self.close()
+
+    def _write(self, name: str, chunks: list) -> int:
+        raise NotImplementedError
+
+    def _write_file(self, name: str, path: str) -> int:
+        raise NotImplementedError
+
+
+class LocalOutputSink(OutputSink):
+    def __init__(self, output_dir: str, fsync: bool = False) -> None:
+        super().__init__()
+        os.makedirs(output_dir, exist_ok=True)
+        self.local_dir = output_dir
+        self._fsync = fsync
+
+    def _write(self, name: str, chunks: list) -> int:
+        output_path = os.path.join(self.local_dir, name)
+        if os.path.dirname(name):
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        return write_chunks(output_path, chunks, fsync=self._fsync)
+
+    def _write_file(self, name: str, path: str) -> int:
+        output_path = os.path.join(self.local_dir, name)
+        if os.path.dirname(name):
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        byte_count = os.path.getsize(path)
+        shutil.move(path, output_path)
+        if self._fsync:
+            with open(output_path, "rb") as f:
+                os.fsync(f.fileno())
+        return byte_count
+
+
+class _ChunkReader(io.RawIOBase):
+    # file-like view over a list of chunks, so tarfile can copy them without joining
+    def __init__(self, chunks: list) -> None:
+        self._chunks = [memoryview(chunk).cast("B") for chunk in chunks]
+        self._chunk_index = 0
+        self._offset = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        count = 0
+        target = memoryview(buffer).cast("B")
+        while count < len(target) and self._chunk_index < len(self._chunks):
+            chunk = self._chunks[self._chunk_index]
+            size = min(len(chunk) - self._offset, len(target) - count)
+            target[count:count + size] = chunk[self._offset:self._offset + size]
+            count += size
+            self._offset += size
+            if self._offset == len(chunk):
+                self._chunk_index += 1
+                self._offset = 0
+        return count
+
+
+class ArchiveOutputSink(OutputSink):
+    # one zip or tar file, members are appended in the order the files are finished
+    def __init__(self, archive_path: str) -> None:
+        super().__init__()
+        archive_dir = os.path.dirname(archive_path)
+        if archive_dir:
+            os.makedirs(archive_dir, exist_ok=True)
+        self._archive_path = archive_path
+        # a single archive stream, concurrent writers take turns
+        self._lock = threading.Lock()
+        if archive_path.lower().endswith(TILES_ARCHIVE_EXTENSION):
+            # members stay uncompressed so they can be served straight from a byte range
+            self._archive = zipfile.ZipFile(archive_path, "w", compression=zipfile.ZIP_STORED)
+        elif archive_path.lower().endswith(".zip"):
+            self._archive = zipfile.ZipFile(archive_path, "w", compression=zipfile.ZIP_DEFLATED)
+        else:
+            mode = "w" if archive_path.lower().endswith(".tar") else "w:gz"
+            self._archive = tarfile.open(archive_path, mode)
+
+    def _write(self, name: str, chunks: list) -> int:
+        byte_count = sum(len(chunk) for chunk in chunks)
+        self.__add_member(name, byte_count, _ChunkReader(chunks))
+        return byte_count
+
+    def _write_file(self, name: str, path: str) -> int:
+        byte_count = os.path.getsize(path)
+        with open(path, "rb") as f:
+            self.__add_member(name, byte_count, f)
+        return byte_count
+
+    def __add_member(self, name: str, byte_count: int, reader) -> None:
+        with self._lock:
+            if isinstance(self._archive, zipfile.ZipFile):
+                # with the size known up front zipfile only adds zip64 records when they are needed
+                zip_info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+                zip_info.compress_type = self._archive.compression
+                zip_info.external_attr = 0o644 << 16
+                zip_info.file_size = byte_count
+                with self._archive.open(zip_info, "w") as f:
+                    shutil.copyfileobj(reader, f, FILE_COPY_CHUNK_SIZE)
+            else:
+                tar_info = tarfile.TarInfo(name)
+                tar_info.size = byte_count
+                tar_info.mtime = int(time.time())
+                self._archive.addfile(tar_info, reader)
+
+    def close(self) -> None:
+        with self._lock:
+            self._finish_archive()
+            self._archive.close()
+
+    def abort(self) -> None:
+        # a half written archive is not worth keeping
+        with self._lock:
+            self._archive.close()
+        if os.path.exists(self._archive_path):
+            os.remove(self._archive_path)
+
+    def _finish_archive(self) -> None:
+        pass
+
+
+class TilesArchiveOutputSink(ArchiveOutputSink):
+    # 3D Tiles archive (3tz): an uncompressed zip whose last entry indexes every member,
+    # so a client reads the index once and then fetches tiles by byte range
+    def __init__(self, archive_path: str) -> None:
+        if not archive_path.lower().endswith(TILES_ARCHIVE_EXTENSION):
+            raise ValueError(f"{archive_path} must end with {TILES_ARCHIVE_EXTENSION}")
+        super().__init__(archive_path)
+
+    def _finish_archive(self) -> None:
+        entries = [
+            (hashlib.md5(zip_info.filename.encode("utf-8")).digest(), zip_info.header_offset)
+            for zip_info in self._archive.infolist()
+        ]
+        # hashes are ordered as two little endian uint64, the second one is the most significant
+        entries.sort(key=lambda entry: struct.unpack("<QQ", entry[0])[::-1])
+        index = b"".join(path_hash + struct.pack("<Q", header_offset) for path_hash, header_offset in entries)
+
+        zip_info = zipfile.ZipInfo(TILES_ARCHIVE_INDEX_NAME, date_time=time.localtime()[:6])
+        zip_info.compress_type = zipfile.ZIP_STORED
+        zip_info.external_attr = 0o644 << 16
+        self._archive.writestr(zip_info, index)
+
+
+class S3Error(OSError):
+    pass
+
+
+def _sha256_hex(chunks: list) -> str:
+    digest = hashlib.sha256()
+    for chunk in chunks:
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _hmac_sha256(key: bytes, message: str) -> bytes:
+    return hmac.new(key, message.encode("utf-8"), hashlib.sha256).digest()
+
+
+def sign_s3_request(
+        method: str,
+        path: str,
+        query: dict[str, str],
+        headers: dict[str, str],
+        payload_hash: str,
+        access_key: str,
+        secret_key: str,
+        region: str,
+        amz_date: str,
+    ) -> str:
+    # AWS signature version 4, every header passed in is signed
+    date = amz_date[:8]
+    canonical_query = "&".join(
+        f"{urllib.parse.quote(key, safe='-_.~')}={urllib.parse.quote(value, safe='-_.~')}"
+        for key, value in sorted(query.items())
+    )
+    signed_headers = {key.lower(): " ".join(str(value).split()) for key, value in headers.items()}
+    canonical_headers = "".join(f"{key}:{signed_headers[key]}\n" for key in sorted(signed_headers))
+    signed_header_names = ";".join(sorted(signed_headers))
+    canonical_request = "\n".join([
+        method,
+        urllib.parse.quote(path, safe="/-_.~"),
+        canonical_query,
+        canonical_headers,
+        signed_header_names,
+        payload_hash,
+    ])
+
+    scope = f"{date}/{region}/s3/aws4_request"
+    string_to_sign = "\n".join([
+        "AWS4-HMAC-SHA256",
+        amz_date,
+        scope,
+        hashlib.sha256(canonical_request.encode("utf-8")).hexdigest(),
+    ])
+    signing_key = _hmac_sha256(("AWS4" + secret_key).encode("utf-8"), date)
+    for part in (region, "s3", "aws4_request"):
+        signing_key = _hmac_sha256(signing_key, part)
+    signature = hmac.new(signing_key, string_to_sign.encode("utf-8"), hashlib.sha256).hexdigest()
+    return (
+        f"AWS4-HMAC-SHA256 Credential={access_key}/{scope}, "
+        f"SignedHeaders={signed_header_names}, Signature={signature}"
+    )
+
+
+def _iter_parts(chunks: list, part_size: int):
+    # regroups the chunks into part_size slices without copying them
+    part, part_length = [], 0
+    for chunk in chunks:
+        view = memoryview(chunk).cast("B")
+        while len(view):
+            size = min(len(view), part_size - part_length)
+            part.append(view[:size])
+            part_length += size
+            view = view[size:]
+            if part_length == part_size:
+                yield part
+                part, part_length = [], 0
+    if part:
+        yield part
+
+
+class S3OutputSink(OutputSink):
+    # S3 compatible object storage with path-style requests, so MinIO and similar servers work too.
+    # small files are one PUT, larger ones are multipart uploads that are aborted on failure
+    def __init__(
+            self,
+            bucket: str,
+            prefix: str = "",
+            endpoint_url: str = None,
+            region: str = None,
+            access_key: str = None,
+            secret_key: str = None,
+            session_token: str = None,
+            part_size: int = S3_DEFAULT_PART_SIZE,
+            timeout: float = 60,
+        ) -> None:
+        super().__init__()
+        if part_size < S3_MIN_PART_SIZE:
+            raise ValueError(f"part_size must be at least {S3_MIN_PART_SIZE} bytes")
+
+        self._bucket = bucket
+        self._prefix = prefix.strip("/")
+        self._region = region or os.environ.get("AWS_REGION") or os.environ.get("AWS_DEFAULT_REGION") or "us-east-1"
+        endpoint_url = endpoint_url or os.environ.get("AWS_ENDPOINT_URL") or f"https://s3.{self._region}.amazonaws.com"
+        self._endpoint = urllib.parse.urlsplit(endpoint_url)
+        self._access_key = access_key or os.environ.get("AWS_ACCESS_KEY_ID", "")
+        self._secret_key = secret_key or os.environ.get("AWS_SECRET_ACCESS_KEY", "")
+        self._session_token = session_token or os.environ.get("AWS_SESSION_TOKEN")
+        self._part_size = part_size
+        self._timeout = timeout
+        # http.client connections are not thread safe, every writer thread keeps its own.
+        # they are also listed, so close() reaches the ones opened by writer threads
+        self._connections = threading.local()
+        self._open_connections: list[http.client.HTTPConnection] = []
+        self._connections_lock = threading.Lock()
+
+    def _write(self, name: str, chunks: list) -> int:
+        key = f"{self._prefix}/{name}" if self._prefix else name
+        byte_count = sum(len(chunk) for chunk in chunks)
+        if byte_count <= self._part_size:
+            self.__request("PUT", key, body=chunks)
+        else:
+            self.__multipart_upload(key, _iter_parts(chunks, self._part_size))
+        return byte_count
+
+    def _write_file(self, name: str, path: str) -> int:
+        # only one part of the file is in memory at a time
+        key = f"{self._prefix}/{name}" if self._prefix else name
+        byte_count = os.path.getsize(path)
+        with open(path, "rb") as f:
+            if byte_count <= self._part_size:
+                self.__request("PUT", key, body=[f.read()])
+            else:
+                self.__multipart_upload(key, iter(lambda: [f.read(self._part_size)], [b""]))
+        return byte_count
+
+    def close(self) -> None:
+        with self._connections_lock:
+            open_connections, self._open_connections = self._open_connections, []
+        for connection in open_connections:
+            connection.close()
+        self._connections = threading.local()
+
+    def __multipart_upload(self, key: str, parts) -> None:
+        _, response_body = self.__request("POST", key, query={"uploads": ""})
+        upload_id = self.__find_text(response_body, "UploadId")
+
+        try:
+            etags = []
+            for part_number, part in enumerate(parts, start=1):
+                response_headers, _ = self.__request(
+                    "PUT", key, query={"partNumber": str(part_number), "uploadId": upload_id}, body=part
+                )
+                etags.append(response_headers["ETag"])
+
+            complete_body = "<CompleteMultipartUpload>" + "".join(
+                f"<Part><PartNumber>{part_number}</PartNumber><ETag>{etag}</ETag></Part>"
+                for part_number, etag in enumerate(etags, start=1)
+            ) + "</CompleteMultipartUpload>"
+            _, response_body = self.__request(
+                "POST", key, query={"uploadId": upload_id}, body=[complete_body.encode("utf-8")]
+            )
+            # completion can fail after the 200 status line was sent, the error is in the body
+            if b"<Error>" in response_body:
+                raise S3Error(f"Completing the upload of {key} failed: {response_body[:512]!r}")
+        except BaseException:
+            try:
+                self.__request("DELETE", key, query={"uploadId": upload_id})
+            except Exception:
+                pass
+            raise
+
+    def __find_text(self, xml_body: bytes, tag: str) -> str:
+        for element in ElementTree.fromstring(xml_body).iter():
+            if element.tag.rsplit("}", 1)[-1] == tag:
+                return element.text
+        raise S3Error(f"{tag} missing from the S3 response: {xml_body[:512]!r}")
+
+    def __connection(self, reconnect: bool = False) -> http.client.HTTPConnection:
+        connection = getattr(self._connections, "connection", None)
+        if connection is None or reconnect:
+            if connection is not None:
+                connection.close()
+                with self._connections_lock:
+                    if connection in self._open_connections:
+                        self._open_connections.remove(connection)
+            connection_class = (
+                http.client.HTTPSConnection if self._endpoint.scheme == "https" else http.client.HTTPConnection
+            )
+            connection = connection_class(self._endpoint.netloc, timeout=self._timeout)
+            self._connections.connection = connection
+            with self._connections_lock:
+                self._open_connections.append(connection)
+        return connection
+
+    def __request(self, method: str, key: str, query: dict[str, str] = None, body: list = None) -> tuple:
+        query = query or {}
+        body = body or []
+        path = f"{self._endpoint.path.rstrip('/')}/{self._bucket}/{key}"
+        payload_hash = _sha256_hex(body)
+        amz_date = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
+
+        headers = {
+            "Host": self._endpoint.netloc,
+            "x-amz-content-sha256": payload_hash,
+            "x-amz-date": amz_date,
+        }
+        if self._session_token:
+            headers["x-amz-security-token"] = self._session_token
+        headers["Authorization"] = sign_s3_request(
+            method, path, query, headers, payload_hash,
+            self._access_key, self._secret_key, self._region, amz_date,
+        )
+        headers["Content-Length"] = str(sum(len(chunk) for chunk in body))
+
+        url = urllib.parse.quote(path, safe="/-_.~")
+        if query:
+            url += "?" + urllib.parse.urlencode(query, quote_via=urllib.parse.quote)
+        # a kept-alive connection may have been closed by the server in the meantime, that is retried once
+        for attempt in range(2):
+            connection = self.__connection(reconnect=attempt > 0)
+            try:
+                connection.request(method, url, body=iter(body), headers=headers)
+                response = connection.getresponse()
+                response_body = response.read()
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                if attempt:
+                    raise
+
+        if response.status >= 300:
+            raise S3Error(f"S3 {method} {key} failed with {response.status}: {response_body[:512]!r}")
+        return response.headers, response_body
@@ -1,5 +1,5 @@
+import sys
 import argparse
-from ifcopenshell.entity_instance import entity_instance
 from pygltflib import Attributes
 
 def extract_non_null_attributes(attributes: Attributes) -> dict:
@@ -8,10 +8,15 @@ def extract_non_null_attributes(attributes: Attributes) -> dict:
     )
     return {k: v for k, v in attributes_dict.items() if v is not None}
 
+def _is_entity_instance(obj) -> bool:
+    # only IFC conversions import ifcopenshell, nothing else can hand us an entity
+    entity_instance_module = sys.modules.get("ifcopenshell.entity_instance")
+    return entity_instance_module is not None and isinstance(obj, entity_instance_module.entity_instance)
+
 def to_dict(obj, exclude_keys: list[str]):
     if isinstance(obj, dict):
         return {k[0].lower() + k[1:]: to_dict(v, exclude_keys) for k, v in obj.items() if k not in exclude_keys}
-    elif isinstance(obj, entity_instance):
+    elif _is_entity_instance(obj):
         return {k[0].lower() + k[1:]: to_dict(v, exclude_keys) for k, v in vars(obj).items() if k not in exclude_keys}
     else:
         return obj
\ No newline at end of file
@@ -0,0 +1,47 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from generators import generate_sequenced_glb
+from service.tile_chunk_service import TileChunkService
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Time tile splitting of an animated 4D sequencing model.")
+    parser.add_argument('-n', '--node_count', type=int, help='number of sequenced elements', required=False)
+    parser.add_argument('-a', '--animation_count', type=int, help='number of animations the channels are spread over', required=False)
+    parser.add_argument('-s', '--split_size', type=int, help='split size', required=False)
+
+    args = parser.parse_args()
+
+    node_count = args.node_count if args.node_count is not None else 2000
+    animation_count = args.animation_count if args.animation_count is not None else 1
+    split_size = args.split_size if args.split_size is not None else 100
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        input_glb_path = generate_sequenced_glb(
+            os.path.join(work_dir, "sequenced.glb"),
+            node_count=node_count,
+            animation_count=animation_count,
+        )
+
+        start_time = time.perf_counter()
+        TileChunkService().split_model_by_nodes(
+            input_glb_path=input_glb_path,
+            output_dir=os.path.join(work_dir, "outputs"),
+            split_size=split_size,
+        )
+        elapsed = time.perf_counter() - start_time
+
+    print(json.dumps({
+        "benchmark": "split_animated_sequence",
+        "node_count": node_count,
+        "animation_count": animation_count,
+        "split_size": split_size,
+        "seconds": round(elapsed, 4),
+    }, indent=2))
@@ -0,0 +1,66 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from generators import generate_glb
+
+MAIN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app", "main.py")
+# modules a plain GLB split must not load
+HEAVY_MODULES = ("ifcopenshell", "bpy", "tqdm")
+
+# runs main.py in-process and reports which heavy modules it pulled in
+PROBE_SCRIPT = """
+import json, os, runpy, sys
+main_path = sys.argv[1]
+sys.path.insert(0, os.path.dirname(main_path))
+sys.argv = [main_path] + sys.argv[2:]
+runpy.run_path(main_path, run_name="__main__")
+print(json.dumps([name for name in {heavy_modules!r} if name in sys.modules]))
+"""
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Time a cold main.py run on a small GLB and check which modules it loads.")
+    parser.add_argument('-r', '--repeat', type=int, help='number of cold starts', required=False)
+    parser.add_argument('--budget', type=float, help='allowed median seconds per run', required=False)
+
+    args = parser.parse_args()
+
+    repeat = args.repeat if args.repeat is not None else 5
+    budget = args.budget if args.budget is not None else 1.5
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        input_glb_path = generate_glb(os.path.join(work_dir, "startup.glb"), node_count=10, group_size=5)
+        command = [sys.executable, MAIN_PATH, "-i", input_glb_path, "-o", os.path.join(work_dir, "outputs")]
+
+        runs = []
+        for _ in range(repeat):
+            start_time = time.perf_counter()
+            subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+            runs.append(round(time.perf_counter() - start_time, 4))
+
+        probe = subprocess.run(
+            [sys.executable, "-c", PROBE_SCRIPT.format(heavy_modules=HEAVY_MODULES)] + command[1:],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        loaded_modules = json.loads(probe.stdout.strip().splitlines()[-1])
+
+    median = round(statistics.median(runs), 4)
+    print(json.dumps({
+        "benchmark": "main_startup_glb",
+        "runs": runs,
+        "min": min(runs),
+        "median": median,
+        "budget": budget,
+        "heavyModulesLoaded": loaded_modules,
+    }, indent=2))
+
+    if median > budget or loaded_modules:
+        sys.exit(1)
@@ -0,0 +1,316 @@
+import struct
+import zlib
+import numpy as np
+from pygltflib import (
+    GLTF2,
+    Scene,
+    Node,
+    Mesh,
+    Primitive,
+    Attributes,
+    Buffer,
+    BufferView,
+    Accessor,
+    Animation,
+    AnimationChannel,
+    AnimationChannelTarget,
+    AnimationSampler,
+    Material,
+    PbrMetallicRoughness,
+    TextureInfo,
+    Texture,
+    Image,
+    Sampler,
+    Skin,
+    FLOAT,
+    UNSIGNED_BYTE,
+    UNSIGNED_SHORT,
+    SCALAR,
+    VEC2,
+    VEC3,
+    VEC4,
+    MAT4,
+    ARRAY_BUFFER,
+    ELEMENT_ARRAY_BUFFER,
+)
+
+CUBE_POSITIONS = np.array(
+    [[x, y, z] for x in (-0.5, 0.5) for y in (-0.5, 0.5) for z in (-0.5, 0.5)],
+    dtype=np.float32,
+)
+CUBE_NORMALS = CUBE_POSITIONS / np.linalg.norm(CUBE_POSITIONS, axis=1, keepdims=True)
+CUBE_TEXCOORDS = CUBE_POSITIONS[:, :2] + 0.5
+CUBE_INDICES = np.array(
+    [
+        0, 1, 3, 0, 3, 2, 4, 6, 7, 4, 7, 5, 0, 4, 5, 0, 5, 1,
+        2, 3, 7, 2, 7, 6, 0, 2, 6, 0, 6, 4, 1, 5, 7, 1, 7, 3,
+    ],
+    dtype=np.uint16,
+)
+
+
+class _BinaryBuilder:
+    def __init__(self, gltf: GLTF2):
+        self.gltf = gltf
+        self.data = bytearray()
+
+    def add_bufferView(self, blob: bytes, target: int = None) -> int:
+        while len(self.data) % 4 != 0:
+            self.data.append(0)
+        self.gltf.bufferViews.append(
+            BufferView(buffer=0, byteOffset=len(self.data), byteLength=len(blob), target=target)
+        )
+        self.data.extend(blob)
+        return len(self.gltf.bufferViews) - 1
+
+    def add_accessor(self, array: np.ndarray, accessor_type: str, component_type: int, target: int = None) -> int:
+        count = len(array) if accessor_type != SCALAR else array.size
+        accessor = Accessor(
+            bufferView=self.add_bufferView(array.tobytes(), target),
+            componentType=component_type,
+            count=count,
+            type=accessor_type,
+        )
+        if accessor_type == VEC3 and component_type == FLOAT:
+            accessor.min = array.min(axis=0).tolist()
+            accessor.max = array.max(axis=0).tolist()
+        if accessor_type == SCALAR and component_type == FLOAT:
+            accessor.min = [float(array.min())]
+            accessor.max = [float(array.max())]
+        self.gltf.accessors.append(accessor)
+        return len(self.gltf.accessors) - 1
+
+    def finish(self) -> None:
+        self.gltf.buffers = [Buffer(byteLength=len(self.data))]
+        self.gltf.set_binary_blob(bytes(self.data))
+
+
+def add_cube_mesh(
+    builder: _BinaryBuilder,
+    offset: tuple[float, float, float] = (0, 0, 0),
+    accessor_count: int = 2,
+    material: int = None,
+) -> int:
+    # POSITION and indices always, then NORMAL, TEXCOORD_0 and custom attributes up to accessor_count
+    position_accessor = builder.add_accessor(CUBE_POSITIONS + np.array(offset, dtype=np.float32), VEC3, FLOAT, ARRAY_BUFFER)
+    indices_accessor = builder.add_accessor(CUBE_INDICES, SCALAR, UNSIGNED_SHORT, ELEMENT_ARRAY_BUFFER)
+    attributes = {"POSITION": position_accessor}
+
+    if accessor_count > 2:
+        attributes["NORMAL"] = builder.add_accessor(CUBE_NORMALS, VEC3, FLOAT, ARRAY_BUFFER)
+    if accessor_count > 3:
+        attributes["TEXCOORD_0"] = builder.add_accessor(CUBE_TEXCOORDS, VEC2, FLOAT, ARRAY_BUFFER)
+    for custom_index in range(accessor_count - 4):
+        custom_values = np.full(len(CUBE_POSITIONS), custom_index, dtype=np.float32)
+        attributes[f"_BENCH_{custom_index}"] = builder.add_accessor(custom_values, SCALAR, FLOAT, ARRAY_BUFFER)
+
+    builder.gltf.meshes.append(
+        Mesh(primitives=[Primitive(attributes=Attributes(**attributes), indices=indices_accessor, material=material)])
+    )
+    return len(builder.gltf.meshes) - 1
+
+
+def solid_png(rgb: tuple[int, int, int], size: int = 4) -> bytes:
+    def chunk(chunk_type: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", zlib.crc32(chunk_type + data))
+
+    rows = b"".join(b"\x00" + bytes(rgb) * size for _ in range(size))
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(rows))
+        + chunk(b"IEND", b"")
+    )
+
+
+def generate_glb(
+    output_path: str,
+    node_count: int = 1000,
+    accessors_per_mesh: int = 4,
+    group_size: int = 50,
+    texture_count: int = 0,
+    skin_count: int = 0,
+    animation_count: int = 0,
+) -> str:
+    # Site -> groups of group_size elements, like storeys in an IFC export
+    gltf = GLTF2(scene=0, scenes=[Scene(nodes=[0])], nodes=[Node(name="Site", children=[])])
+    builder = _BinaryBuilder(gltf)
+
+    if texture_count > 0:
+        gltf.samplers.append(Sampler())
+    for texture_index in range(texture_count):
+        color = ((texture_index * 67) % 256, (texture_index * 151) % 256, (texture_index * 23) % 256)
+        gltf.images.append(Image(bufferView=builder.add_bufferView(solid_png(color)), mimeType="image/png"))
+        gltf.textures.append(Texture(sampler=0, source=texture_index))
+        gltf.materials.append(
+            Material(
+                name=f"Material {texture_index}",
+                pbrMetallicRoughness=PbrMetallicRoughness(baseColorTexture=TextureInfo(index=texture_index)),
+            )
+        )
+
+    grid_size = int(np.ceil(np.sqrt(node_count)))
+    element_nodes = []
+    group_node = None
+    for element_index in range(node_count):
+        if element_index % group_size == 0:
+            gltf.nodes.append(Node(name=f"Group {element_index // group_size}", children=[]))
+            group_node = len(gltf.nodes) - 1
+            gltf.nodes[0].children.append(group_node)
+
+        offset = (element_index % grid_size, 0, element_index // grid_size)
+        mesh_index = add_cube_mesh(
+            builder,
+            offset,
+            accessor_count=accessors_per_mesh,
+            material=element_index % texture_count if texture_count > 0 else None,
+        )
+        gltf.nodes.append(Node(name=f"Element {element_index}", mesh=mesh_index))
+        element_nodes.append(len(gltf.nodes) - 1)
+        gltf.nodes[group_node].children.append(element_nodes[-1])
+
+    for skin_index, node_index in enumerate(element_nodes[:skin_count]):
+        node = gltf.nodes[node_index]
+        gltf.nodes.append(Node(name=f"Joint {skin_index}"))
+        joint_node = len(gltf.nodes) - 1
+        node.children = [joint_node]
+
+        inverse_bind_matrices = builder.add_accessor(np.identity(4, dtype=np.float32).reshape(1, 16), MAT4, FLOAT)
+        gltf.skins.append(Skin(joints=[joint_node], inverseBindMatrices=inverse_bind_matrices))
+        node.skin = skin_index
+
+        primitive = gltf.meshes[node.mesh].primitives[0]
+        joints = np.zeros((len(CUBE_POSITIONS), 4), dtype=np.uint8)
+        weights = np.tile(np.array([1, 0, 0, 0], dtype=np.float32), (len(CUBE_POSITIONS), 1))
+        primitive.attributes.JOINTS_0 = builder.add_accessor(joints, VEC4, UNSIGNED_BYTE, ARRAY_BUFFER)
+        primitive.attributes.WEIGHTS_0 = builder.add_accessor(weights, VEC4, FLOAT, ARRAY_BUFFER)
+
+    if animation_count > 0:
+        lift_keys = np.array([[0, 0, 0], [0, 1, 0]], dtype=np.float32)
+        lift_output = builder.add_accessor(lift_keys, VEC3, FLOAT)
+        elements_per_animation = (node_count + animation_count - 1) // animation_count
+        for animation_index in range(animation_count):
+            animation = Animation(name=f"Animation {animation_index}", channels=[], samplers=[])
+            for node_index in element_nodes[animation_index * elements_per_animation:(animation_index + 1) * elements_per_animation]:
+                times = np.array([0, 1], dtype=np.float32) + node_index % 10
+                animation.samplers.append(
+                    AnimationSampler(input=builder.add_accessor(times, SCALAR, FLOAT), output=lift_output)
+                )
+                animation.channels.append(
+                    AnimationChannel(
+                        sampler=len(animation.samplers) - 1,
+                        target=AnimationChannelTarget(node=node_index, path="translation"),
+                    )
+                )
+            gltf.animations.append(animation)
+
+    builder.finish()
+    gltf.save(output_path)
+    return output_path
+
+
+def generate_ifc(output_path: str, product_count: int = 200, storey_count: int = 4) -> str:
+    # imported here so the GLB generators work without ifcopenshell
+    import ifcopenshell
+    import ifcopenshell.api
+    import ifcopenshell.guid
+
+    ifc_file = ifcopenshell.file(schema="IFC4")
+    project = ifcopenshell.api.run("root.create_entity", ifc_file, ifc_class="IfcProject", name="Benchmark Project")
+    ifcopenshell.api.run("unit.assign_unit", ifc_file, length={"is_metric": True, "raw": "METERS"})
+    model_context = ifcopenshell.api.run("context.add_context", ifc_file, context_type="Model")
+    body_context = ifcopenshell.api.run(
+        "context.add_context",
+        ifc_file,
+        context_type="Model",
+        context_identifier="Body",
+        target_view="MODEL_VIEW",
+        parent=model_context,
+    )
+
+    # the converter starts from the first IfcProduct, the building gets the lowest id of all products
+    building = ifcopenshell.api.run("root.create_entity", ifc_file, ifc_class="IfcBuilding", name="Benchmark Building")
+    storeys = [
+        ifcopenshell.api.run("root.create_entity", ifc_file, ifc_class="IfcBuildingStorey", name=f"Level {storey_index}")
+        for storey_index in range(storey_count)
+    ]
+    # relationships are created directly, the aggregate and spatial api signatures differ between releases
+    ifc_file.createIfcRelAggregates(ifcopenshell.guid.new(), None, None, None, project, [building])
+    ifc_file.createIfcRelAggregates(ifcopenshell.guid.new(), None, None, None, building, storeys)
+
+    products_per_storey = (product_count + storey_count - 1) // storey_count
+    grid_size = int(np.ceil(np.sqrt(products_per_storey)))
+    for storey_index, storey in enumerate(storeys):
+        walls = []
+        first_product = storey_index * products_per_storey
+        for product_index in range(first_product, min(first_product + products_per_storey, product_count)):
+            wall = ifcopenshell.api.run("root.create_entity", ifc_file, ifc_class="IfcWall", name=f"Wall {product_index}")
+            representation = ifcopenshell.api.run(
+                "geometry.add_wall_representation",
+                ifc_file,
+                context=body_context,
+                length=1.0 + (product_index % 5) * 0.5,
+                height=3.0,
+                thickness=0.2,
+            )
+            ifcopenshell.api.run("geometry.assign_representation", ifc_file, product=wall, representation=representation)
+
+            local_index = product_index - first_product
+            matrix = np.identity(4)
+            matrix[:3, 3] = (local_index % grid_size * 4.0, local_index // grid_size * 2.0, storey_index * 3.0)
+            ifcopenshell.api.run("geometry.edit_object_placement", ifc_file, product=wall, matrix=matrix)
+
+            pset = ifcopenshell.api.run("pset.add_pset", ifc_file, product=wall, name="Pset_WallCommon")
+            ifcopenshell.api.run(
+                "pset.edit_pset",
+                ifc_file,
+                pset=pset,
+                properties={"Reference": f"W-{product_index}", "IsExternal": product_index % 2 == 0},
+            )
+            walls.append(wall)
+
+        if walls:
+            ifc_file.createIfcRelContainedInSpatialStructure(ifcopenshell.guid.new(), None, None, None, walls, storey)
+
+    ifc_file.write(output_path)
+    return output_path
+
+
+def generate_sequenced_glb(
+    output_path: str,
+    node_count: int = 2000,
+    animation_count: int = 1,
+) -> str:
+    # 4D construction sequence: every element is scaled in from 0 to 1 at its own build step
+    gltf = GLTF2(scene=0, scenes=[Scene(nodes=[0])], nodes=[Node(name="Site", children=[])])
+    builder = _BinaryBuilder(gltf)
+
+    grid_size = int(np.ceil(np.sqrt(node_count)))
+    for element_index in range(node_count):
+        mesh_index = add_cube_mesh(builder, (element_index % grid_size, 0, element_index // grid_size))
+        gltf.nodes.append(Node(name=f"Element {element_index}", mesh=mesh_index))
+        gltf.nodes[0].children.append(len(gltf.nodes) - 1)
+
+    scale_keys = np.array([[0, 0, 0], [1, 1, 1]], dtype=np.float32)
+    scale_output = builder.add_accessor(scale_keys, VEC3, FLOAT)
+
+    elements_per_animation = (node_count + animation_count - 1) // animation_count
+    for animation_index in range(animation_count):
+        animation = Animation(name=f"Sequence {animation_index}", channels=[], samplers=[])
+        first_element = animation_index * elements_per_animation
+        last_element = min(first_element + elements_per_animation, node_count)
+        for element_index in range(first_element, last_element):
+            times = np.array([element_index, element_index + 1], dtype=np.float32)
+            time_input = builder.add_accessor(times, SCALAR, FLOAT)
+            animation.samplers.append(AnimationSampler(input=time_input, output=scale_output, interpolation="STEP"))
+            animation.channels.append(
+                AnimationChannel(
+                    sampler=len(animation.samplers) - 1,
+                    target=AnimationChannelTarget(node=element_index + 1, path="scale"),
+                )
+            )
+        gltf.animations.append(animation)
+
+    builder.finish()
+    gltf.save(output_path)
+    return output_path
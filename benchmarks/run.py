@@ -0,0 +1,210 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARK_DIR, "..", "app"))
+
+from pygltflib import GLTF2
+from generators import generate_glb, generate_ifc
+from s3_stub import S3StubServer
+from service.tile_chunk_service import TileChunkService
+from service.ifc_service import IfcService
+from utils.output_sink import S3OutputSink
+
+
+def git_revision() -> tuple[str, bool]:
+    try:
+        sha = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=BENCHMARK_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        status = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=BENCHMARK_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", True
+    return sha, bool(status.strip())
+
+
+def time_runs(run, repeat: int, setup=None) -> dict:
+    runs = []
+    for _ in range(repeat):
+        # setup work (loading inputs, clearing outputs) is kept out of the measurement
+        arguments = setup() if setup is not None else ()
+        start_time = time.perf_counter()
+        run(*arguments)
+        runs.append(round(time.perf_counter() - start_time, 4))
+    return {
+        "runs": runs,
+        "min": min(runs),
+        "median": round(statistics.median(runs), 4),
+    }
+
+
+def run_benchmarks(work_dir: str, args) -> dict:
+    results = {}
+    tile_chunk_service = TileChunkService()
+    ifc_service = IfcService()
+
+    input_glb_path = generate_glb(
+        os.path.join(work_dir, "synthetic.glb"),
+        node_count=args.node_count,
+        accessors_per_mesh=args.accessor_count,
+        texture_count=args.texture_count,
+        skin_count=args.skin_count,
+        animation_count=args.animation_count,
+    )
+    results["split_model_by_nodes"] = time_runs(
+        lambda: tile_chunk_service.split_model_by_nodes(
+            input_glb_path=input_glb_path,
+            output_dir=os.path.join(work_dir, "split"),
+            split_size=args.split_size,
+        ),
+        args.repeat,
+    )
+
+    # same split streamed to an in-memory S3 stub, to see what the uploads add
+    s3_stub = S3StubServer().start()
+    try:
+        results["split_model_by_nodes_s3"] = time_runs(
+            lambda output_sink: tile_chunk_service.split_model_by_nodes(
+                input_glb_path=input_glb_path,
+                output_sink=output_sink,
+                split_size=args.split_size,
+            ),
+            args.repeat,
+            setup=lambda: (S3OutputSink(
+                bucket="benchmarks",
+                endpoint_url=s3_stub.endpoint_url,
+                access_key=s3_stub.access_key,
+                secret_key=s3_stub.secret_key,
+            ),),
+        )
+    finally:
+        s3_stub.stop()
+
+    input_ifc_path = generate_ifc(
+        os.path.join(work_dir, "synthetic.ifc"),
+        product_count=args.product_count,
+        storey_count=args.storey_count,
+    )
+    ifc_output_dir = os.path.join(work_dir, "ifc")
+    os.makedirs(ifc_output_dir, exist_ok=True)
+    try:
+        results["ifc_to_glb"] = time_runs(
+            lambda: ifc_service.ifc_to_glb(input_ifc_path, ifc_output_dir, "synthetic"),
+            args.repeat,
+        )
+    except Exception as e:
+        # the metadata benchmarks read the converter output, so they cannot run either
+        results["ifc_to_glb"] = {"error": repr(e)}
+        return results
+
+    with open(os.path.join(ifc_output_dir, "synthetic_batch_table.json"), "r") as f:
+        batch_table = json.load(f)
+    results["create_structural_metadata"] = time_runs(
+        lambda gltf: ifc_service.create_structural_metadata(gltf, batch_table, True),
+        args.repeat,
+        setup=lambda: (GLTF2().load(os.path.join(ifc_output_dir, "synthetic.glb")),),
+    )
+    results["merge_metadata"] = time_runs(
+        lambda: ifc_service.merge_metadata(ifc_output_dir, "synthetic"),
+        args.repeat,
+    )
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    regressions = []
+    for name, result in results["benchmarks"].items():
+        baseline_result = baseline["benchmarks"].get(name)
+        if "median" not in result or not baseline_result or "median" not in baseline_result:
+            print(f"{name}: no comparable baseline")
+            continue
+
+        ratio = result["median"] / baseline_result["median"] if baseline_result["median"] else 1.0
+        print(f"{name}: {baseline_result['median']}s -> {result['median']}s ({ratio:.2f}x)")
+        if ratio > 1 + threshold:
+            regressions.append(name)
+    return regressions
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Run the benchmark suite on synthetic models and store the timings per commit.")
+    parser.add_argument('-o', '--results_dir', type=str, help='directory the result JSON is written to', required=False)
+    parser.add_argument('-n', '--node_count', type=int, help='number of mesh nodes in the synthetic GLB', required=False)
+    parser.add_argument('-a', '--accessor_count', type=int, help='number of extra accessors per mesh', required=False)
+    parser.add_argument('-t', '--texture_count', type=int, help='number of textures in the synthetic GLB', required=False)
+    parser.add_argument('-k', '--skin_count', type=int, help='number of skins in the synthetic GLB', required=False)
+    parser.add_argument('--animation_count', type=int, help='number of animations in the synthetic GLB', required=False)
+    parser.add_argument('-p', '--product_count', type=int, help='number of products in the synthetic IFC', required=False)
+    parser.add_argument('--storey_count', type=int, help='number of storeys in the synthetic IFC', required=False)
+    parser.add_argument('-s', '--split_size', type=int, help='split size', required=False)
+    parser.add_argument('-r', '--repeat', type=int, help='runs per benchmark', required=False)
+    parser.add_argument('-c', '--compare', type=str, help='result JSON of an earlier commit to compare against', required=False)
+    parser.add_argument('--threshold', type=float, help='allowed slowdown against the baseline, 0.1 is 10%%', required=False)
+
+    args = parser.parse_args()
+
+    args.results_dir = args.results_dir if args.results_dir is not None else os.path.join(BENCHMARK_DIR, "results")
+    args.node_count = args.node_count if args.node_count is not None else 1000
+    args.accessor_count = args.accessor_count if args.accessor_count is not None else 4
+    args.texture_count = args.texture_count if args.texture_count is not None else 4
+    args.skin_count = args.skin_count if args.skin_count is not None else 2
+    args.animation_count = args.animation_count if args.animation_count is not None else 2
+    args.product_count = args.product_count if args.product_count is not None else 200
+    args.storey_count = args.storey_count if args.storey_count is not None else 4
+    args.split_size = args.split_size if args.split_size is not None else 100
+    args.repeat = args.repeat if args.repeat is not None else 3
+    args.threshold = args.threshold if args.threshold is not None else 0.1
+
+    sha, dirty = git_revision()
+    with tempfile.TemporaryDirectory() as work_dir:
+        benchmarks = run_benchmarks(work_dir, args)
+
+    results = {
+        "commit": sha,
+        "dirty": dirty,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {
+            "node_count": args.node_count,
+            "accessor_count": args.accessor_count,
+            "texture_count": args.texture_count,
+            "skin_count": args.skin_count,
+            "animation_count": args.animation_count,
+            "product_count": args.product_count,
+            "storey_count": args.storey_count,
+            "split_size": args.split_size,
+            "repeat": args.repeat,
+        },
+        "benchmarks": benchmarks,
+    }
+
+    os.makedirs(args.results_dir, exist_ok=True)
+    results_path = os.path.join(args.results_dir, f"{sha[:12]}{'-dirty' if dirty else ''}.json")
+    with open(results_path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(json.dumps(results, indent=2))
+    print(f"Saved: {results_path}")
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+        if baseline["parameters"] != results["parameters"]:
+            print("Warning: baseline was recorded with different parameters")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"Regressions: {', '.join(regressions)}")
+            sys.exit(1)
@@ -0,0 +1,209 @@
+import os
+import sys
+import uuid
+import hashlib
+import argparse
+import threading
+import urllib.parse
+import xml.etree.ElementTree as ElementTree
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARK_DIR, "..", "app"))
+
+from utils.output_sink import sign_s3_request
+
+DEFAULT_ACCESS_KEY = "stubaccesskey"
+DEFAULT_SECRET_KEY = "stubsecretkey"
+
+
+class S3StubHandler(BaseHTTPRequestHandler):
+    # the subset of the S3 API the output sink uses: PUT, GET and the multipart upload calls,
+    # with path-style addressing and signature version 4 checks like MinIO
+    protocol_version = "HTTP/1.1"
+    server: "S3StubServer"
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        key, _ = self.__parse()
+        body = self.__read_body()
+        if not self.__authorized(body):
+            return
+        data = self.server.objects.get(key)
+        if data is None:
+            self.__respond(404, self.__error("NoSuchKey", key))
+            return
+        self.__respond(200, data, content_type="application/octet-stream")
+
+    def do_PUT(self) -> None:
+        key, query = self.__parse()
+        body = self.__read_body()
+        if not self.__authorized(body):
+            return
+
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        if "uploadId" in query:
+            parts = self.server.uploads.get(query["uploadId"])
+            if parts is None:
+                self.__respond(404, self.__error("NoSuchUpload", key))
+                return
+            parts[int(query["partNumber"])] = (etag, body)
+        else:
+            self.server.objects[key] = body
+        self.__respond(200, b"", etag=etag)
+
+    def do_POST(self) -> None:
+        key, query = self.__parse()
+        body = self.__read_body()
+        if not self.__authorized(body):
+            return
+
+        if "uploads" in query:
+            upload_id = uuid.uuid4().hex
+            self.server.uploads[upload_id] = {}
+            self.__respond(200, (
+                "<InitiateMultipartUploadResult>"
+                f"<Bucket>{self.server.bucket_of(self.path)}</Bucket><Key>{key}</Key><UploadId>{upload_id}</UploadId>"
+                "</InitiateMultipartUploadResult>"
+            ).encode("utf-8"))
+            return
+
+        parts = self.server.uploads.pop(query.get("uploadId"), None)
+        if parts is None:
+            self.__respond(404, self.__error("NoSuchUpload", key))
+            return
+        requested = [
+            (int(part.findtext("PartNumber")), part.findtext("ETag"))
+            for part in ElementTree.fromstring(body).iter("Part")
+        ]
+        if any(part_number not in parts or parts[part_number][0] != etag for part_number, etag in requested):
+            self.__respond(400, self.__error("InvalidPart", key))
+            return
+        self.server.objects[key] = b"".join(parts[part_number][1] for part_number, _ in requested)
+        self.__respond(200, f"<CompleteMultipartUploadResult><Key>{key}</Key></CompleteMultipartUploadResult>".encode("utf-8"))
+
+    def do_DELETE(self) -> None:
+        key, query = self.__parse()
+        body = self.__read_body()
+        if not self.__authorized(body):
+            return
+        if "uploadId" in query:
+            self.server.uploads.pop(query["uploadId"], None)
+        else:
+            self.server.objects.pop(key, None)
+        self.__respond(204, b"")
+
+    def __parse(self) -> tuple[str, dict[str, str]]:
+        url = urllib.parse.urlsplit(self.path)
+        # objects are keyed by bucket/key
+        key = urllib.parse.unquote(url.path).lstrip("/")
+        return key, dict(urllib.parse.parse_qsl(url.query, keep_blank_values=True))
+
+    def __read_body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def __authorized(self, body: bytes) -> bool:
+        authorization = self.headers.get("Authorization", "")
+        payload_hash = self.headers.get("x-amz-content-sha256", "")
+        try:
+            credential, signed_headers, _ = (field.split("=", 1)[1] for field in authorization.split(" ", 1)[1].split(", "))
+            access_key, _, region, _, _ = credential.split("/")
+        except (IndexError, ValueError):
+            self.__respond(403, self.__error("AccessDenied", "missing or malformed signature"))
+            return False
+
+        url = urllib.parse.urlsplit(self.path)
+        expected = sign_s3_request(
+            self.command,
+            urllib.parse.unquote(url.path),
+            dict(urllib.parse.parse_qsl(url.query, keep_blank_values=True)),
+            {name: self.headers.get(name, "") for name in signed_headers.split(";")},
+            payload_hash,
+            access_key,
+            self.server.secret_key,
+            region,
+            self.headers.get("x-amz-date", ""),
+        )
+        if access_key != self.server.access_key or expected != authorization:
+            self.__respond(403, self.__error("SignatureDoesNotMatch", "signature does not match"))
+            return False
+        if payload_hash != hashlib.sha256(body).hexdigest():
+            self.__respond(400, self.__error("XAmzContentSHA256Mismatch", "payload hash does not match"))
+            return False
+        return True
+
+    def __error(self, code: str, message: str) -> bytes:
+        return f"<Error><Code>{code}</Code><Message>{message}</Message></Error>".encode("utf-8")
+
+    def __respond(self, status: int, body: bytes, content_type: str = "application/xml", etag: str = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if etag is not None:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class S3StubServer(ThreadingHTTPServer):
+    # an in-memory stand-in for an S3 compatible server, to run the S3 output sink without credentials
+    daemon_threads = True
+
+    def __init__(
+            self,
+            host: str = "127.0.0.1",
+            port: int = 0,
+            access_key: str = DEFAULT_ACCESS_KEY,
+            secret_key: str = DEFAULT_SECRET_KEY,
+        ) -> None:
+        super().__init__((host, port), S3StubHandler)
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.objects: dict[str, bytes] = {}
+        self.uploads: dict[str, dict[int, tuple[str, bytes]]] = {}
+        self._thread = None
+
+    @property
+    def endpoint_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def bucket_of(self, path: str) -> str:
+        return urllib.parse.urlsplit(path).path.lstrip("/").split("/", 1)[0]
+
+    def start(self) -> "S3StubServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Serve an in-memory S3 compatible stub for the s3:// output sink.")
+    parser.add_argument('--host', type=str, help='host to listen on', required=False)
+    parser.add_argument('-p', '--port', type=int, help='port to listen on', required=False)
+    parser.add_argument('--access_key', type=str, help='accepted access key id', required=False)
+    parser.add_argument('--secret_key', type=str, help='accepted secret access key', required=False)
+
+    args = parser.parse_args()
+
+    server = S3StubServer(
+        host=args.host if args.host is not None else "127.0.0.1",
+        port=args.port if args.port is not None else 9000,
+        access_key=args.access_key if args.access_key is not None else DEFAULT_ACCESS_KEY,
+        secret_key=args.secret_key if args.secret_key is not None else DEFAULT_SECRET_KEY,
+    )
+    print(f"Serving S3 stub on {server.endpoint_url}")
+    print(f"AWS_ENDPOINT_URL={server.endpoint_url} AWS_ACCESS_KEY_ID={server.access_key} AWS_SECRET_ACCESS_KEY={server.secret_key}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,65 @@
+import os
+import sys
+import json
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TESTS_DIR, "..", "app"))
+
+from model.batch_table_index_model import BatchTableIndex
+from model.batch_table_mapping_model import BATCH_TABLE_MAPPING_VERSION, BatchTableMapping
+
+LEGACY_MAPPING_PATH = os.path.join(TESTS_DIR, "..", "app", "outputs", "Ifc2s3_Duplex_Electrical_batch_table_mapping.json")
+
+
+@pytest.fixture
+def legacy_mapping_json() -> dict:
+    # written before version 2: keyed by GlobalId + mesh index, the mesh index is the row's batchId
+    with open(LEGACY_MAPPING_PATH, "r") as f:
+        return json.load(f)
+
+
+def test_legacy_mapping_resolves_the_same_rows_in_every_format(tmp_path, legacy_mapping_json):
+    legacy_mapping = BatchTableMapping.from_json(legacy_mapping_json)
+    mapping_json = json.loads(json.dumps(legacy_mapping.to_json()))
+    assert mapping_json["version"] == BATCH_TABLE_MAPPING_VERSION
+    round_trip_mapping = BatchTableMapping.from_json(mapping_json)
+
+    legacy_rows = {row["batchId"]: row for row in legacy_mapping_json.values()}
+    global_ids = {row["globalId"] for row in legacy_rows.values()}
+    missing_mesh_index = max(legacy_rows) + 1
+
+    with BatchTableIndex.create(str(tmp_path / "mapping.sqlite"), legacy_mapping) as batch_table_index:
+        for mapping in (legacy_mapping, round_trip_mapping, batch_table_index):
+            assert len(mapping) == len(legacy_rows)
+            assert list(mapping) == sorted(legacy_rows)
+            assert {mesh_index: mapping[mesh_index] for mesh_index in mapping} == legacy_rows
+            for global_id in global_ids:
+                assert mapping.mesh_indices(global_id) == sorted(
+                    mesh_index for mesh_index, row in legacy_rows.items() if row["globalId"] == global_id
+                )
+            assert missing_mesh_index not in mapping
+            with pytest.raises(KeyError):
+                mapping[missing_mesh_index]
+
+        assert batch_table_index.rows(sorted(legacy_rows, reverse=True)) == [
+            legacy_rows[mesh_index] for mesh_index in sorted(legacy_rows, reverse=True)
+        ]
+
+
+def test_round_trip_keeps_rows_with_their_own_keys():
+    batch_table_mapping = BatchTableMapping()
+    batch_table_mapping.add(0, {"globalId": "a", "name": "Wall", "batchId": 0})
+    batch_table_mapping.add(3, {"globalId": "a", "batchId": 3})
+    batch_table_mapping.add(4, {"globalId": "b", "name": "Door", "batchId": 4})
+
+    mapping_json = batch_table_mapping.to_json()
+    # rows with the shared columns are stored as value arrays, mesh indices without a row as null
+    assert mapping_json["columns"] == ["globalId", "name", "batchId"]
+    assert mapping_json["rows"] == [["a", "Wall", 0], None, None, {"globalId": "a", "batchId": 3}, ["b", "Door", 4]]
+
+    round_trip_mapping = BatchTableMapping.from_json(mapping_json)
+    assert dict(round_trip_mapping) == dict(batch_table_mapping)
+    assert round_trip_mapping.mesh_indices("a") == [0, 3]
+    assert round_trip_mapping.mesh_indices("missing") == []
@@ -0,0 +1,147 @@
+import os
+import sys
+import glob
+import json
+import base64
+from collections import Counter
+
+import pytest
+from pygltflib import GLTF2, Buffer, BufferView, Node, Scene
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TESTS_DIR, "..", "app"))
+sys.path.insert(0, os.path.join(TESTS_DIR, "..", "benchmarks"))
+
+from generators import _BinaryBuilder, add_cube_mesh
+from service.tile_chunk_service import TileChunkService
+from utils.glb_writer import build_glb_chunks
+
+
+def cube_node(builder: _BinaryBuilder, name: str, offset: tuple, children: list[int] = None) -> int:
+    mesh_index = add_cube_mesh(builder, offset, accessor_count=4)
+    builder.gltf.nodes.append(Node(name=name, mesh=mesh_index, children=children or []))
+    return len(builder.gltf.nodes) - 1
+
+
+@pytest.fixture
+def nested_glb(tmp_path) -> str:
+    # Site -> storeys -> elements with child parts, a mesh on some grouping nodes, and one
+    # subtree that is the child of two storeys, so it is reachable twice
+    gltf = GLTF2(scene=0, scenes=[Scene(nodes=[0])], nodes=[Node(name="Site", children=[])])
+    builder = _BinaryBuilder(gltf)
+
+    shared_part = cube_node(builder, "Shared part", (0, 5, 0))
+    shared = cube_node(builder, "Shared element", (0, 4, 0), [shared_part])
+    for storey_index in range(3):
+        storey_children = []
+        for element_index in range(4):
+            offset = (element_index, storey_index, 0)
+            part = cube_node(builder, f"Part {storey_index}.{element_index}", offset)
+            storey_children.append(cube_node(builder, f"Element {storey_index}.{element_index}", offset, [part]))
+        if storey_index < 2:
+            storey_children.append(shared)
+        gltf.nodes.append(Node(name=f"Storey {storey_index}", children=storey_children))
+        gltf.nodes[0].children.append(len(gltf.nodes) - 1)
+    # a mesh node outside every scene still has to be written
+    cube_node(builder, "Loose element", (9, 9, 9))
+
+    builder.finish()
+    glb_path = str(tmp_path / "nested.glb")
+    gltf.save(glb_path)
+    return glb_path
+
+
+@pytest.mark.parametrize(
+    "split_mode, split_size, tile_budget",
+    [("nodes", 4, None), ("triangles", 100, 36), ("bytes", 100, 1000)],
+)
+def test_split_assigns_every_mesh_node_once(tmp_path, nested_glb, split_mode, split_size, tile_budget):
+    input_gltf = GLTF2().load(nested_glb)
+    output_dir = str(tmp_path / "tiles")
+    manifest = TileChunkService().split_model_by_nodes(
+        input_glb_path=nested_glb,
+        output_dir=output_dir,
+        split_size=split_size,
+        split_mode=split_mode,
+        tile_budget=tile_budget,
+    )
+
+    tile_paths = sorted(glob.glob(os.path.join(output_dir, "*.glb")))
+    assert len(tile_paths) == len(manifest["tiles"]) > 1
+    tiles = [GLTF2().load(tile_path) for tile_path in tile_paths]
+
+    mesh_node_names = Counter(node.name for tile in tiles for node in tile.nodes if node.mesh is not None)
+    assert mesh_node_names == Counter(node.name for node in input_gltf.nodes if node.mesh is not None)
+    assert set(mesh_node_names.values()) == {1}
+
+    report = manifest["partition"]
+    assert report["duplicatedNodes"] == 0
+    assert report["duplicatedBufferViews"] == 0
+    assert report["duplicatedBufferViewBytes"] == 0
+    assert report["unassignedNodes"] == 0
+
+    # with nothing shared between meshes the tiles hold the input BIN exactly once
+    assert sum(len(tile.binary_blob()) for tile in tiles) == len(input_gltf.binary_blob())
+    assert report["writtenBufferViewBytes"] == report["inputBinaryBytes"] == len(input_gltf.binary_blob())
+
+    assert report["oversizedTiles"] == []
+
+
+def test_split_reports_tiles_over_the_budget(tmp_path, nested_glb):
+    # every cube has 12 triangles, meshes are not split, so every tile with a mesh ends up over a budget of 10
+    output_dir = str(tmp_path / "tiles")
+    manifest = TileChunkService().split_model_by_nodes(
+        input_glb_path=nested_glb,
+        output_dir=output_dir,
+        split_mode="triangles",
+        tile_budget=10,
+    )
+
+    report = manifest["partition"]
+    assert report["tileBudget"] == 10
+    mesh_tiles = [
+        tile_entry["index"]
+        for tile_entry in manifest["tiles"]
+        if any(node.mesh is not None for node in GLTF2().load(os.path.join(output_dir, tile_entry["glb"])).nodes)
+    ]
+    assert len(mesh_tiles) > 1
+    assert [oversized["index"] for oversized in report["oversizedTiles"]] == mesh_tiles
+    assert all(oversized["cost"] == 12 for oversized in report["oversizedTiles"])
+
+
+def test_build_glb_chunks_round_trip(tmp_path, nested_glb):
+    gltf = GLTF2().load(nested_glb)
+    # a second, embedded buffer is packed into the same BIN chunk
+    embedded_data = bytes(range(10))
+    gltf.buffers.append(
+        Buffer(
+            byteLength=len(embedded_data),
+            uri="data:application/octet-stream;base64," + base64.b64encode(embedded_data).decode("ascii"),
+        )
+    )
+    gltf.bufferViews.append(BufferView(buffer=1, byteOffset=2, byteLength=6))
+
+    output_path = str(tmp_path / "round_trip.glb")
+    chunks, total_length = build_glb_chunks(gltf, output_path)
+    with open(output_path, "wb") as f:
+        for chunk in chunks:
+            f.write(chunk)
+    assert os.path.getsize(output_path) == total_length
+
+    loaded = GLTF2().load(output_path)
+    assert len(loaded.buffers) == 1
+    loaded_json, source_json = json.loads(loaded.to_json()), json.loads(gltf.to_json())
+    for key in ("scenes", "nodes", "meshes", "accessors"):
+        assert loaded_json[key] == source_json[key]
+
+    source_buffers = [gltf.binary_blob(), embedded_data]
+    loaded_data = loaded.binary_blob()
+    assert len(loaded.bufferViews) == len(gltf.bufferViews)
+    for source_view, loaded_view in zip(gltf.bufferViews, loaded.bufferViews):
+        assert loaded_view.buffer == 0
+        assert loaded_view.byteOffset % 4 == 0
+        source_start = source_view.byteOffset or 0
+        assert (
+            loaded_data[loaded_view.byteOffset:loaded_view.byteOffset + loaded_view.byteLength]
+            == source_buffers[source_view.buffer][source_start:source_start + source_view.byteLength]
+        )